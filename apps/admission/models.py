@@ -1,8 +1,9 @@
 import datetime
 import string
 import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from decimal import Decimal
-from typing import Any, ClassVar, NamedTuple, Optional, Type, Union
+from typing import Any, ClassVar, Dict, List, NamedTuple, Optional, Tuple, Type, Union
 
 from django.utils.functional import cached_property
 from djchoices import DjangoChoices
@@ -757,6 +758,50 @@ class YandexContestImportResults(NamedTuple):
     updated: int
 
 
+STANDINGS_PAGE_SIZE = 100
+STANDINGS_MAX_WORKERS = 4
+
+
+def fetch_contest_standings(
+    api, contest_id, *, page_size: int, max_workers: int
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Returns problem titles and all scoreboard rows of the contest.
+
+    The total number of pages is unknown beforehand, so up to `max_workers`
+    subsequent pages are requested at once until the first incomplete page.
+    """
+    pages = {}
+    last_page = None
+    next_page = 1
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_progress = {}
+
+        def fetch_next_page():
+            nonlocal next_page
+            future = executor.submit(
+                api.standings, contest_id, page_size=page_size, page=next_page
+            )
+            in_progress[future] = next_page
+            next_page += 1
+
+        while len(in_progress) < max_workers:
+            fetch_next_page()
+        while in_progress:
+            done, not_done = wait(in_progress, return_when=FIRST_COMPLETED)
+            for future in done:
+                page = in_progress.pop(future)
+                status, json_data = future.result()
+                pages[page] = json_data
+                if len(json_data["rows"]) < page_size:
+                    last_page = page if last_page is None else min(last_page, page)
+            while last_page is None and len(in_progress) < max_workers:
+                fetch_next_page()
+    titles = pages[1]["titles"]
+    rows = [row for page in range(1, last_page + 1) for row in pages[page]["rows"]]
+    return titles, rows
+
+
 class YandexContestIntegration(models.Model):
     CONTEST_TYPE: ClassVar[int]
     applicant: Any
@@ -903,54 +948,65 @@ class YandexContestIntegration(models.Model):
                 setattr(self, k, v)
 
     @classmethod
-    def import_scores(cls, *, api, contest: Contest) -> YandexContestImportResults:
+    def import_scores(
+        cls, *, api, contest: Contest, max_workers: Optional[int] = None
+    ) -> YandexContestImportResults:
         """
-        Imports contest results page by page.
+        Imports contest results. Scoreboard pages are fetched concurrently,
+        then scores are saved with bulk updates in a single transaction.
 
         Since scoreboard can be modified at any moment we could miss some
         results during the importing if someone has improved his position
-        and moved to a scoreboard `page` that has already been processed.
+        and moved to a scoreboard `page` that has already been fetched.
         """
-        paging = {"page_size": 50, "page": 1}
-        scoreboard_total = 0
+        titles, rows = fetch_contest_standings(
+            api,
+            contest.contest_id,
+            page_size=STANDINGS_PAGE_SIZE,
+            max_workers=max_workers or STANDINGS_MAX_WORKERS,
+        )
+        # Map participants to challenges once instead of querying by row
+        challenges = cls.objects.filter(
+            applicant__campaign_id=contest.campaign_id,
+            yandex_contest_id=contest.contest_id,
+            status=ChallengeStatuses.REGISTERED,
+        ).values_list("pk", "applicant__yandex_login", "contest_participant_id")
+        by_login = {}
+        by_participant_id = {}
+        for pk, yandex_login, participant_id in challenges:
+            if yandex_login:
+                by_login.setdefault(yandex_login, set()).add(pk)
+            if participant_id is not None:
+                by_participant_id.setdefault(participant_id, set()).add(pk)
+        to_update = {}
         updated_total = 0
+        for row in rows:
+            participant = row["participantInfo"]
+            challenge_ids = by_login.get(participant["login"], set()) | (
+                by_participant_id.get(participant["id"], set())
+            )
+            if not challenge_ids:
+                continue
+            total_score_str: str = row["score"].replace(",", ".")
+            total_score = int(round(float(total_score_str)))
+            score_details = [a["score"] for a in row["problemResults"]]
+            for pk in challenge_ids:
+                to_update[pk] = cls(
+                    pk=pk, score=total_score, details={"scores": score_details}
+                )
+            updated_total += len(challenge_ids)
         if not contest.details:
             contest.details = {}
-        while True:
-            try:
-                status, json_data = api.standings(contest.contest_id, **paging)
-                # XXX: Assignments order on a scoreboard could differ from
-                # the similar contest problems API call response
-                contest.details["titles"] = [t["name"] for t in json_data["titles"]]
-                contest.save(update_fields=("details",))
-                page_total = 0
-                for row in json_data["rows"]:
-                    scoreboard_total += 1
-                    page_total += 1
-                    total_score_str: str = row["score"].replace(",", ".")
-                    total_score = int(round(float(total_score_str)))
-                    score_details = [a["score"] for a in row["problemResults"]]
-                    update_fields = {
-                        "score": total_score,
-                        "details": {"scores": score_details},
-                    }
-                    yandex_login = row["participantInfo"]["login"]
-                    participant_id = row["participantInfo"]["id"]
-                    updated = cls.objects.filter(
-                        Q(applicant__yandex_login=yandex_login)
-                        | Q(contest_participant_id=participant_id),
-                        applicant__campaign_id=contest.campaign_id,
-                        yandex_contest_id=contest.contest_id,
-                        status=ChallengeStatuses.REGISTERED,
-                    ).update(**update_fields)
-                    updated_total += updated
-                if page_total < paging["page_size"]:
-                    break
-                paging["page"] += 1
-            except YandexContestError as e:
-                raise
+        # XXX: Assignments order on a scoreboard could differ from
+        # the similar contest problems API call response
+        contest.details["titles"] = [t["name"] for t in titles]
+        with transaction.atomic():
+            contest.save(update_fields=("details",))
+            cls.objects.bulk_update(
+                to_update.values(), fields=["score", "details"], batch_size=1000
+            )
         return YandexContestImportResults(
-            on_scoreboard=scoreboard_total, updated=updated_total
+            on_scoreboard=len(rows), updated=updated_total
         )
 
 
@@ -1430,6 +1486,21 @@ class InterviewStream(TimezoneAwareMixin, DerivableFieldsMixin, TimeStampedModel
                     _("Stream duration can't be less than slot duration")
                 )
 
+    def compute_fields(self, *derivable_fields: str, prefetch=False,
+                       commit=True) -> bool:
+        if commit:
+            return super().compute_fields(*derivable_fields,
+                                          prefetch=prefetch, commit=commit)
+        # Compute methods below write values with an atomic UPDATE, compare
+        # with the actual values without saving them instead
+        actual = (InterviewSlot.objects
+                  .filter(stream_id=self.pk)
+                  .aggregate(slots_count=Count("*"),
+                             slots_occupied_count=Count(
+                                 "*", filter=Q(interview__isnull=False))))
+        return any(getattr(self, field) != actual[field]
+                   for field in derivable_fields or self.derivable_fields)
+
     def _compute_slots_count(self):
         total = Subquery(
             InterviewSlot.objects.filter(stream_id=OuterRef("id"))
@@ -4,8 +4,8 @@ import pytest
 
 from django.core.exceptions import ValidationError
 
-from admission.constants import InterviewSections
-from admission.models import Applicant, Contest, Interview
+from admission.constants import ChallengeStatuses, InterviewSections
+from admission.models import Applicant, Contest, Interview, InterviewStream, Test
 from admission.tests.factories import (
     ApplicantFactory,
     CampaignFactory,
@@ -123,3 +123,71 @@ def test_interview_stream_slots_occupied():
     stream.refresh_from_db()
     assert stream.slots_count == 3
     assert stream.slots_occupied_count == 0
+
+
+@pytest.mark.django_db
+def test_interview_stream_compute_fields_check():
+    stream = InterviewStreamFactory(
+        start_at=datetime.time(14, 10), end_at=datetime.time(14, 50), duration=20
+    )
+    assert not stream.compute_fields(commit=False)
+    InterviewStream.objects.filter(pk=stream.pk).update(slots_count=0)
+    stream.refresh_from_db()
+    assert stream.compute_fields("slots_count", commit=False)
+    assert not stream.compute_fields("slots_occupied_count", commit=False)
+    stream.refresh_from_db()
+    assert stream.slots_count == 0
+
+
+@pytest.mark.django_db
+def test_yandex_contest_integration_import_scores(monkeypatch):
+    monkeypatch.setattr("admission.models.STANDINGS_PAGE_SIZE", 2)
+    campaign = CampaignFactory()
+    contest = ContestFactory(campaign=campaign, type=Contest.TYPE_TEST)
+    applicant1, applicant2, applicant3 = ApplicantFactory.create_batch(
+        3, campaign=campaign
+    )
+    Test.objects.filter(applicant__in=[applicant1, applicant2]).update(
+        yandex_contest_id=contest.contest_id, status=ChallengeStatuses.REGISTERED
+    )
+    Test.objects.filter(applicant=applicant2).update(contest_participant_id=42)
+    Test.objects.filter(applicant=applicant3).update(
+        yandex_contest_id=contest.contest_id, status=ChallengeStatuses.MANUAL
+    )
+
+    def row(login, participant_id, score):
+        return {
+            "participantInfo": {"login": login, "id": participant_id},
+            "score": score,
+            "problemResults": [{"score": score}],
+        }
+
+    rows = [
+        row(applicant1.yandex_login, 1, "10,0"),
+        row("unknown", 42, "7.6"),
+        row(applicant3.yandex_login, 3, "3"),
+        row("nobody", 4, "1"),
+        row("nobody2", 5, "2"),
+    ]
+
+    class FakeAPI:
+        def standings(self, contest_id, page_size, page):
+            offset = (page - 1) * page_size
+            json_data = {
+                "titles": [{"name": "A"}],
+                "rows": rows[offset:offset + page_size],
+            }
+            return 200, json_data
+
+    results = Test.import_scores(api=FakeAPI(), contest=contest)
+    assert results.on_scoreboard == 5
+    assert results.updated == 2
+    applicant1.online_test.refresh_from_db()
+    assert applicant1.online_test.score == 10
+    assert applicant1.online_test.details == {"scores": ["10,0"]}
+    applicant2.online_test.refresh_from_db()
+    assert applicant2.online_test.score == 8
+    applicant3.online_test.refresh_from_db()
+    assert applicant3.online_test.details == {}
+    contest.refresh_from_db()
+    assert contest.details["titles"] == ["A"]
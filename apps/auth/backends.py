@@ -1,11 +1,17 @@
+import contextlib
 import logging
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
 
 from social_core.backends.gitlab import GitLabOAuth2
 from social_core.backends.oauth import BaseOAuth2
 from social_core.utils import handle_http_errors
 
 from django.contrib.auth import get_user_model
+from django.db import models
+from django.utils.hashable import make_hashable
 
+from .permissions import PermissionId, Role
 from .registry import role_registry
 
 logger = logging.getLogger(__name__)
@@ -13,6 +19,95 @@ logger = logging.getLogger(__name__)
 UserModel = get_user_model()
 
 
+# Ordered chain of checks compiled for the permission name, each check is
+# a tuple of (role, permission name to test, is terminal). The result of
+# the terminal check is the result of the whole chain, the chain is
+# successful if any of non-terminal (object level) checks returns True.
+PermissionChain = List[Tuple[Role, PermissionId, bool]]
+
+
+class PermissionCheckCache:
+    """
+    Memoizes results of the `(user, perm, obj)` checks. Lives no longer
+    than the request since permission rules depend on the object state.
+    """
+    def __init__(self):
+        self._results: Dict[Any, bool] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.
+
+    def get(self, key) -> Optional[bool]:
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def set(self, key, result: bool) -> None:
+        self._results[key] = result
+
+
+_permission_check_cache: ContextVar[Optional[PermissionCheckCache]] = ContextVar(
+    'permission_check_cache', default=None)
+
+
+def _log_permission_check_cache_stats(cache: PermissionCheckCache) -> None:
+    if cache.hits or cache.misses:
+        logger.debug(f"Permission checks: {cache.hits} hits, "
+                     f"{cache.misses} misses, "
+                     f"hit rate {cache.hit_rate:.2f}")
+
+
+def enable_permission_check_cache() -> PermissionCheckCache:
+    """
+    Enables memoization of the permission checks in the current context
+    until `disable_permission_check_cache` is called.
+    """
+    cache = PermissionCheckCache()
+    _permission_check_cache.set(cache)
+    return cache
+
+
+def disable_permission_check_cache() -> None:
+    cache = _permission_check_cache.get()
+    _permission_check_cache.set(None)
+    if cache is not None:
+        _log_permission_check_cache_stats(cache)
+
+
+@contextlib.contextmanager
+def permission_check_cache():
+    """
+    Enables memoization of the permission checks within the context.
+    """
+    cache = PermissionCheckCache()
+    token = _permission_check_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _permission_check_cache.reset(token)
+        _log_permission_check_cache_stats(cache)
+
+
+def get_permission_check_object_key(obj):
+    """
+    Model instances are equal if they have the same pk, field values
+    are a part of the key to avoid stale results for the object modified
+    within the request. Raises TypeError for unhashable objects.
+    """
+    if isinstance(obj, models.Model):
+        field_values = [obj.__dict__.get(f.attname) for f in obj._meta.concrete_fields]
+        return obj.__class__, obj.pk, make_hashable(field_values)
+    hash(obj)
+    return obj
+
+
 class RBACPermissions:
     """
     Backend uses RBAC model approach allowing to check permissions
@@ -21,6 +116,10 @@ class RBACPermissions:
     Implementation relies on `UserModel.roles` attribute that must return
     set of available roles for the user.
     """
+    # Compiled permission chains grouped by the sorted set of roles
+    _compiled_chains: Dict[Tuple, Dict[PermissionId, PermissionChain]] = {}
+    MAX_COMPILED_ROLE_SETS = 1000
+
     def authenticate(self, *args, **kwargs):
         return None
 
@@ -28,40 +127,89 @@ class RBACPermissions:
         if not user.is_active and not user.is_anonymous:
             return False
         if user.is_anonymous:
-            return self._has_perm(user, perm, {role_registry.anonymous_role}, obj)
+            roles = [role_registry.anonymous_role]
         elif hasattr(user, 'roles'):
-            roles = [role_registry.anonymous_role, role_registry.authenticated_role]
-            for role_code in user.roles:
-                if role_code not in role_registry:
-                    logger.warning(f'Role with a code {role_code} is not '
-                                   f'registered but assigned to the user {user}')
-                    continue
-                role = role_registry[role_code]
-                roles.append(role)
-            roles.sort(key=lambda r: r.priority)
-            return self._has_perm(user, perm, roles, obj)
+            roles = self._get_roles(user)
+        else:
+            return False
+        roles_key = tuple((role, role.version) for role in roles)
+        cache = _permission_check_cache.get()
+        if cache is None:
+            return self._has_perm(user, perm, roles_key, roles, obj)
+        try:
+            obj_key = get_permission_check_object_key(obj)
+            cache_key = (roles_key, user.pk, perm, obj_key)
+            result = cache.get(cache_key)
+        except TypeError:  # unhashable object
+            return self._has_perm(user, perm, roles_key, roles, obj)
+        if result is None:
+            result = self._has_perm(user, perm, roles_key, roles, obj)
+            cache.set(cache_key, result)
+        return result
+
+    @staticmethod
+    def _get_roles(user) -> List[Role]:
+        roles = [role_registry.anonymous_role, role_registry.authenticated_role]
+        for role_code in user.roles:
+            if role_code not in role_registry:
+                logger.warning(f'Role with a code {role_code} is not '
+                               f'registered but assigned to the user {user}')
+                continue
+            role = role_registry[role_code]
+            roles.append(role)
+        roles.sort(key=lambda r: r.priority)
+        return roles
+
+    def _has_perm(self, user, perm_name, roles_key, roles, obj) -> bool:
+        for role, rule_name, is_terminal in self._get_chain(roles_key, roles, perm_name):
+            # Related `Permission.rule` checks only object level permission
+            if not is_terminal and obj is None:
+                continue
+            result = role.permissions[rule_name].test(user, obj)
+            if is_terminal:
+                return result
+            # Don't terminate access check here since less priority
+            # role still could have a permission relation that returns
+            # positive result
+            if result:
+                return True
         return False
 
-    def _has_perm(self, user, perm_name, roles, obj):
+    def _get_chain(self, roles_key, roles, perm_name) -> PermissionChain:
+        compiled = self._compiled_chains.get(roles_key)
+        if compiled is None:
+            if len(self._compiled_chains) >= self.MAX_COMPILED_ROLE_SETS:
+                self._compiled_chains.clear()
+            compiled = self._compiled_chains.setdefault(roles_key, {})
+        if perm_name not in compiled:
+            compiled[perm_name] = self._compile_chain(roles, perm_name)
+        return compiled[perm_name]
+
+    @classmethod
+    def _compile_chain(cls, roles, perm_name) -> PermissionChain:
+        chain = []
         for role in roles:
             if role.permissions.rule_exists(perm_name):
-                return role.permissions[perm_name].test(user, obj)
+                chain.append((role, perm_name, True))
+                break
             # Case when using base permission name, e.g.,
             # `.has_perm('update_comment', obj)` and expecting
             # .has_perm('update_own_comment', obj) will be in a call chain
             # if relation exists
             if perm_name in role.relations:
-                # Related `Permission.rule` checks only object level
-                # permission
-                if obj is None:
-                    continue
-                for rel_perm_name in role.relations[perm_name]:
-                    # Don't terminate access check here since less priority
-                    # role still could have a permission relation that returns
-                    # positive result
-                    if self._has_perm(user, rel_perm_name, {role}, obj):
-                        return True
-        return False
+                cls._compile_relations(role, perm_name, chain, {perm_name})
+        return chain
+
+    @classmethod
+    def _compile_relations(cls, role, perm_name, chain, visited) -> None:
+        for rel_perm_name in role.relations[perm_name]:
+            if rel_perm_name in visited:
+                continue
+            if role.permissions.rule_exists(rel_perm_name):
+                chain.append((role, rel_perm_name, False))
+            elif rel_perm_name in role.relations:
+                cls._compile_relations(role, rel_perm_name, chain,
+                                       visited | {rel_perm_name})
 
     def has_module_perms(self, user, app_label):
         return self.has_perm(user, app_label)
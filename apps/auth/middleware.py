@@ -5,6 +5,9 @@ from django.contrib.auth.middleware import \
 from django.contrib.auth.models import AnonymousUser
 from django.utils.functional import SimpleLazyObject
 
+from auth.backends import (
+    disable_permission_check_cache, enable_permission_check_cache
+)
 from users.models import ExtendedAnonymousUser
 
 
@@ -25,3 +28,9 @@ class AuthenticationMiddleware(_AuthenticationMiddleware):
             "'django.contrib.auth.middleware.AuthenticationMiddleware'."
         ) % ("_CLASSES" if settings.MIDDLEWARE is None else "")
         request.user = SimpleLazyObject(lambda: get_user(request))
+        # Permission checks are memoized until the response is ready
+        enable_permission_check_cache()
+
+    def process_response(self, request, response):
+        disable_permission_check_cache()
+        return response
@@ -90,6 +90,9 @@ class Role:
         # additional db hits check permissions of the highest priority roles
         # first since they have a higher chance to return positive result.
         self.priority = priority  # The less value the higher priority
+        # Incremented on any change of permissions or relations, helps to
+        # invalidate compiled permission checks
+        self.version = 0
         self._permissions: RuleSet = RuleSet()
         for perm in permissions:
             if not issubclass(perm, Permission):
@@ -111,6 +114,7 @@ class Role:
             raise PermissionNotRegistered(msg)
         pred = always_true if perm.rule is None else perm.rule
         self._permissions.add_rule(perm.name, pred)
+        self.version += 1
 
     def has_permission(self, perm: Union[str, Type[Permission]]) -> bool:
         if isinstance(perm, str):
@@ -178,6 +182,7 @@ class Role:
         if parent not in self._relations:
             self._relations[parent] = set()
         self._relations[parent].add(child)
+        self.version += 1
 
     def has_relation(self, parent: Type[Permission], child: Type[Permission]):
         return parent.name in self._relations and child.name in self._relations[parent.name]
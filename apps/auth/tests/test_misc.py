@@ -1,8 +1,12 @@
 import pytest
 import rules
 
-from auth.backends import RBACModelBackend, RBACPermissions
+from auth.backends import (
+    RBACModelBackend, RBACPermissions, _permission_check_cache,
+    permission_check_cache
+)
 from auth.errors import PermissionNotRegistered
+from auth.middleware import AuthenticationMiddleware
 from auth.permissions import Permission, Role, perm_registry
 from auth.registry import role_registry
 from users.tests.factories import UserFactory
@@ -161,3 +165,82 @@ def test_rbac_backend_has_perm_role_priority(mocker):
     user.roles = {'role1', 'role2', 'role3'}
     # role3.priority > role1.priority => check Permission3 predicate
     assert RBACPermissions().has_perm(user, Permission3.name, Permission3.VALID_VALUE)
+
+
+@pytest.mark.django_db
+def test_rbac_backend_permission_check_cache(mocker):
+    mocker.patch.dict(role_registry._registry, clear=True)
+    mocker.patch.dict(perm_registry._dict, clear=True)
+    role_registry._register_default_roles()
+    calls = []
+
+    class CountedPermission(Permission):
+        name = 'test_counted_permission'
+
+        @staticmethod
+        @rules.predicate
+        def rule(user, obj):
+            calls.append(obj)
+            return obj == 42
+
+    perm_registry.add_permission(CountedPermission)
+    role = Role(id='role1', description="TestRole1", priority=10,
+                permissions=(CountedPermission,))
+    role_registry.register(role)
+    user = UserFactory()
+    user.roles = {'role1'}
+    backend = RBACPermissions()
+    with permission_check_cache() as cache:
+        assert backend.has_perm(user, CountedPermission.name, 42)
+        assert backend.has_perm(user, CountedPermission.name, 42)
+        assert not backend.has_perm(user, CountedPermission.name, 43)
+        # Unhashable objects are not memoized
+        assert not backend.has_perm(user, CountedPermission.name, [42])
+    assert cache.hits == 1
+    assert cache.misses == 2
+    assert len(calls) == 3
+    # Results are not memoized outside of the context
+    assert backend.has_perm(user, CountedPermission.name, 42)
+    assert len(calls) == 4
+
+
+@pytest.mark.django_db
+def test_rbac_backend_permission_check_cache_modified_object(mocker):
+    mocker.patch.dict(role_registry._registry, clear=True)
+    mocker.patch.dict(perm_registry._dict, clear=True)
+    role_registry._register_default_roles()
+
+    class ActivePermission(Permission):
+        name = 'test_active_permission'
+
+        @staticmethod
+        @rules.predicate
+        def rule(user, obj):
+            return obj.is_active
+
+    perm_registry.add_permission(ActivePermission)
+    role = Role(id='role1', description="TestRole1", priority=10,
+                permissions=(ActivePermission,))
+    role_registry.register(role)
+    user = UserFactory()
+    user.roles = {'role1'}
+    obj = UserFactory(is_active=True)
+    backend = RBACPermissions()
+    with permission_check_cache() as cache:
+        assert backend.has_perm(user, ActivePermission.name, obj)
+        assert backend.has_perm(user, ActivePermission.name, obj)
+        # Object state is a part of the key
+        obj.is_active = False
+        assert not backend.has_perm(user, ActivePermission.name, obj)
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_authentication_middleware_permission_check_cache(rf):
+    request = rf.get('/')
+    request.session = {}
+    middleware = AuthenticationMiddleware(lambda r: None)
+    middleware.process_request(request)
+    assert _permission_check_cache.get() is not None
+    middleware.process_response(request, None)
+    assert _permission_check_cache.get() is None
@@ -5,6 +5,7 @@ from enum import IntEnum
 from urllib.parse import quote_plus, urljoin
 
 import requests
+from requests.adapters import HTTPAdapter
 # TODO: refactor based on this article https://medium.com/@hakibenita/working-with-apis-the-pythonic-way-484784ed1ce0 (see exceptions part)
 from rest_framework.exceptions import APIException
 
@@ -19,6 +20,9 @@ REQUIRED_SETTINGS = [
     "GERRIT_CLIENT_HTTP_PASSWORD",
 ]
 
+# Max number of keep-alive connections reused by the client
+GERRIT_CLIENT_POOL_SIZE = 10
+
 for attr in REQUIRED_SETTINGS:
     if not hasattr(settings, attr):
         raise ImproperlyConfigured(
@@ -108,9 +112,16 @@ class Response:
 
 # TODO: create service user (e.g. for Jenkins)
 class Gerrit:
-    def __init__(self, api_url, auth):
+    def __init__(self, api_url, auth, pool_size=GERRIT_CLIENT_POOL_SIZE):
         self.api_url = api_url
         self.auth = auth
+        # Session is safe to share among threads that make
+        # independent requests
+        self.session = requests.Session()
+        self.session.auth = auth
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
     def _request(self, method, uri, **kwargs):
         url = urljoin(self.api_url, uri)
@@ -122,7 +133,7 @@ class Gerrit:
             # if the named resource already exists.
             headers["If-None-Match"] = "*"
         kwargs["headers"] = headers
-        response = requests.request(method, url, auth=self.auth, **kwargs)
+        response = self.session.request(method, url, **kwargs)
         return Response(response)
 
     def get_group(self, group_name):
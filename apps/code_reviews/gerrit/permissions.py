@@ -80,6 +80,20 @@ def grant_student_access(client, project_name, git_branch_name, group_uuid):
     return client.grant_permissions(project_name, payload)
 
 
+def grant_students_access(client, project_name, branch_groups):
+    """
+    Set permissions on branches for student groups in a single request.
+    `branch_groups` maps git branch name to the student group uuid.
+    """
+    payload = {"remove": {}, "add": {}}
+    for git_branch_name, group_uuid in branch_groups.items():
+        access = get_default_students_project_access(group_uuid,
+                                                     git_branch_name)
+        payload["remove"].update(access["remove"])
+        payload["add"].update(access["add"])
+    return client.grant_permissions(project_name, payload)
+
+
 def grant_students_read_master(client, project_name, group_uuid):
     xallow = {
         "exclusive": False,
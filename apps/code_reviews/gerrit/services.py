@@ -1,10 +1,12 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
 
 from django.conf import settings
+from django.db import transaction
 from django.db.models import prefetch_related_objects
-from django.utils import translation
+from django.utils import timezone, translation
 
 from code_reviews.api.gerrit import Gerrit, GerritAPIError
 from code_reviews.api.ldap import LDAPClient, init_ldap_connection
@@ -13,7 +15,7 @@ from code_reviews.gerrit.ldap_service import (
     connect_gerrit_auth_provider, get_ldap_username, update_ldap_user_password_hash
 )
 from code_reviews.gerrit.permissions import (
-    grant_personal_sandbox, grant_reviewers_access, grant_student_access,
+    grant_personal_sandbox, grant_reviewers_access, grant_students_access,
     grant_students_read_master
 )
 from code_reviews.models import GerritChange
@@ -24,10 +26,16 @@ from learning.models import (
     AssignmentComment, AssignmentSubmissionTypes, Enrollment, StudentAssignment
 )
 from learning.services import StudentGroupService
+from tasks.models import Task
 from users.models import StudentProfile, User
 
 logger = logging.getLogger(__name__)
 
+GERRIT_PROVISIONING_TASK_NAME = "code_reviews.gerrit.tasks.provision_gerrit_project"
+# Number of students provisioned between progress checkpoints
+GERRIT_PROVISIONING_BATCH_SIZE = 50
+GERRIT_PROVISIONING_MAX_WORKERS = 8
+
 
 def get_project_name(course: Course) -> str:
     main_branch = course.main_branch.code
@@ -57,7 +65,8 @@ def get_students_group_name(course: Course) -> str:
     return f"{project_name}-students"
 
 
-def init_project_for_course(course: Course, skip_users: bool = False):
+def init_project_for_course(course: Course, skip_users: bool = False,
+                            task: Optional[Task] = None) -> bool:
     """
     Init gerrit project:
     1. Create reviewers group if not exists
@@ -67,6 +76,12 @@ def init_project_for_course(course: Course, skip_users: bool = False):
     4. Create students group, grunt permissions to the project, for each
     enrolled student create gerrit group and add them to the students group
     5. Grant students access to the personal sandbox
+
+    Provide `task` to save progress of the students provisioning, students
+    provisioned by the previous run of the same task are skipped.
+
+    Returns False if some step has failed (see logs), the project could
+    be partially provisioned in this case.
     """
     prefetch_related_objects([course], 'branches')
     gerrit_client = Gerrit(settings.GERRIT_API_URI,
@@ -86,7 +101,7 @@ def init_project_for_course(course: Course, skip_users: bool = False):
         if not reviewers_group_res.already_exists:
             logger.error(f"Error on creating reviewers group. "
                          f"Response: {reviewers_group_res.text}")
-            return
+            return False
         reviewers_group_res = gerrit_client.get_group(reviewers_group_name)
     reviewers_group_uuid = reviewers_group_res.data["id"]
     # Create project
@@ -98,14 +113,14 @@ def init_project_for_course(course: Course, skip_users: bool = False):
     })
     if not (project_res.created or project_res.already_exists):
         logger.error(f"Project hasn't been created. {project_res.text}")
-        return
+        return False
     gerrit_client.create_git_branch(project_name, "master")  # init master branch
     # Grant reviewers Push, Create Reference and Read Access to all branches
     res = grant_reviewers_access(gerrit_client, project_name, reviewers_group_uuid)
     if not res.ok:
         logger.error(f"Couldn't set permissions for group "
                      f"{reviewers_group_name}. {res.text}")
-        return
+        return False
     # Add reviewers to the project
     course_teachers = get_course_teachers(course=course)
     for course_teacher in course_teachers:
@@ -115,7 +130,7 @@ def init_project_for_course(course: Course, skip_users: bool = False):
             updated = update_ldap_user_password_hash(ldap_client, user)
             if not updated:
                 logger.error(f"Password hash for user {user.pk} wasn't changed")
-                return
+                return False
     reviewers_group_members = [get_ldap_username(t.teacher) for t in course_teachers]
     members_res = gerrit_client.get_group_members(reviewers_group_uuid)
     members = {m["username"] for m in members_res.data}
@@ -125,7 +140,7 @@ def init_project_for_course(course: Course, skip_users: bool = False):
     if not response.ok:
         logger.error(f"Couldn't add new reviewers to group "
                      f"{reviewers_group_uuid}. Message: {response.text}")
-        return
+        return False
     res = gerrit_client.delete_group_members(reviewers_group_uuid, list(to_delete))
     if not res.ok:
         logger.warning(f"Couldn't remove reviewers from group "
@@ -140,7 +155,7 @@ def init_project_for_course(course: Course, skip_users: bool = False):
     if not students_group_res.created:
         if not students_group_res.already_exists:
             logger.error(f"Student group `{students_group_name}` hasn't been created.")
-            return
+            return False
         students_group_res = gerrit_client.get_group(students_group_name)
     # Permits read master branch (allows to call git clone)
     students_group_uuid = students_group_res.data['id']
@@ -160,21 +175,26 @@ def init_project_for_course(course: Course, skip_users: bool = False):
                            students_group_uuid=students_group_uuid)
 
     if skip_users:
-        return
+        return True
 
     # For each enrolled student create separated branch
     enrollments = (Enrollment.active
                    .filter(course=course)
                    .select_related("student_profile__user",
-                                   "student_profile__branch"))
-    for e in enrollments:
-        add_student_to_project(gerrit_client=gerrit_client,
-                               ldap_client=ldap_client,
-                               student_profile=e.student_profile,
-                               course=course,
-                               students_group_uuid=students_group_uuid)
+                                   "student_profile__branch")
+                   .order_by("pk"))
+    add_students_to_project(gerrit_client=gerrit_client,
+                            ldap_client=ldap_client,
+                            student_profiles=[e.student_profile for e in enrollments],
+                            course=course,
+                            students_group_uuid=students_group_uuid,
+                            task=task)
     # TODO: What to do with notifications?
     ldap_connection.unbind_s()
+    if task is not None:
+        progress = task.progress or {}
+        return len(progress.get("provisioned", [])) == progress.get("total", 0)
+    return True
 
 
 def add_student_to_project(*, gerrit_client: Gerrit,
@@ -182,7 +202,6 @@ def add_student_to_project(*, gerrit_client: Gerrit,
                            course: Course,
                            ldap_client: LDAPClient,
                            students_group_uuid=None):
-    user = student_profile.user
     if students_group_uuid is None:
         students_group_name = get_students_group_name(course)
         students_group_res = gerrit_client.get_group(students_group_name)
@@ -190,6 +209,112 @@ def add_student_to_project(*, gerrit_client: Gerrit,
             logger.error('Students group for the project was not found')
             return
         students_group_uuid = students_group_res.data['id']
+    add_students_to_project(gerrit_client=gerrit_client,
+                            ldap_client=ldap_client,
+                            student_profiles=[student_profile],
+                            course=course,
+                            students_group_uuid=students_group_uuid)
+
+
+def add_students_to_project(*, gerrit_client: Gerrit,
+                            ldap_client: LDAPClient,
+                            student_profiles: List[StudentProfile],
+                            course: Course,
+                            students_group_uuid: str,
+                            task: Optional[Task] = None) -> int:
+    """
+    Creates personal groups and branches for students in batches.
+    Gerrit requests that are independent for each student are sent
+    concurrently, LDAP operations are synchronous since LDAP connection
+    can't be shared among threads.
+
+    All steps are idempotent. Ids of the provisioned student profiles are
+    saved in `task` after each batch, they are skipped on the next run.
+    Returns the number of students provisioned by this call.
+    """
+    progress = task.progress if task is not None else {}
+    provisioned = set(progress.get("provisioned", []))
+    student_profiles = [sp for sp in student_profiles
+                        if sp.pk is None or sp.pk not in provisioned]
+    total = len(provisioned) + len(student_profiles)
+    provisioned_total = 0
+    batch_size = GERRIT_PROVISIONING_BATCH_SIZE
+    with ThreadPoolExecutor(max_workers=GERRIT_PROVISIONING_MAX_WORKERS) as executor:
+        for offset in range(0, len(student_profiles), batch_size):
+            batch = student_profiles[offset:offset + batch_size]
+            added = _add_students_batch(executor,
+                                        gerrit_client=gerrit_client,
+                                        ldap_client=ldap_client,
+                                        student_profiles=batch,
+                                        course=course,
+                                        students_group_uuid=students_group_uuid)
+            provisioned_total += len(added)
+            if task is not None:
+                provisioned.update(sp.pk for sp in added)
+                task.progress = {
+                    "total": total,
+                    "provisioned": sorted(provisioned),
+                }
+                # Extends the lock of the running task
+                task.locked_at = timezone.now()
+                task.save(update_fields=["progress", "locked_at", "modified"])
+            logger.info(f"Provisioned {len(added)} of {len(batch)} students "
+                        f"of the batch")
+    return provisioned_total
+
+
+def _add_students_batch(executor: ThreadPoolExecutor, *,
+                        gerrit_client: Gerrit,
+                        ldap_client: LDAPClient,
+                        student_profiles: List[StudentProfile],
+                        course: Course,
+                        students_group_uuid: str) -> List[StudentProfile]:
+    project_name = get_project_name(course)
+    # Branch names are resolved in the main thread since it could
+    # hit the database
+    candidates = [(sp, get_branch_name(sp, course)) for sp in student_profiles
+                  if _connect_ldap_account(ldap_client, sp.user)]
+    # Make sure user groups exist
+    group_uuids = executor.map(
+        lambda c: get_or_create_user_group(gerrit_client, c[0].user),
+        candidates)
+    candidates = [(sp, git_branch_name, group_uuid) for (sp, git_branch_name), group_uuid
+                  in zip(candidates, group_uuids) if group_uuid]
+    if not candidates:
+        return []
+    # Permits read master branch by adding to students group
+    res = gerrit_client.include_group(students_group_uuid,
+                                      [group_uuid for *_, group_uuid in candidates])
+    if not res.ok:
+        logger.error(f"Couldn't add user groups to the common student group. "
+                     f"{res.text}")
+        return []
+    # Create personal branches
+    branch_responses = executor.map(
+        lambda c: gerrit_client.create_git_branch(project_name, c[1], {
+            "revision": "master"
+        }),
+        candidates)
+    created = []
+    for (sp, git_branch_name, group_uuid), res in zip(candidates, branch_responses):
+        if res.created or res.already_exists:
+            created.append((sp, git_branch_name, group_uuid))
+        else:
+            logger.error(f"Personal branch {git_branch_name} hasn't been "
+                         f"created. {res.text}")
+    if not created:
+        return []
+    res = grant_students_access(gerrit_client, project_name, {
+        git_branch_name: group_uuid for _, git_branch_name, group_uuid in created
+    })
+    if not res.ok:
+        logger.error(f"Couldn't set permissions for personal branches. "
+                     f"{res.text}")
+        return []
+    return [sp for sp, *_ in created]
+
+
+def _connect_ldap_account(ldap_client: LDAPClient, user: User) -> bool:
     # Create ldap user with create_ldap_user() method or update password hash
     created = connect_gerrit_auth_provider(ldap_client, user)
     if not created:
@@ -197,26 +322,32 @@ def add_student_to_project(*, gerrit_client: Gerrit,
         updated = update_ldap_user_password_hash(ldap_client, user)
         if not updated:
             logger.error(f"Password hash for user {user.pk} wasn't changed")
-            return
-    project_name = get_project_name(course)
-    # Make sure user group exists
-    logger.info(f"Creating gerrit internal group for user {user.pk}")
-    user_group_uuid = get_or_create_user_group(gerrit_client, user)
-    if not user_group_uuid:
-        return
-    # Permits read master branch by adding to students group
-    logger.info(f"Add user {user.pk} to the common student group")
-    gerrit_client.include_group(students_group_uuid, user_group_uuid)
-    # Create personal branch
-    logger.info(f"Creating personal branch for user {user.pk}")
-    git_branch_name = get_branch_name(student_profile, course)
-    gerrit_client.create_git_branch(project_name, git_branch_name, {
-        "revision": "master"
-    })
-    logger.info(f"Granting permissions to the user {user.pk}")
-    # TODO: show errors
-    grant_student_access(gerrit_client, project_name, git_branch_name,
-                         user_group_uuid)
+            return False
+    return True
+
+
+def schedule_gerrit_project_provisioning(course: Course,
+                                         author: Optional[User] = None) -> Task:
+    """
+    Adds job for project provisioning to the queue. An unfinished task
+    of the course is reused to resume provisioning from the last checkpoint.
+    """
+    from code_reviews.gerrit.tasks import provision_gerrit_project
+    task = Task.build(task_name=GERRIT_PROVISIONING_TASK_NAME,
+                      kwargs={"course_id": course.pk},
+                      creator=author)
+    same_task_in_a_queue = (Task.objects
+                            .filter(task_name=task.task_name,
+                                    task_hash=task.task_hash,
+                                    processed_at__isnull=True)
+                            .order_by("-id")
+                            .first())
+    if same_task_in_a_queue is None:
+        task.save()
+    else:
+        task = same_task_in_a_queue
+    transaction.on_commit(lambda: provision_gerrit_project.delay(task_id=task.pk))
+    return task
 
 
 def get_test_student_profile(course: Course) -> StudentProfile:
@@ -5,6 +5,7 @@ from django_rq import job
 
 from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from auth.models import ConnectedAuthService
@@ -15,7 +16,7 @@ from code_reviews.gerrit.ldap_service import (
 )
 from code_reviews.gerrit.services import (
     get_or_create_change, list_change_files, normalize_code_review_score, get_reviewers_group_name,
-    add_student_to_project
+    add_student_to_project, init_project_for_course
 )
 from code_reviews.models import GerritChange
 from courses.constants import AssignmentStatus
@@ -26,10 +27,13 @@ from learning.services.personal_assignment_service import (
     create_personal_assignment_review
 )
 from learning.settings import AssignmentScoreUpdateSource
+from tasks.models import Task
 from users.models import User
 
 logger = logging.getLogger(__name__)
 
+GERRIT_PROVISIONING_TIMEOUT = 3600  # in seconds
+
 
 @job('high')
 def update_password_in_gerrit(*, user_id: int):
@@ -174,6 +178,43 @@ def add_student_to_gerrit_project(enrollment_id: int):
                                course=course)
 
 
+@job('default', timeout=GERRIT_PROVISIONING_TIMEOUT)
+def provision_gerrit_project(*, task_id: int):
+    try:
+        task = Task.objects.unlocked(timezone.now()).get(pk=task_id)
+    except Task.DoesNotExist:
+        logger.info(f"Task with id = {task_id} not found or locked.")
+        return None
+    if task.is_completed or task.lock(locked_by="rqworker") is None:
+        return None
+    course = Course.objects.get(pk=task.task_params["course_id"])
+    try:
+        is_provisioned = init_project_for_course(course, task=task)
+    except Exception as e:
+        logger.exception(f"Failed to provision gerrit project for task {task_id}")
+        _release_provisioning_task(task, error=str(e) or e.__class__.__name__)
+        raise
+    if not is_provisioned:
+        logger.error(f"Gerrit project for task {task_id} is partially "
+                     f"provisioned")
+        _release_provisioning_task(task, error="Project is partially "
+                                               "provisioned, see logs")
+        return None
+    task.error = ""
+    task.complete()
+
+
+def _release_provisioning_task(task: Task, *, error: str) -> None:
+    """
+    Unlocks not completed task to resume provisioning on the next run
+    from the last saved checkpoint.
+    """
+    task.error = error
+    task.locked_by = None
+    task.locked_at = None
+    task.save(update_fields=["error", "locked_by", "locked_at", "modified"])
+
+
 @job('default')
 def add_teacher_to_gerrit_project(course_id: int, teacher_id: int):
     course = Course.objects.get(pk=course_id)
@@ -4,17 +4,27 @@ import pytest
 from rq.job import Job
 
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 
 from auth.mixins import RolePermissionRequiredMixin
 from auth.tests.factories import ConnectedAuthServiceFactory
-from code_reviews.gerrit.services import normalize_code_review_score
-from code_reviews.gerrit.tasks import import_gerrit_code_review_score
+from code_reviews.gerrit.permissions import grant_students_access
+from code_reviews.gerrit.services import (
+    GERRIT_PROVISIONING_TASK_NAME, add_students_to_project,
+    normalize_code_review_score
+)
+from code_reviews.gerrit.tasks import (
+    import_gerrit_code_review_score, provision_gerrit_project
+)
 from code_reviews.tests.factories import GerritChangeFactory
 from core.urls import reverse
 from courses.constants import AssignmentStatus
-from courses.tests.factories import AssignmentFactory
+from courses.tests.factories import AssignmentFactory, CourseFactory
 from learning.permissions import EditStudentAssignment
-from users.tests.factories import CuratorFactory, TeacherFactory
+from tasks.models import Task
+from users.tests.factories import (
+    CuratorFactory, StudentProfileFactory, TeacherFactory
+)
 
 
 @pytest.mark.django_db
@@ -130,3 +140,117 @@ def test_task_import_gerrit_code_review_score(settings):
     student_assignment.refresh_from_db()
     assert student_assignment.score == maximum_score
     assert student_assignment.status == AssignmentStatus.NEED_FIXES
+
+
+def test_permissions_grant_students_access(mocker):
+    client = mocker.Mock()
+    grant_students_access(client, 'project', {'b1': 'uuid1', 'b2': 'uuid2'})
+    assert client.grant_permissions.call_count == 1
+    project_name, payload = client.grant_permissions.call_args.args
+    assert set(payload['add']) == {'refs/heads/b1', 'refs/for/refs/heads/b1',
+                                   'refs/heads/b2', 'refs/for/refs/heads/b2'}
+    assert payload['remove'].keys() == payload['add'].keys()
+
+
+@pytest.mark.django_db
+def test_services_add_students_to_project(mocker):
+    mocker.patch('code_reviews.gerrit.services._connect_ldap_account',
+                 return_value=True)
+    course = CourseFactory()
+    student_profiles = StudentProfileFactory.create_batch(3, branch=course.main_branch)
+    gerrit_client = mocker.Mock()
+    gerrit_client.create_single_user_group.return_value.created = True
+    gerrit_client.create_single_user_group.return_value.data = {'id': 'uuid'}
+    gerrit_client.create_git_branch.return_value.created = True
+    task = Task.build(task_name='provision')
+    task.save()
+    provisioned = add_students_to_project(gerrit_client=gerrit_client,
+                                          ldap_client=mocker.Mock(),
+                                          student_profiles=student_profiles,
+                                          course=course,
+                                          students_group_uuid='students',
+                                          task=task)
+    assert provisioned == 3
+    # Group members and permissions are updated in bulk
+    assert gerrit_client.include_group.call_count == 1
+    assert gerrit_client.grant_permissions.call_count == 1
+    assert gerrit_client.create_git_branch.call_count == 3
+    task.refresh_from_db()
+    assert task.progress['total'] == 3
+    assert set(task.progress['provisioned']) == {sp.pk for sp in student_profiles}
+    # Provisioned students are skipped on the next run
+    new_student_profile = StudentProfileFactory(branch=course.main_branch)
+    provisioned = add_students_to_project(gerrit_client=gerrit_client,
+                                          ldap_client=mocker.Mock(),
+                                          student_profiles=[*student_profiles,
+                                                            new_student_profile],
+                                          course=course,
+                                          students_group_uuid='students',
+                                          task=task)
+    assert provisioned == 1
+    assert gerrit_client.create_git_branch.call_count == 4
+    task.refresh_from_db()
+    assert task.progress['total'] == 4
+
+
+@pytest.mark.django_db
+def test_services_add_students_to_project_batch_failure(mocker):
+    mocker.patch('code_reviews.gerrit.services._connect_ldap_account',
+                 return_value=True)
+    course = CourseFactory()
+    student_profiles = StudentProfileFactory.create_batch(3, branch=course.main_branch)
+    gerrit_client = mocker.Mock()
+    gerrit_client.create_single_user_group.return_value.created = True
+    gerrit_client.create_single_user_group.return_value.data = {'id': 'uuid'}
+    gerrit_client.include_group.return_value.ok = False
+    task = Task.build(task_name='provision')
+    task.save()
+    provisioned = add_students_to_project(gerrit_client=gerrit_client,
+                                          ldap_client=mocker.Mock(),
+                                          student_profiles=student_profiles,
+                                          course=course,
+                                          students_group_uuid='students',
+                                          task=task)
+    assert provisioned == 0
+    assert gerrit_client.create_git_branch.call_count == 0
+    task.refresh_from_db()
+    assert task.progress == {'total': 3, 'provisioned': []}
+
+
+@pytest.mark.django_db
+def test_task_provision_gerrit_project_partially_provisioned(mocker):
+    course = CourseFactory()
+    task = Task.build(task_name=GERRIT_PROVISIONING_TASK_NAME,
+                      kwargs={"course_id": course.pk})
+    task.progress = {'total': 3, 'provisioned': [1]}
+    task.save()
+    mocked = mocker.patch('code_reviews.gerrit.tasks.init_project_for_course',
+                          return_value=False)
+    provision_gerrit_project(task_id=task.pk)
+    mocked.assert_called_once()
+    task.refresh_from_db()
+    # Failed task is unlocked and resumed on the next run
+    assert not task.is_completed
+    assert task.error
+    assert task.locked_by is None
+    assert task.progress == {'total': 3, 'provisioned': [1]}
+    mocked.return_value = True
+    provision_gerrit_project(task_id=task.pk)
+    task.refresh_from_db()
+    assert task.is_completed
+    assert not task.error
+
+
+@pytest.mark.django_db
+def test_command_provision_gerrit_project(mocker, django_capture_on_commit_callbacks):
+    mocked_job = mocker.patch('code_reviews.gerrit.tasks.provision_gerrit_project.delay')
+    course = CourseFactory()
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command('provision_gerrit_project', course.pk)
+    task = Task.objects.get(task_name=GERRIT_PROVISIONING_TASK_NAME)
+    mocked_job.assert_called_once_with(task_id=task.pk)
+    # Unfinished task is reused
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command('provision_gerrit_project', course.pk)
+    assert Task.objects.filter(task_name=GERRIT_PROVISIONING_TASK_NAME).count() == 1
+    assert mocked_job.call_count == 2
@@ -0,0 +1,21 @@
+from django.core.management import BaseCommand, CommandError
+
+from code_reviews.gerrit.services import schedule_gerrit_project_provisioning
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = ("Adds job for gerrit project provisioning to the queue. "
+            "Unfinished provisioning of the course is resumed.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_id', type=int, metavar='COURSE_ID')
+
+    def handle(self, *args, **options):
+        course_id = options['course_id']
+        try:
+            course = Course.objects.get(pk=course_id)
+        except Course.DoesNotExist:
+            raise CommandError(f"Course with id = {course_id} not found")
+        task = schedule_gerrit_project_provisioning(course)
+        self.stdout.write(f"Provisioning task {task.pk} has been scheduled")
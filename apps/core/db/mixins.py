@@ -2,11 +2,9 @@ import logging
 from typing import TYPE_CHECKING, Iterable, Mapping, Set
 
 from django.core import checks
-from django.db import models
+from django.db import models, transaction
 from django.db.models import prefetch_related_objects
 
-from core.tasks import compute_model_fields
-
 logger = logging.getLogger(__name__)
 
 
@@ -79,14 +77,31 @@ class DerivableFieldsMixin(ModelMixinBase):
 
         return False
 
+    @classmethod
+    def bulk_compute_fields(cls, objects, *derivable_fields: str) -> None:
+        """
+        Computes and saves fields of the model instances. Override it to
+        compute values with grouped queries instead of queries per object.
+        """
+        for obj in objects:
+            try:
+                with transaction.atomic():
+                    obj.compute_fields(*derivable_fields)
+            except Exception:
+                logger.exception(f"Failed to compute fields of "
+                                 f"{cls.__name__} {obj.pk}")
+
     def compute_fields_async(self, *derivable_fields) -> None:
-        from django.contrib.contenttypes.models import ContentType
+        """
+        Puts the record in the queue, fields are recomputed by the worker
+        after the current transaction is committed.
+        """
+        from core.services import mark_derivable_fields_dirty
         if not isinstance(self, models.Model):
             raise TypeError('DerivableFieldsMixin needs a model instance')
 
-        content_type = ContentType.objects.get_for_model(self)
-        # FIXME: investigate do we need transaction.on_commit here or not
-        compute_model_fields.delay(content_type.id, self.pk, derivable_fields)
+        mark_derivable_fields_dirty(self.__class__, [self.pk],
+                                    *derivable_fields)
 
     @classmethod
     def check(cls, **kwargs):
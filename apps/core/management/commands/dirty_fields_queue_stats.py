@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.services import get_dirty_fields_queue_stats
+
+
+class Command(BaseCommand):
+    help = "Shows depth and lag of the derivable fields recomputation queue"
+
+    def handle(self, *args, **options):
+        queue_stats = get_dirty_fields_queue_stats()
+        if not queue_stats:
+            self.stdout.write("Queue is empty")
+        for stats in queue_stats:
+            self.stdout.write(f"{stats.model}: depth={stats.depth}, "
+                              f"lag={stats.lag.total_seconds():.0f}s")
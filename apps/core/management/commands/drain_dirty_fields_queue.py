@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.models import DirtyDerivableField
+from core.services import schedule_dirty_derivable_fields_recomputation
+
+
+class Command(BaseCommand):
+    help = ("Schedules recomputation of the derivable fields if the queue "
+            "is not empty. Run it periodically to process records left "
+            "in the queue after the last job.")
+
+    def handle(self, *args, **options):
+        if not DirtyDerivableField.objects.exists():
+            return
+        if schedule_dirty_derivable_fields_recomputation():
+            self.stdout.write("Job has been scheduled")
+        else:
+            self.stdout.write("Job is already scheduled")
@@ -1,8 +1,50 @@
 import ast
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from django.apps import apps
 from django.core.management.base import AppCommand, CommandError
+from django.db import connections
+from django.db.models.functions import Mod
 
 from core.db.mixins import DerivableFieldsMixin
+from core.utils import queryset_iterator
+
+
+def process_chunk(model_label: str, derivable_fields: List[str],
+                  custom_manager: str, queryset_filters: Optional[Dict[str, Any]],
+                  check: bool, chunk: int = 0, chunks: int = 1,
+                  on_progress: Optional[Callable[[int, int], None]] = None) -> Tuple[int, int]:
+    """
+    Computes derivable fields of the records with `pk % chunks == chunk`.
+    Returns the number of processed and changed records. Changes are
+    not saved in a `check` mode.
+    """
+    model = apps.get_model(model_label)
+    queryset = getattr(model, custom_manager)
+    if queryset_filters:
+        queryset = queryset.filter(**queryset_filters)
+    if chunks > 1:
+        queryset = (queryset
+                    .annotate(_chunk=Mod('pk', chunks))
+                    .filter(_chunk=chunk))
+    queryset = queryset.order_by()
+    processed, changed = 0, 0
+    objects = queryset_iterator(queryset, chunk_size=500,
+                                on_progress=on_progress)
+    for model_object in objects:
+        processed += 1
+        changed += int(model_object.compute_fields(*derivable_fields,
+                                                   prefetch=True,
+                                                   commit=not check))
+        # TODO: pause?
+    return processed, changed
+
+
+def _process_chunk_in_subprocess(*args) -> Tuple[int, int]:
+    # Connections inherited from the parent process can't be shared
+    connections.close_all()
+    return process_chunk(*args)
 
 
 class Command(AppCommand):
@@ -23,6 +65,12 @@ class Command(AppCommand):
                             help='Customize one or more filters for queryset. '
                                  'Usage examples: '
                                  ' -f due_date__isnull=True -f id__in=[86]')
+        parser.add_argument('--check', action='store_true',
+                            help='Report records with outdated values '
+                                 'without saving changes.')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Number of processes, each one handles '
+                                 'its own chunk of records.')
 
     def handle_app_config(self, app_config, **options):
         model_name = options['model_name']
@@ -32,7 +80,9 @@ class Command(AppCommand):
                                f"DerivableFieldsMixin")
 
         derivable_fields = options['field_names'] or []
-        custom_manager = getattr(model, options['custom_manager'] or 'objects')
+        custom_manager = options['custom_manager'] or 'objects'
+        if not hasattr(model, custom_manager):
+            raise CommandError(f"Unknown manager {custom_manager}")
         queryset_filters = options['queryset_filters']
 
         if queryset_filters:
@@ -40,14 +90,29 @@ class Command(AppCommand):
                 field: ast.literal_eval(value) for f in queryset_filters
                 for field, value in [f.split('=')]
             }
-            custom_manager = custom_manager.filter(**queryset_filters)
-        custom_manager = custom_manager.order_by()
 
-        count = 0
-        # TODO: replace with `core.utils.queryset_iterator`
-        for model_object in custom_manager.iterator():
-            count += int(model_object.compute_fields(*derivable_fields,
-                                                     prefetch=True))
-            # TODO: pause?
+        check = options['check']
+        workers = max(options['workers'], 1)
+        args = (model._meta.label, derivable_fields, custom_manager,
+                queryset_filters, check)
+        if workers == 1:
+            def report_progress(processed, total):
+                self.stdout.write(f'Processed {processed} of {total}')
+
+            processed, changed = process_chunk(*args,
+                                               on_progress=report_progress)
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_process_chunk_in_subprocess,
+                                           *args, chunk, workers)
+                           for chunk in range(workers)]
+                results = [f.result() for f in futures]
+            processed = sum(r[0] for r in results)
+            changed = sum(r[1] for r in results)
 
-        self.stdout.write(f'Updated {model_name} objects: {count}')
+        if check:
+            self.stdout.write(f'Outdated {model_name} objects: {changed} '
+                              f'of {processed}')
+        else:
+            self.stdout.write(f'Updated {model_name} objects: {changed}')
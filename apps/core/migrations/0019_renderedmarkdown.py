@@ -0,0 +1,25 @@
+from django.db import migrations, models
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_remove_siteconfiguration_lms_subdomain'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderedMarkdown',
+            fields=[
+                ('content_hash', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Content Hash')),
+                ('html', models.TextField(verbose_name='HTML')),
+                ('created_at', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+            ],
+            options={
+                'verbose_name': 'Rendered Markdown',
+                'verbose_name_plural': 'Rendered Markdown',
+            },
+        ),
+    ]
@@ -6,6 +6,7 @@ from cryptography.fernet import Fernet
 from model_utils.fields import AutoCreatedField, AutoLastModifiedField
 
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from django.contrib.sites.models import Site
 from django.core.exceptions import ImproperlyConfigured
 from django.db import models
@@ -397,3 +398,40 @@ class TimestampedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class RenderedMarkdown(models.Model):
+    """
+    Sanitized html of the markdown text. Records are keyed by the hash of
+    the source text, so they don't need invalidation and are shared among
+    all objects with the same text.
+    """
+    content_hash = models.CharField(_("Content Hash"), max_length=64,
+                                    primary_key=True)
+    html = models.TextField(_("HTML"))
+    created_at = AutoCreatedField(_('created'))
+
+    class Meta:
+        verbose_name = _("Rendered Markdown")
+        verbose_name_plural = _("Rendered Markdown")
+
+    def __str__(self):
+        return self.content_hash
+
+
+class DirtyDerivableField(models.Model):
+    """
+    Queue of records with derivable fields that should be recomputed.
+    Duplicates are allowed, the worker merges them on processing.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    field_name = models.CharField(_("Field Name"), max_length=100)
+    created_at = AutoCreatedField(_('created'))
+
+    class Meta:
+        verbose_name = _("Dirty Derivable Field")
+        verbose_name_plural = _("Dirty Derivable Fields")
+
+    def __str__(self):
+        return f"{self.content_type_id}:{self.object_id}:{self.field_name}"
@@ -0,0 +1,169 @@
+"""
+Full-response cache for public pages requested by anonymous users.
+
+Cached pages depend on tags (model labels by convention). Invalidation of
+the tag marks all dependent pages as stale without enumerating cache keys.
+Tag versions are stored in the shared redis database, so invalidation
+reaches all web workers while the pages could be cached per worker.
+Stale pages are still served to concurrent requests while the page is
+regenerated by a single request (stale-while-revalidate), so a traffic spike
+after invalidation doesn't reach the database.
+"""
+import hashlib
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+
+from core.locks import get_shared_connection
+
+PAGE_CACHE_KEY = "page_cache_{digest}"
+PAGE_CACHE_LOCK_KEY = "page_cache_lock_{digest}"
+PAGE_CACHE_TAG_KEY = "core.page_cache_tag_{tag}"
+PAGE_CACHE_TIMEOUT = 600
+# How long the stale page could be served while a new version is generated
+PAGE_CACHE_STALE_TIMEOUT = 3600
+PAGE_CACHE_LOCK_TIMEOUT = 30
+PAGE_CACHE_TAG_TIMEOUT = 3600 * 24 * 7
+
+
+def _get_cache():
+    return caches[getattr(settings, "PAGE_CACHE_ALIAS", "default")]
+
+
+def _get_tag_versions(tags: Iterable[str]) -> Dict[str, Optional[str]]:
+    tags = list(tags)
+    if not tags:
+        return {}
+    values = get_shared_connection().mget([PAGE_CACHE_TAG_KEY.format(tag=tag)
+                                           for tag in tags])
+    return {tag: value.decode() if value is not None else None
+            for tag, value in zip(tags, values)}
+
+
+def invalidate_page_cache(*tags: str) -> None:
+    """
+    Marks cached pages that depend on any of the *tags* as stale.
+
+    Versions are changed once again after the current transaction is
+    committed since concurrent request could cache the page before the commit.
+    """
+    def update_versions():
+        version = uuid.uuid4().hex
+        pipeline = get_shared_connection().pipeline()
+        for tag in tags:
+            pipeline.set(PAGE_CACHE_TAG_KEY.format(tag=tag), version,
+                         ex=PAGE_CACHE_TAG_TIMEOUT)
+        pipeline.execute()
+
+    update_versions()
+    transaction.on_commit(update_versions)
+
+
+def is_page_cacheable_request(request: HttpRequest) -> bool:
+    return (request.method in ("GET", "HEAD") and
+            not request.user.is_authenticated and
+            not len(get_messages(request)))
+
+
+def is_page_cacheable_response(request: HttpRequest,
+                               response: HttpResponse) -> bool:
+    return (response.status_code == 200 and
+            not response.streaming and
+            not response.cookies and
+            # Page contains personal CSRF token
+            not request.META.get("CSRF_COOKIE_USED"))
+
+
+def get_page_cache_digest(request: HttpRequest,
+                          query_params: Iterable[str] = ()) -> str:
+    """
+    Only whitelisted query params are the part of the key, otherwise
+    every marketing tag (e.g. utm_source) creates a new cache entry.
+    """
+    branch = getattr(request, "branch", None)
+    query = [(name, request.GET.getlist(name))
+             for name in sorted(query_params) if name in request.GET]
+    parts = (request.site.pk,
+             branch.pk if branch is not None else None,
+             getattr(request, "LANGUAGE_CODE", settings.LANGUAGE_CODE),
+             request.get_host(),
+             request.path,
+             query)
+    return hashlib.md5(repr(parts).encode("utf-8")).hexdigest()
+
+
+def _to_cache_entry(response: HttpResponse, tag_versions,
+                    timeout: int) -> Dict[str, Any]:
+    return {
+        "content": response.content,
+        "status": response.status_code,
+        "headers": list(response.items()),
+        "tags": tag_versions,
+        "expires_at": time.time() + timeout,
+    }
+
+
+def _from_cache_entry(entry: Dict[str, Any]) -> HttpResponse:
+    response = HttpResponse(entry["content"], status=entry["status"])
+    for header, value in entry["headers"]:
+        response[header] = value
+    return response
+
+
+def get_or_set_page_cache(request: HttpRequest, tags: Iterable[str],
+                          get_response: Callable[[], HttpResponse],
+                          timeout: int = PAGE_CACHE_TIMEOUT,
+                          query_params: Iterable[str] = ()) -> HttpResponse:
+    cache = _get_cache()
+    digest = get_page_cache_digest(request, query_params)
+    cache_key = PAGE_CACHE_KEY.format(digest=digest)
+    # Versions are read before generating the page, the page will be
+    # considered stale if invalidation happens in the meantime
+    tag_versions = _get_tag_versions(tags)
+    entry = cache.get(cache_key)
+    lock_key = None
+    if entry is not None:
+        if entry["tags"] == tag_versions and entry["expires_at"] > time.time():
+            return _from_cache_entry(entry)
+        lock_key = PAGE_CACHE_LOCK_KEY.format(digest=digest)
+        if not cache.add(lock_key, 1, timeout=PAGE_CACHE_LOCK_TIMEOUT):
+            # Page is regenerated by another request
+            return _from_cache_entry(entry)
+    try:
+        response = get_response()
+        if callable(getattr(response, "render", None)):
+            response = response.render()
+        if is_page_cacheable_response(request, response):
+            entry = _to_cache_entry(response, tag_versions, timeout)
+            cache.set(cache_key, entry,
+                      timeout=timeout + PAGE_CACHE_STALE_TIMEOUT)
+    finally:
+        if lock_key is not None:
+            cache.delete(lock_key)
+    return response
+
+
+class PageCacheMixin:
+    """
+    Caches responses of the view for anonymous users. Set `page_cache_tags`
+    to invalidate cached pages on changes of the related models and
+    `page_cache_query_params` to list query params the page depends on.
+    """
+    page_cache_tags: Iterable[str] = ()
+    page_cache_query_params: Iterable[str] = ()
+    page_cache_timeout: int = PAGE_CACHE_TIMEOUT
+
+    def dispatch(self, request, *args, **kwargs):
+        dispatch = super().dispatch
+        if not is_page_cacheable_request(request):
+            return dispatch(request, *args, **kwargs)
+        return get_or_set_page_cache(request, self.page_cache_tags,
+                                     lambda: dispatch(request, *args, **kwargs),
+                                     timeout=self.page_cache_timeout,
+                                     query_params=self.page_cache_query_params)
@@ -1,11 +1,19 @@
+import logging
+from collections import defaultdict
 from operator import attrgetter
-from typing import TYPE_CHECKING, Any
+from datetime import timedelta
+from typing import (
+    TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Set, Type
+)
 
-from django.db import transaction
-from django.db.models import signals, sql
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.db.models import Count, Min, signals, sql
 from django.utils import timezone
 
 from core.db.models import SoftDeletionModel
+from core.locks import get_shared_connection
 
 if TYPE_CHECKING:
     # TODO: Remove once Collector in django-stubs has attribute types.
@@ -13,6 +21,14 @@ if TYPE_CHECKING:
 else:
     from django.db.models.deletion import Collector
 
+logger = logging.getLogger(__name__)
+
+DIRTY_FIELDS_BATCH_SIZE = 500
+# Flag is stored in the shared redis database since web and queue workers
+# don't share the cache. Jobs are queued per site.
+DIRTY_FIELDS_JOB_SCHEDULED_KEY = "core.dirty_derivable_fields_job_scheduled_{site_id}"
+DIRTY_FIELDS_JOB_SCHEDULED_TIMEOUT = 60
+
 
 class SoftDeleteService:
     """
@@ -83,3 +99,117 @@ class SoftDeleteService:
                         signals.post_delete.send(
                             sender=model, instance=obj, using=collector.using
                         )
+
+
+class DirtyFieldsQueueStats(NamedTuple):
+    model: str
+    depth: int
+    lag: timedelta
+
+
+def get_dirty_fields_queue_stats() -> List[DirtyFieldsQueueStats]:
+    """
+    Returns the number of queued records and age of the oldest entry
+    for each model.
+    """
+    from core.models import DirtyDerivableField
+    now = timezone.now()
+    queue = (DirtyDerivableField.objects
+             .order_by()
+             .values('content_type_id')  # group by
+             .annotate(depth=Count('*'), oldest=Min('created_at')))
+    stats = []
+    for row in queue:
+        content_type = ContentType.objects.get_for_id(row['content_type_id'])
+        stats.append(DirtyFieldsQueueStats(model=str(content_type),
+                                           depth=row['depth'],
+                                           lag=now - row['oldest']))
+    return stats
+
+
+def mark_derivable_fields_dirty(model: Type[models.Model],
+                                object_ids: Iterable[int],
+                                *field_names: str) -> None:
+    """
+    Puts records in the queue for recomputing derivable fields. The worker
+    is scheduled after the current transaction is committed.
+    """
+    from core.models import DirtyDerivableField
+    content_type = ContentType.objects.get_for_model(model)
+    field_names = field_names or tuple(model.derivable_fields)
+    DirtyDerivableField.objects.bulk_create([
+        DirtyDerivableField(content_type=content_type, object_id=object_id,
+                            field_name=field_name)
+        for object_id in set(object_ids) for field_name in field_names
+    ])
+
+    transaction.on_commit(schedule_dirty_derivable_fields_recomputation)
+
+
+def _get_dirty_fields_job_scheduled_key() -> str:
+    return DIRTY_FIELDS_JOB_SCHEDULED_KEY.format(site_id=settings.SITE_ID)
+
+
+def schedule_dirty_derivable_fields_recomputation() -> bool:
+    """
+    Enqueues the worker unless it's already scheduled. Worker processes
+    the whole queue, no need to enqueue it twice.
+    """
+    from core.tasks import recompute_dirty_derivable_fields
+    is_flag_set = get_shared_connection().set(
+        _get_dirty_fields_job_scheduled_key(), 1, nx=True,
+        ex=DIRTY_FIELDS_JOB_SCHEDULED_TIMEOUT)
+    if is_flag_set:
+        recompute_dirty_derivable_fields.delay()
+    return bool(is_flag_set)
+
+
+def release_dirty_derivable_fields_job_flag() -> None:
+    """Allows to schedule the next job for entries added during processing."""
+    get_shared_connection().delete(_get_dirty_fields_job_scheduled_key())
+
+
+def recompute_dirty_derivable_fields(batch_size=DIRTY_FIELDS_BATCH_SIZE) -> int:
+    """
+    Recomputes derivable fields of the records from the queue in batches
+    until the queue is empty. Returns the number of processed records.
+
+    Entries locked by another worker are skipped. New entries for the same
+    record could be added while the batch is processed, they stay in
+    the queue until the next iteration.
+    """
+    from core.db.mixins import DerivableFieldsMixin
+    from core.models import DirtyDerivableField
+    processed = 0
+    while True:
+        with transaction.atomic():
+            batch = list(DirtyDerivableField.objects
+                         .select_for_update(skip_locked=True)
+                         .order_by('pk')[:batch_size])
+            if not batch:
+                break
+            dirty_fields: Dict[int, Dict[int, Set[str]]] = defaultdict(lambda: defaultdict(set))
+            for entry in batch:
+                dirty_fields[entry.content_type_id][entry.object_id].add(entry.field_name)
+            for content_type_id, objects in dirty_fields.items():
+                model = ContentType.objects.get_for_id(content_type_id).model_class()
+                if model is None or not issubclass(model, DerivableFieldsMixin):
+                    logger.warning(f"Content type {content_type_id} doesn't "
+                                   f"support derivable fields")
+                    continue
+                field_names = set().union(*objects.values())
+                queryset = model._base_manager.filter(pk__in=objects.keys())
+                prefetch_fields = model.prefetch_before_compute(*field_names)
+                if prefetch_fields:
+                    queryset = queryset.prefetch_related(*prefetch_fields)
+                # Records with the same set of dirty fields are computed together
+                grouped = defaultdict(list)
+                for obj in queryset:
+                    grouped[tuple(sorted(objects[obj.pk]))].append(obj)
+                for fields, objs in grouped.items():
+                    model.bulk_compute_fields(objs, *fields)
+                processed += len(objects)
+            (DirtyDerivableField.objects
+             .filter(pk__in=[entry.pk for entry in batch])
+             .delete())
+    return processed
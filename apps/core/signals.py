@@ -5,7 +5,8 @@ from django_ses.signals import bounce_received, complaint_received
 from django.db import models
 from django.dispatch import receiver
 
-from core.models import City
+from core.models import Branch, City
+from core.page_cache import invalidate_page_cache
 from notifications.service import suspend_email_address
 from users.models import User
 
@@ -22,6 +23,12 @@ def city_cache_clear_after_save(sender, *args, **kwargs) -> None:
     return None
 
 
+@receiver(models.signals.post_save, sender=Branch)
+@receiver(models.signals.post_delete, sender=Branch)
+def invalidate_public_pages_cache(sender, *args, **kwargs):
+    invalidate_page_cache(sender._meta.label)
+
+
 @receiver(bounce_received)
 def bounce_handler(sender, mail_obj, bounce_obj, *args, **kwargs):
     """
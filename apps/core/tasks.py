@@ -1,24 +1,36 @@
+import logging
+
 from django_rq import job
 
 from django.contrib.contenttypes.models import ContentType
 
+logger = logging.getLogger(__name__)
+
 
 @job('default')
 def compute_model_fields(content_type_id, object_id, compute_fields):
+    """
+    Deprecated: records are recomputed through the dirty fields queue.
+    Kept for the jobs enqueued before the migration.
+    """
     from core.db.mixins import DerivableFieldsMixin
+    from core.services import mark_derivable_fields_dirty
 
     content_type = ContentType.objects.get_for_id(content_type_id)
     model = content_type.model_class()
-
-    if model is None:
+    if model is None or not issubclass(model, DerivableFieldsMixin):
         return
+    mark_derivable_fields_dirty(model, [object_id], *compute_fields)
 
-    if issubclass(model, DerivableFieldsMixin):
-        queryset = model._base_manager  # type: ignore
 
-        prefetch_fields = model.prefetch_before_compute(*compute_fields)
-        if prefetch_fields:
-            queryset = queryset.prefetch_related(*prefetch_fields)
-
-        obj = queryset.get(id=object_id)
-        obj.compute_fields(*compute_fields)
+@job('default')
+def recompute_dirty_derivable_fields():
+    from core.services import (
+        get_dirty_fields_queue_stats, recompute_dirty_derivable_fields,
+        release_dirty_derivable_fields_job_flag
+    )
+    release_dirty_derivable_fields_job_flag()
+    for stats in get_dirty_fields_queue_stats():
+        logger.info(f"Dirty fields queue {stats.model}: depth={stats.depth}, "
+                    f"lag={stats.lag.total_seconds():.0f}s")
+    recompute_dirty_derivable_fields()
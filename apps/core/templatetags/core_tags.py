@@ -4,7 +4,6 @@ import re
 
 from multiselectfield.db.fields import MSFList
 
-from django.core.cache import InvalidCacheBackendError, caches
 from django.core.cache.utils import make_template_fragment_key
 from django.template import Library, Node, TemplateSyntaxError, VariableDoesNotExist
 from django.template.base import TextNode
@@ -12,7 +11,9 @@ from django.utils.numberformat import format
 from django.utils.safestring import mark_safe
 from django.utils.timezone import now
 
-from ..utils import render_markdown
+from ..utils import (
+    get_markdown_fragment_cache, render_markdown, render_markdown_many
+)
 
 numeric_test = re.compile(r"^\d+$")
 register = Library()
@@ -106,30 +107,32 @@ class MarkdownNode(Node):
             expire_time = int(expire_time)
         except (ValueError, TypeError):
             raise TemplateSyntaxError('"cache" tag got a non-integer timeout value: %r' % expire_time)
-        try:
-            fragment_cache = caches['markdown_fragments']
-        except InvalidCacheBackendError:
-            fragment_cache = caches['default']
-
+        if expire_time == 0:
+            return mark_safe(render_markdown(self.render_text(context)))
+        fragment_cache = get_markdown_fragment_cache()
         vary_on = [var.resolve(context) for var in self.vary_on]
         cache_key = make_template_fragment_key(self.fragment_name, vary_on)
         value = fragment_cache.get(cache_key)
         if value is None:
-            context.autoescape = False
-            # Remove unnecessary line breaks and whitespaces. Example:
-            # {% markdown %}\n <- LB for readability in tpl{% endmarkdown %}
-            if self.nodelist:
-                if isinstance(self.nodelist[0], TextNode) and \
-                   not self.nodelist[0].s.strip():
-                    self.nodelist[0].s = ''
-                if isinstance(self.nodelist[-1], TextNode) and \
-                   not self.nodelist[-1].s.strip():
-                    self.nodelist[-1].s = ''
-            value = self.nodelist.render(context)
-            value = render_markdown(value)
+            # The same text could be cached under another fragment name
+            value = render_markdown_many([self.render_text(context)],
+                                         timeout=expire_time)[0]
             fragment_cache.set(cache_key, value, expire_time)
         return mark_safe(value)
 
+    def render_text(self, context) -> str:
+        context.autoescape = False
+        # Remove unnecessary line breaks and whitespaces. Example:
+        # {% markdown %}\n <- LB for readability in tpl{% endmarkdown %}
+        if self.nodelist:
+            if isinstance(self.nodelist[0], TextNode) and \
+               not self.nodelist[0].s.strip():
+                self.nodelist[0].s = ''
+            if isinstance(self.nodelist[-1], TextNode) and \
+               not self.nodelist[-1].s.strip():
+                self.nodelist[-1].s = ''
+        return self.nodelist.render(context)
+
 
 # Note: Inspired by django.templatetags.cache
 @register.tag('markdown')
@@ -152,7 +155,9 @@ def do_markdown(parser, token):
             .. some expensive processing ..
         {% endmarkdown %}
 
-    Each unique set of arguments will result in a unique cache entry.
+    Rendered html is cached by the fragment name and the arguments, on a cache
+    miss it's looked up by the hash of the text. Zero `expire_time` disables
+    caching.
     """
     nodelist = parser.parse(('endmarkdown',))
     parser.delete_first_token()
@@ -1,9 +1,17 @@
+from io import StringIO
+
 import pytest
 
 from django.core import management
 
 from core.models import SiteConfiguration
+from core.services import (
+    mark_derivable_fields_dirty, release_dirty_derivable_fields_job_flag
+)
 from core.tests.factories import SiteFactory
+from courses.constants import MaterialVisibilityTypes
+from courses.models import Course
+from courses.tests.factories import CourseClassFactory, CourseFactory
 
 
 @pytest.mark.django_db
@@ -35,3 +43,42 @@ def test_update_site_configuration(settings):
     assert model_configuration.email_use_ssl == use_tls_ssl
     assert model_configuration.email_host_user == email_host_user
     assert model_configuration.default_from_email == default_email_from
+
+
+@pytest.mark.django_db
+def test_update_derivable_fields_check(mocker):
+    mocker.patch("courses.tasks.maybe_upload_slides_yandex.delay")
+    course = CourseFactory()
+    CourseClassFactory(course=course, video_url="youtuuube",
+                       materials_visibility=MaterialVisibilityTypes.PUBLIC)
+    Course.objects.filter(pk=course.pk).update(public_videos_count=0)
+    out = StringIO()
+    management.call_command("update_derivable_fields", "courses", "Course",
+                            "-n", "public_videos_count", "--check",
+                            "-f", f"id__in=[{course.pk}]", stdout=out)
+    assert "Outdated Course objects: 1 of 1" in out.getvalue()
+    course.refresh_from_db()
+    assert course.public_videos_count == 0
+    management.call_command("update_derivable_fields", "courses", "Course",
+                            "-n", "public_videos_count",
+                            "-f", f"id__in=[{course.pk}]", stdout=out)
+    course.refresh_from_db()
+    assert course.public_videos_count == 1
+
+
+@pytest.mark.django_db
+def test_drain_dirty_fields_queue(mocker):
+    mocked_job = mocker.patch("core.tasks.recompute_dirty_derivable_fields.delay")
+    out = StringIO()
+    management.call_command("drain_dirty_fields_queue", stdout=out)
+    assert mocked_job.call_count == 0
+    course = CourseFactory()
+    mark_derivable_fields_dirty(Course, [course.pk], "public_videos_count")
+    management.call_command("drain_dirty_fields_queue", stdout=out)
+    assert mocked_job.call_count == 1
+    # Flag is shared among web and queue workers
+    management.call_command("drain_dirty_fields_queue", stdout=out)
+    assert mocked_job.call_count == 1
+    release_dirty_derivable_fields_job_flag()
+    management.call_command("drain_dirty_fields_queue", stdout=out)
+    assert mocked_job.call_count == 2
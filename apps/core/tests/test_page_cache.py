@@ -0,0 +1,113 @@
+import pytest
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from core.locks import get_shared_connection
+from core.page_cache import (
+    PAGE_CACHE_LOCK_KEY, PAGE_CACHE_TAG_KEY, get_or_set_page_cache,
+    get_page_cache_digest, invalidate_page_cache, is_page_cacheable_request
+)
+from core.tests.factories import BranchFactory
+
+
+class ResponseCounter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return HttpResponse(f"version {self.calls}")
+
+
+@pytest.fixture
+def anonymous_request(rf):
+    caches['default'].clear()
+    request = rf.get('/courses/')
+    request.user = AnonymousUser()
+    request.branch = BranchFactory()
+    request.site = request.branch.site
+    return request
+
+
+@pytest.mark.django_db
+def test_page_cache_hit(anonymous_request):
+    get_response = ResponseCounter()
+    response = get_or_set_page_cache(anonymous_request, ["courses.Course"],
+                                     get_response)
+    assert response.content == b"version 1"
+    response = get_or_set_page_cache(anonymous_request, ["courses.Course"],
+                                     get_response)
+    assert response.content == b"version 1"
+    assert get_response.calls == 1
+    # Branch is a part of the cache key
+    anonymous_request.branch = BranchFactory(site=anonymous_request.site)
+    response = get_or_set_page_cache(anonymous_request, ["courses.Course"],
+                                     get_response)
+    assert response.content == b"version 2"
+
+
+@pytest.mark.django_db
+def test_page_cache_invalidation(anonymous_request):
+    get_response = ResponseCounter()
+    get_or_set_page_cache(anonymous_request, ["courses.Course"], get_response)
+    invalidate_page_cache("learning.GraduateProfile")
+    response = get_or_set_page_cache(anonymous_request, ["courses.Course"],
+                                     get_response)
+    assert response.content == b"version 1"
+    invalidate_page_cache("courses.Course")
+    response = get_or_set_page_cache(anonymous_request, ["courses.Course"],
+                                     get_response)
+    assert response.content == b"version 2"
+    assert get_response.calls == 2
+    # Tag versions are shared among workers
+    tag_key = PAGE_CACHE_TAG_KEY.format(tag="courses.Course")
+    get_shared_connection().set(tag_key, "changed by another worker")
+    response = get_or_set_page_cache(anonymous_request, ["courses.Course"],
+                                     get_response)
+    assert response.content == b"version 3"
+
+
+@pytest.mark.django_db
+def test_page_cache_serves_stale_page_while_revalidating(anonymous_request):
+    get_response = ResponseCounter()
+    get_or_set_page_cache(anonymous_request, ["courses.Course"], get_response)
+    invalidate_page_cache("courses.Course")
+    # Another request is regenerating the page
+    digest = get_page_cache_digest(anonymous_request)
+    caches['default'].set(PAGE_CACHE_LOCK_KEY.format(digest=digest), 1)
+    response = get_or_set_page_cache(anonymous_request, ["courses.Course"],
+                                     get_response)
+    assert response.content == b"version 1"
+    assert get_response.calls == 1
+    caches['default'].delete(PAGE_CACHE_LOCK_KEY.format(digest=digest))
+    response = get_or_set_page_cache(anonymous_request, ["courses.Course"],
+                                     get_response)
+    assert response.content == b"version 2"
+
+
+@pytest.mark.django_db
+def test_is_page_cacheable_request(anonymous_request):
+    assert is_page_cacheable_request(anonymous_request)
+    anonymous_request.method = "POST"
+    assert not is_page_cacheable_request(anonymous_request)
+
+
+@pytest.mark.django_db
+def test_page_cache_query_params(rf, anonymous_request):
+    get_response = ResponseCounter()
+    get_or_set_page_cache(anonymous_request, ["courses.Course"], get_response,
+                          query_params=["branch"])
+    request = rf.get('/courses/', {"utm_source": "vk"})
+    request.user = anonymous_request.user
+    request.branch = anonymous_request.branch
+    request.site = anonymous_request.site
+    response = get_or_set_page_cache(request, ["courses.Course"], get_response,
+                                     query_params=["branch"])
+    assert response.content == b"version 1"
+    request.GET = request.GET.copy()
+    request.GET["branch"] = "spb"
+    response = get_or_set_page_cache(request, ["courses.Course"], get_response,
+                                     query_params=["branch"])
+    assert response.content == b"version 2"
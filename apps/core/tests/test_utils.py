@@ -1,8 +1,15 @@
 import pytest
 
-from core.models import Branch
+from django.core.cache import caches
+from django.template import Context, Template
+
+from core.models import Branch, RenderedMarkdown
 from core.tests.factories import BranchFactory
-from core.utils import get_youtube_video_id, instance_memoize, queryset_iterator
+from core.utils import (
+    MARKDOWN_CACHE_KEY, get_markdown_content_hash, get_youtube_video_id,
+    instance_memoize, iter_queryset_chunks, queryset_iterator, render_markdown,
+    render_markdown_many
+)
 
 
 def test_get_youtube_video_id():
@@ -30,11 +37,11 @@ def test_queryset_iterator(django_assert_num_queries):
     with django_assert_num_queries(1):
         for b in qs:
             pass
-    # 1 additional query for min and max PK aggregation
+    # 1 additional query to make sure there is no rows after the full chunk
     with django_assert_num_queries(2):
         for b in queryset_iterator(qs, chunk_size=10):
             pass
-    with django_assert_num_queries(2):
+    with django_assert_num_queries(1):
         for b in queryset_iterator(qs, chunk_size=100):
             pass
     total = 0
@@ -51,6 +58,30 @@ def test_queryset_iterator(django_assert_num_queries):
     assert bs == branches
 
 
+@pytest.mark.django_db
+def test_iter_queryset_chunks(django_assert_num_queries):
+    branches = BranchFactory.create_batch(5)
+    for i, branch in enumerate(branches):
+        branch.order = i % 2
+        branch.save()
+    qs = Branch.objects.filter(pk__in=[b.pk for b in branches])
+    expected = sorted(branches, key=lambda b: (-b.order, b.pk))
+    with django_assert_num_queries(3):
+        chunks = list(iter_queryset_chunks(qs, chunk_size=2,
+                                           ordering=['-order']))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [b for chunk in chunks for b in chunk] == expected
+    progress = []
+    # Count query, main query and prefetch query per chunk
+    with django_assert_num_queries(4):
+        chunks = list(iter_queryset_chunks(
+            qs.prefetch_related('site'), chunk_size=3,
+            ordering=['-order'], use_cursor=True,
+            on_progress=lambda *args: progress.append(args)))
+    assert [b for chunk in chunks for b in chunk] == expected
+    assert progress == [(3, 5), (5, 5)]
+
+
 def test_instance_memoize():
     class A:
         def __init__(self):
@@ -73,3 +104,63 @@ def test_instance_memoize():
     del a.__dict__["_instance_memoize_cache"]
     assert a.foo(1) == 44
     assert A.foo(a, 1) == 45
+
+
+@pytest.mark.django_db
+def test_render_markdown_many(django_assert_num_queries):
+    caches['default'].clear()
+    texts = ["**bold**", "", "*italic*", "**bold**"]
+    expected = [render_markdown(text) if text else "" for text in texts]
+    # Rendered html is stored in the fragment cache only by default
+    with django_assert_num_queries(0):
+        assert render_markdown_many(texts) == expected
+    assert not RenderedMarkdown.objects.exists()
+    # Lookup of stored values + insert of the rendered ones
+    caches['default'].clear()
+    with django_assert_num_queries(2):
+        assert render_markdown_many(texts, persist=True) == expected
+    assert RenderedMarkdown.objects.count() == 2
+    # Stored html is looked up with a single query on demand
+    caches['default'].clear()
+    with django_assert_num_queries(0):
+        assert render_markdown_many(texts) == expected
+    caches['default'].clear()
+    with django_assert_num_queries(1):
+        assert render_markdown_many(texts, use_persisted=True) == expected
+    with django_assert_num_queries(0):
+        assert render_markdown_many(texts, use_persisted=True) == expected
+    # Nothing is cached with zero timeout
+    caches['default'].clear()
+    with django_assert_num_queries(0):
+        assert render_markdown_many(texts, timeout=0, use_persisted=True) == expected
+    assert not caches['default'].get_many([
+        MARKDOWN_CACHE_KEY.format(content_hash=get_markdown_content_hash(t))
+        for t in texts if t])
+
+
+@pytest.mark.django_db
+def test_markdown_template_tag(django_assert_num_queries):
+    caches['default'].clear()
+    template = Template("{% load markdown from core_tags %}"
+                        "{% markdown 3600 'fragment' obj_id %}"
+                        "{{ text }}"
+                        "{% endmarkdown %}")
+    with django_assert_num_queries(0):
+        html = template.render(Context({"obj_id": 1, "text": "**bold**"}))
+    assert html == render_markdown("**bold**")
+    # Fragment is cached by the vary on arguments
+    html = template.render(Context({"obj_id": 1, "text": "*italic*"}))
+    assert html == render_markdown("**bold**")
+    html = template.render(Context({"obj_id": 2, "text": "*italic*"}))
+    assert html == render_markdown("*italic*")
+    # Zero timeout disables caching
+    template = Template("{% load markdown from core_tags %}"
+                        "{% markdown 0 'fragment' %}"
+                        "{{ text }}"
+                        "{% endmarkdown %}")
+    with django_assert_num_queries(0):
+        html = template.render(Context({"text": "**bold**"}))
+    assert html == render_markdown("**bold**")
+    html = template.render(Context({"text": "*italic*"}))
+    assert html == render_markdown("*italic*")
+    assert not RenderedMarkdown.objects.exists()
@@ -1,19 +1,22 @@
 import datetime
 import enum
+import hashlib
 import logging
 from functools import partial
-from itertools import zip_longest
-from typing import Any, Dict, Iterable, Iterator, List, Optional
+from itertools import islice, zip_longest
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+)
 from urllib.parse import parse_qs, urlparse
 
 import bleach
 import hoep as h
-from django_jinja.builtins.extensions import make_template_fragment_key
 from hashids import Hashids
 
 from django.conf import settings
 from django.core.cache import InvalidCacheBackendError, caches
-from django.db.models import Max, Min
+from django.db.models import Q, prefetch_related_objects
+from django.db.models.constants import LOOKUP_SEP
 from django.utils import formats
 
 logger = logging.getLogger(__name__)
@@ -94,18 +97,85 @@ def render_markdown(text):
                         attributes=MARKDOWN_ALLOWED_ATTRS)
 
 
-def render_markdown_and_cache(value, fragment_name, expires_in=0, *vary_on):
+# Change it to invalidate rendered html after changing markdown settings
+MARKDOWN_RENDERER_VERSION = 1
+MARKDOWN_CACHE_KEY = "markdown_{content_hash}"
+MARKDOWN_CACHE_TIMEOUT = 3600
+
+
+def get_markdown_content_hash(text: str) -> str:
+    value = f"{MARKDOWN_RENDERER_VERSION}:{text}"
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+def get_markdown_fragment_cache():
     try:
-        fragment_cache = caches['markdown_fragments']
+        return caches['markdown_fragments']
     except InvalidCacheBackendError:
-        fragment_cache = caches['default']
-    cache_key = make_template_fragment_key(fragment_name, vary_on)
-    rendered = fragment_cache.get(cache_key)
-    if rendered is None:
-        rendered = render_markdown(value)
-        fragment_cache.set(cache_key, rendered, expires_in)
+        return caches['default']
+
+
+def render_markdown_many(texts: Iterable[str],
+                         timeout: int = MARKDOWN_CACHE_TIMEOUT,
+                         persist: bool = False,
+                         use_persisted: bool = False) -> List[str]:
+    """
+    Renders markdown texts in one pass. Sanitized html is looked up by
+    the hash of the text in the fragment cache, missing values are rendered
+    and saved to the fragment cache. Nothing is cached if `timeout` is 0.
+
+    Set `use_persisted=True` to look up missing values in the database
+    with a single query, it makes sense only for the texts pre-rendered
+    by the `warmup_markdown_cache` command.
+
+    Set `persist=True` to save rendered html to the database as well. Use it
+    outside the request/response cycle for the stable content only,
+    otherwise every version of the edited text will be stored.
+    """
+    from core.models import RenderedMarkdown
+    texts = list(texts)
+    if timeout == 0 and not persist:
+        return [render_markdown(text) if text else "" for text in texts]
+    content_hashes = [get_markdown_content_hash(text) if text else None
+                      for text in texts]
+    cache_keys = {MARKDOWN_CACHE_KEY.format(content_hash=content_hash): content_hash
+                  for content_hash in content_hashes if content_hash}
+    fragment_cache = get_markdown_fragment_cache()
+    cached = fragment_cache.get_many(cache_keys.keys())
+    rendered = {cache_keys[key]: html for key, html in cached.items()}
+    missing = {content_hash: text for content_hash, text
+               in zip(content_hashes, texts)
+               if content_hash and content_hash not in rendered}
+    if missing:
+        stored = {}
+        if use_persisted or persist:
+            stored = dict(RenderedMarkdown.objects
+                          .filter(content_hash__in=missing.keys())
+                          .values_list('content_hash', 'html'))
+        to_create = []
+        for content_hash, text in missing.items():
+            if content_hash not in stored:
+                html = render_markdown(text)
+                stored[content_hash] = html
+                to_create.append(RenderedMarkdown(content_hash=content_hash,
+                                                  html=html))
+        if persist:
+            RenderedMarkdown.objects.bulk_create(to_create,
+                                                 ignore_conflicts=True)
+        fragment_cache.set_many({MARKDOWN_CACHE_KEY.format(content_hash=k): v
+                                 for k, v in stored.items()}, timeout)
+        rendered.update(stored)
+    return [rendered[content_hash] if content_hash else ""
+            for content_hash in content_hashes]
+
+
+def render_markdown_and_cache(value, fragment_name, expires_in=0, *vary_on):
+    """
+    Returns sanitized html of the markdown text. `fragment_name` and
+    `vary_on` values are not in use since the text is cached by its hash.
+    """
     # TODO: think about escaping
-    return rendered
+    return render_markdown_many([value], timeout=expires_in)[0]
 
 
 def is_club_site():
@@ -202,7 +272,92 @@ _ru_en_mapping = {
 ru_en_mapping = {ord(k): v for k, v in _ru_en_mapping.items()}
 
 
-def queryset_iterator(queryset, chunk_size=1000, use_offset=False):
+def _get_keyset_value(obj, field_name: str):
+    value = obj
+    for attr in field_name.split(LOOKUP_SEP):
+        value = getattr(value, attr)
+    return value
+
+
+def _get_keyset_filter(ordering: Sequence[str], values: Sequence[Any]) -> Q:
+    """
+    Returns filter for rows that follow the row with the given values of
+    the ordering fields.
+    """
+    keyset_filter = Q()
+    preceding_fields = {}
+    for field, value in zip(ordering, values):
+        field_name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        keyset_filter |= Q(**preceding_fields,
+                           **{f'{field_name}{LOOKUP_SEP}{lookup}': value})
+        preceding_fields[field_name] = value
+    return keyset_filter
+
+
+def iter_queryset_chunks(queryset, chunk_size=1000, *,
+                         ordering: Optional[Sequence[str]] = None,
+                         use_cursor=False,
+                         on_progress: Optional[Callable[[int, int], None]] = None) -> Iterator[List[Any]]:
+    """
+    Splits queryset into chunks with `prefetch_related` lookups applied
+    to each chunk.
+
+    By default keyset pagination is used: the next chunk is filtered by
+    values of the ordering fields of the last row in the previous chunk.
+    Ordering is made unique by appending the primary key and all fields
+    must be non-nullable. Related fields are read from the model
+    instance, use `select_related` to avoid additional queries.
+
+    `use_cursor=True` fetches rows with one query (server-side cursor
+    on PostgreSQL).
+
+    `on_progress` is called with the number of processed and total rows
+    after each chunk, total is calculated with an additional query.
+    """
+    if chunk_size <= 0:
+        return
+    ordering = list(ordering or ['pk'])
+    if ordering[-1].lstrip('-') not in ('pk', queryset.model._meta.pk.attname):
+        ordering.append('pk')
+    queryset = queryset.order_by(*ordering)
+    total = queryset.count() if on_progress is not None else None
+    processed = 0
+    if use_cursor:
+        prefetch_lookups = queryset._prefetch_related_lookups
+        rows = queryset.prefetch_related(None).iterator(chunk_size=chunk_size)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            if prefetch_lookups:
+                prefetch_related_objects(chunk, *prefetch_lookups)
+            processed += len(chunk)
+            yield chunk
+            if on_progress is not None:
+                on_progress(processed, total)
+    else:
+        chunk_queryset = queryset
+        while True:
+            chunk = list(chunk_queryset[:chunk_size])
+            if not chunk:
+                break
+            processed += len(chunk)
+            yield chunk
+            if on_progress is not None:
+                on_progress(processed, total)
+            if len(chunk) < chunk_size:
+                break
+            last_values = [_get_keyset_value(chunk[-1], f.lstrip('-'))
+                           for f in ordering]
+            if any(value is None for value in last_values):
+                raise ValueError(f"Keyset pagination doesn't support null "
+                                 f"values of the ordering fields {ordering}")
+            keyset_filter = _get_keyset_filter(ordering, last_values)
+            chunk_queryset = queryset.filter(keyset_filter)
+
+
+def queryset_iterator(queryset, chunk_size=1000, use_offset=False, **kwargs):
     """
     Memory efficient iteration over a Django queryset with
     `prefetch_related` support.
@@ -213,7 +368,9 @@ def queryset_iterator(queryset, chunk_size=1000, use_offset=False):
     method but this causes `prefetch_related` to be ignored and N+1 problem
     as a result.
 
-    Default implementation overrides ordering with primary key.
+    Default implementation overrides ordering with primary key, pass
+    `ordering` to paginate by other unique set of fields. See
+    `iter_queryset_chunks` for other options.
     Note that `use_offset=True` preserves original queryset ordering, but
     limit/offset pagination could be slow.
     """
@@ -228,14 +385,9 @@ def queryset_iterator(queryset, chunk_size=1000, use_offset=False):
             for row in queryset[i:i + chunk_size]:
                 yield row
     else:
-        queryset = queryset.order_by('pk')
-        limits = queryset.aggregate(min=Min('pk'), max=Max('pk'))
-        logger.info(f'Queryset iterator chunk size: {chunk_size}, offset: {use_offset}')
-        if limits['min']:
-            for pk in range(limits['min'], limits['max'] + 1, chunk_size):
-                logger.info(f'Next range [{pk}, {pk + chunk_size})')
-                for row in queryset.filter(pk__gte=pk, pk__lt=pk + chunk_size)[:chunk_size]:
-                    yield row
+        logger.info(f'Queryset iterator chunk size: {chunk_size}')
+        for chunk in iter_queryset_chunks(queryset, chunk_size, **kwargs):
+            yield from chunk
 
 
 def get_youtube_video_id(video_url):
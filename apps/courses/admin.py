@@ -244,7 +244,7 @@ class AssignmentAdmin(admin.ModelAdmin):
         super().save_related(request, form, formsets, change)
         created = not change
         if created:
-            AssignmentService.bulk_create_student_assignments(form.instance)
+            AssignmentService.generate_student_assignments(form.instance)
 
     @meta(_("Created"), admin_order_field='created')
     def created_utc(self, obj):
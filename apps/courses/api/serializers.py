@@ -66,5 +66,9 @@ class BaseAssignmentSerializer(serializers.ModelSerializer):
                   'passing_score', 'maximum_score', 'weight', 'solution_format')
 
     def get_text(self, obj: Assignment):
+        # Could be rendered in advance for the list of assignments
+        rendered_texts = self.context.get('rendered_texts', {})
+        if obj.pk in rendered_texts:
+            return rendered_texts[obj.pk]
         return render_markdown_and_cache(obj.text, "assignment_text", 3600,
                                          obj.pk, obj.modified)
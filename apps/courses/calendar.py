@@ -1,13 +1,12 @@
 import datetime
 from abc import ABC
+from bisect import bisect_left, bisect_right
 from calendar import Calendar
-from collections import defaultdict
 from dataclasses import dataclass
-from typing import Any, Callable, Iterable, List, NewType, Optional
+from typing import Any, Callable, Dict, Iterable, List, NewType, Optional
 
 import attr
 from dateutil.relativedelta import relativedelta
-from dateutil.rrule import DAILY, rrule
 from isoweek import Week
 
 from django.utils.formats import date_format
@@ -111,10 +110,9 @@ class CalendarWeek:
 
 class EventsCalendar(ABC):
     """
-    This class helps to generate days/weeks grid with attached events
-
-    Note:
-        Repeated calls to `_add_events` could broke day events order.
+    This class helps to generate days/weeks grid with attached events.
+    Events are grouped by date, dates with events are kept sorted to
+    get events in a date range without iterating over each day.
 
     Usage:
         calendar = EventsCalendar()
@@ -142,15 +140,20 @@ class EventsCalendar(ABC):
     """
 
     def __init__(self, week_starts_on):
-        self._date_to_events = defaultdict(list)
+        self._date_to_events: Dict[datetime.date, List[CalendarEvent]] = {}
+        # Sorted list of dates with attached events
+        self._dates: List[datetime.date] = []
         self.week_starts_on = week_starts_on
         self._cal = Calendar(firstweekday=self.week_starts_on)
 
     def _add_events(self, events: Iterable[CalendarEvent]):
-        # Note: Day events order could be broken on subsequent calls
-        events = sorted(events, key=lambda evt: (evt.date, evt.starts_at))
+        updated_dates = set()
         for event in events:
-            self._date_to_events[event.date].append(event)
+            self._date_to_events.setdefault(event.date, []).append(event)
+            updated_dates.add(event.date)
+        for d in updated_dates:
+            self._date_to_events[d].sort(key=lambda evt: evt.starts_at)
+        self._dates = sorted(self._date_to_events)
 
     @property
     def week_titles(self):
@@ -169,7 +172,8 @@ class EventsCalendar(ABC):
             iso_week_number = full_week[0].isocalendar()[1]
             week_days = []
             for day in full_week:
-                data = CalendarDay(date=day, events=self._date_to_events[day])
+                data = CalendarDay(date=day,
+                                   events=self._date_to_events.get(day, []))
                 week_days.append(data)
             weeks.append(CalendarWeek(iso_number=iso_week_number,
                                       days=week_days))
@@ -182,14 +186,10 @@ class EventsCalendar(ABC):
         Returns a list of calendar days that have attached events in
         a range [start, end].
         """
-        days = []
-        for dt in rrule(DAILY, dtstart=start, until=end):
-            d = dt.date()
-            events = self._date_to_events[d]
-            if events:
-                day = CalendarDay(date=d, events=events)
-                days.append(day)
-        return days
+        lo = bisect_left(self._dates, start)
+        hi = bisect_right(self._dates, end)
+        return [CalendarDay(date=d, events=self._date_to_events[d])
+                for d in self._dates[lo:hi]]
 
 
 # TODO: more generic class DateRangeEventsCalendar? No need right now
@@ -205,8 +205,7 @@ class MonthFullWeeksEventsCalendar(EventsCalendar):
         self.month_period = month_period
         begin, end = extended_month_date_range(month_period,
                                                week_start_on=week_starts_on)
-        self._add_events((e for e in events if
-                          e.date >= begin or e.date <= end))
+        self._add_events((e for e in events if begin <= e.date <= end))
 
     @property
     def prev_month(self):
@@ -0,0 +1,59 @@
+from django.core.management import BaseCommand
+
+from core.models import RenderedMarkdown
+from core.utils import get_markdown_content_hash, render_markdown_many
+from courses.models import Assignment, Course, CourseClass, Semester
+from learning.models import GraduateProfile
+
+
+class Command(BaseCommand):
+    help = ("Pre-renders markdown texts of the current term courses and "
+            "graduate testimonials, removes stored html of other texts")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            dest='batch_size',
+                            help='Number of texts rendered in one pass')
+        parser.add_argument('--keep-stale', action='store_true',
+                            dest='keep_stale',
+                            help="Don't remove stored html of the texts "
+                                 "which are not pre-rendered")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        current_term = Semester.get_current()
+        querysets = {
+            "course descriptions": (
+                Course.objects
+                .filter(semester=current_term)
+                .values_list('description_ru', 'description_en',
+                             'internal_description', 'contacts')),
+            "class materials": (
+                CourseClass.objects
+                .filter(course__semester=current_term)
+                .values_list('description', 'other_materials')),
+            "assignment texts": (
+                Assignment.objects
+                .filter(course__semester=current_term)
+                .values_list('text')),
+            "graduate testimonials": (
+                GraduateProfile.active
+                .exclude(testimonial='')
+                .values_list('testimonial')),
+        }
+        content_hashes = set()
+        for name, queryset in querysets.items():
+            texts = {text for values in queryset.order_by().iterator()
+                     for text in values if text}
+            texts = list(texts)
+            for offset in range(0, len(texts), batch_size):
+                render_markdown_many(texts[offset:offset + batch_size],
+                                     persist=True)
+            content_hashes.update(get_markdown_content_hash(t) for t in texts)
+            self.stdout.write(f"Rendered {name}: {len(texts)}")
+        if not options['keep_stale']:
+            # Previous versions of the edited texts and texts of the past terms
+            deleted, _ = (RenderedMarkdown.objects
+                          .exclude(content_hash__in=content_hashes)
+                          .delete())
+            self.stdout.write(f"Removed stale records: {deleted}")
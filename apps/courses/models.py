@@ -529,7 +529,7 @@ class Course(TimezoneAwareMixin, TimeStampedModel, DerivableFieldsMixin):
     def has_unread(self):
         from notifications.middleware import get_unread_notifications_cache
         cache = get_unread_notifications_cache()
-        return self in cache.courseoffering_news
+        return self.pk in cache.courseoffering_news
 
     @property
     def name(self):
@@ -1,11 +1,22 @@
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from courses.models import Assignment, CourseTeacher, Semester
+from core.page_cache import invalidate_page_cache
+from courses.models import Assignment, Course, CourseClass, CourseTeacher, Semester
 from learning.models import EnrollmentPeriod
 
 
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=CourseClass)
+@receiver(post_delete, sender=CourseClass)
+@receiver(post_save, sender=CourseTeacher)
+@receiver(post_delete, sender=CourseTeacher)
+def invalidate_public_pages_cache(sender, *args, **kwargs):
+    invalidate_page_cache(sender._meta.label)
+
+
 @receiver(post_save, sender=Semester)
 def create_enrollment_period_for_compsciclub_ru(sender, instance: Semester,
                                                 created, *args, **kwargs):
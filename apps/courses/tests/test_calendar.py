@@ -1,3 +1,4 @@
+import dataclasses
 import datetime
 
 import pytest
@@ -69,3 +70,24 @@ def test_week_events_calendar(client, settings):
     for e in events:
         assert e.starts_at <= current_event.starts_at
         current_event = e
+
+
+@pytest.mark.django_db
+def test_month_events_calendar_date_range():
+    course_class = CourseClassFactory(date=datetime.date(year=2018, month=2, day=3))
+    event = CalendarEventFactory.create(course_class, time_zone=None)
+    dates = [
+        datetime.date(year=2018, month=1, day=28),  # out of range
+        datetime.date(year=2018, month=1, day=29),  # first day of the first week
+        datetime.date(year=2018, month=2, day=3),
+        datetime.date(year=2018, month=3, day=4),  # last day of the last week
+        datetime.date(year=2018, month=3, day=5),  # out of range
+    ]
+    events = [dataclasses.replace(event, date=d) for d in dates]
+    calendar = MonthFullWeeksEventsCalendar(month_period=MonthPeriod(2018, 2),
+                                            events=reversed(events))
+    days = calendar.days()
+    assert [day.date for day in days] == dates[1:-1]
+    assert calendar.weeks[0].days[0].events == [events[1]]
+    assert calendar.weeks[-1].days[-1].events == [events[3]]
+    assert calendar._days(dates[2], dates[2])[0].events == [events[2]]
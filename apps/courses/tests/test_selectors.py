@@ -1,3 +1,5 @@
+import datetime
+
 import pytest
 
 from core.tests.factories import BranchFactory
@@ -30,3 +32,20 @@ def test_get_classes_should_not_return_duplicate_classes():
     assert len(get_classes([branch1.pk])) == 1
     assert len(get_classes([branch2.pk])) == 1
     assert len(get_classes([branch1.pk, branch2.pk])) == 1
+
+
+@pytest.mark.django_db
+def test_get_classes_date_range():
+    branch = BranchFactory()
+    course = CourseFactory(main_branch=branch, branches=[branch])
+    for day in (1, 10, 20):
+        CourseClassFactory(course=course,
+                           date=datetime.date(year=2018, month=2, day=day))
+    start_date = datetime.date(year=2018, month=2, day=10)
+    end_date = datetime.date(year=2018, month=2, day=20)
+    assert len(get_classes([branch.pk], start_date=start_date)) == 2
+    assert len(get_classes([branch.pk], end_date=start_date)) == 2
+    assert len(get_classes([branch.pk], start_date=start_date,
+                           end_date=start_date)) == 1
+    assert len(get_classes([branch.pk], start_date=start_date,
+                           end_date=end_date)) == 2
@@ -132,7 +132,7 @@ class AssignmentCreateView(AssignmentCreateUpdateBaseView):
         attachments = self.request.FILES.getlist('assignment-attachments')
         with transaction.atomic(savepoint=False):
             assignment = assignment_form.save()
-            AssignmentService.bulk_create_student_assignments(assignment)
+            AssignmentService.generate_student_assignments(assignment)
             if assignment.assignee_mode == AssigneeMode.MANUAL:
                 data = responsible_teachers_form.to_internal()
                 AssignmentService.set_responsible_teachers(assignment,
@@ -1,11 +1,18 @@
 import logging
+import os
 import re
+import threading
+import time
 from dataclasses import dataclass
 from decimal import ROUND_DOWN, Decimal
 from enum import Enum, IntEnum
 from typing import Iterator, List, Optional, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from django.conf import settings
 
 from core.typings import assert_never
 from core.utils import normalize_yandex_login
@@ -20,6 +27,15 @@ YANDEX_CONTEST_PROBLEM_URL = YANDEX_CONTEST_URL + 'problems/{problem_id}/'
 YANDEX_CONTEST_PROBLEM_REGEX = re.compile(r"/contest/(?P<contest_id>[\d]+)/problems/(?P<problem_alias>[a-zA-Z0-9]*)(?P<trailing_slash>[/]?)")
 YANDEX_CONTEST_DOMAIN = "contest.yandex.ru"
 
+# Retries are made with exponential backoff: 0s, 1s, 2s, ...
+CONTEST_API_MAX_RETRIES = 3
+CONTEST_API_BACKOFF_FACTOR = 0.5
+CONTEST_API_RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Upper bound for the delay requested by the `Retry-After` header, in seconds
+CONTEST_API_RETRY_AFTER_MAX = 5
+# Requests slower than this value (in seconds) are logged as warnings
+CONTEST_API_SLOW_REQUEST = 3
+
 
 class RegisterStatus(IntEnum):
     CREATED = 201  # Successfully registered for contest
@@ -100,6 +116,70 @@ class YandexContestAPIException(Exception):
     pass
 
 
+class _ContestAPIRetry(Retry):
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is not None:
+            retry_after = min(retry_after, CONTEST_API_RETRY_AFTER_MAX)
+        return retry_after
+
+
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+
+def _create_session() -> requests.Session:
+    # Only idempotent requests are retried after the request was sent,
+    # connection errors are retried for any method.
+    retry = _ContestAPIRetry(total=CONTEST_API_MAX_RETRIES,
+                             backoff_factor=CONTEST_API_BACKOFF_FACTOR,
+                             status_forcelist=CONTEST_API_RETRY_STATUSES,
+                             allowed_methods=frozenset(['GET']),
+                             raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=1,
+                          pool_maxsize=settings.YANDEX_CONTEST_API_POOL_SIZE,
+                          max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Returns HTTP session shared by all API clients of the current process,
+    connections to the Yandex.Contest API are kept alive and reused.
+    Forked processes (e.g. rq workers) create their own session.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = _create_session()
+                _session_pid = pid
+    return _session
+
+
+def send_request(method: str, url: str, **kwargs) -> requests.Response:
+    """Sends request with a shared session and logs response time."""
+    started_at = time.monotonic()
+    status_code = None
+    try:
+        response = get_session().request(method, url, **kwargs)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.monotonic() - started_at
+        log_level = logging.DEBUG
+        if elapsed > CONTEST_API_SLOW_REQUEST:
+            log_level = logging.WARNING
+        logger.log(log_level, f"{method.upper()} {url} {status_code} "
+                              f"{elapsed:.3f}s",
+                   extra={"method": method, "url": url,
+                          "status_code": status_code, "elapsed": elapsed})
+
+
 def cast_contest_error(exc) -> Exception:
     from rest_framework import status
     from rest_framework.exceptions import APIException
@@ -159,10 +239,10 @@ class YandexContestAPI:
         payload = {'login': yandex_login}
         api_contest_url = self.PARTICIPANTS_URL.format(contest_id=contest_id)
         try:
-            response = requests.post(api_contest_url,
-                                     headers=headers,
-                                     params=payload,
-                                     timeout=timeout)
+            response = send_request("post", api_contest_url,
+                                    headers=headers,
+                                    params=payload,
+                                    timeout=timeout)
             response.raise_for_status()
         # Network problems
         except (requests.ConnectionError, requests.Timeout) as e:
@@ -259,31 +339,31 @@ class YandexContestAPI:
     @staticmethod
     def request_and_check(url, method, **kwargs):
         assert method in ('post', 'get')
-        # try:
-        response = getattr(requests, method)(url, **kwargs)
-        response.raise_for_status()
-        return response
-        # # Some of the network problems
-        # except (requests.ConnectionError, requests.Timeout) as e:
-        #     raise Unavailable() from e
-        # # Client 4xx or server 5xx HTTP errors
-        # except requests.exceptions.HTTPError as e:
-        #     response = e.response
-        #     try:
-        #         s = response.status_code
-        #         ResponseStatus(s)  # known statuses
-        #         raise ContestAPIError(code=s, message=response.text) from e
-        #     except ValueError:
-        #         # Unpredictable client or server error
-        #         logger.exception("Contest API service had internal error.")
-        #         raise Unavailable() from e
+        try:
+            response = send_request(method, url, **kwargs)
+            response.raise_for_status()
+            return response
+        # Some of the network problems
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise Unavailable() from e
+        # Client 4xx or server 5xx HTTP errors
+        except requests.exceptions.HTTPError as e:
+            response = e.response
+            try:
+                ResponseStatus(response.status_code)  # known statuses
+            except ValueError:
+                # Unpredictable client or server error (retries are exhausted)
+                logger.exception("Contest API service had internal error.")
+                raise Unavailable() from e
+            raise ContestAPIError(code=response.status_code,
+                                  message=response.text) from e
 
     # FIXME: api.contest(42).participant(1).info()
     def participant_info(self, contest_id, participant_id):
         headers = self.base_headers
         url = self.PARTICIPANT_URL.format(contest_id=contest_id,
                                           pid=participant_id)
-        response = requests.get(url, headers=headers, timeout=1)
+        response = send_request("get", url, headers=headers, timeout=1)
         if response.status_code != ResponseStatus.SUCCESS:
             raise YandexContestAPIException(response.status_code, response.text)
         info = response.json()
@@ -1,20 +1,45 @@
 import logging
-from datetime import timedelta
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
 
 import django_rq
+import requests
 from django_rq import job
 
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models.signals import post_save
 
+from core.locks import acquire_cache_lock, release_cache_lock
+from core.timezone import get_now_utc
 from grading.api.yandex_contest import (
     ContestAPIError, SubmissionVerdict, Unavailable, YandexContestAPI
 )
 from grading.constants import CheckingSystemTypes
-from grading.utils import YandexContestScoreSource
+from grading.utils import YandexContestScoreSource, count_poll_attempts
+
+if TYPE_CHECKING:
+    from grading.models import Submission
 
 logger = logging.getLogger(__name__)
 
+# Delay between runs of the submissions poller, also the delay before
+# the first check of the submission status
+YANDEX_CONTEST_POLL_INTERVAL = 15  # seconds
+# Delay between status checks of the same submission grows up to this value
+YANDEX_CONTEST_POLL_MAX_DELAY = 10 * 60  # seconds
+# Max number of concurrent requests to the Yandex.Contest API
+YANDEX_CONTEST_POLL_MAX_WORKERS = 8
+# Give up on the submission after this number of failed status requests
+YANDEX_CONTEST_POLL_MAX_ERRORS = 5
+YANDEX_CONTEST_POLLER_SCHEDULED = "grading.yandex_contest_poller_scheduled"
+YANDEX_CONTEST_POLLER_RUNNING = "grading.yandex_contest_poller_running"
+YANDEX_CONTEST_POLL_STATE_KEY = "grading.yandex_contest_poll_state_{submission_id}"
+YANDEX_CONTEST_POLL_STATE_TIMEOUT = 3600 * 24
+
 
 def get_submission(submission_id) -> Optional["Submission"]:
     from grading.models import Submission
@@ -126,73 +151,249 @@ def add_new_submission_to_checking_system(submission_id, *, retries):
             return e.message
     submission.meta = json_data
     submission.status = SubmissionStatus.CHECKING
-    submission.save(update_fields=['meta', 'status'])
+    # Modification time is used as a start time of the remote check
+    submission.save(update_fields=['meta', 'status', 'modified_at'])
+    schedule_yandex_contest_submissions_monitoring()
+
+
+def schedule_yandex_contest_submissions_monitoring() -> None:
+    """
+    Schedules the next run of the submissions poller if it's not scheduled yet.
+    """
+    # Flag expires in case the scheduled job was lost
+    timeout = YANDEX_CONTEST_POLL_INTERVAL * 4
+    if not acquire_cache_lock(YANDEX_CONTEST_POLLER_SCHEDULED, timeout=timeout):
+        return
     scheduler = django_rq.get_scheduler('default')
-    scheduler.enqueue_in(timedelta(seconds=15),
-                         monitor_submission_status_in_yandex_contest,
-                         submission_id,
-                         json_data['runId'],
-                         delay_min=1)
+    scheduler.enqueue_in(timedelta(seconds=YANDEX_CONTEST_POLL_INTERVAL),
+                         monitor_yandex_contest_submissions)
 
 
 @job('default')
 def monitor_submission_status_in_yandex_contest(submission_id,
                                                 remote_submission_id,
                                                 delay_min=1):
-    submission = get_submission(submission_id)
-    if not submission:
-        return "Submission not found"
-    checker = submission.assignment_submission.student_assignment.assignment.checker
-    checking_system_settings = checker.checking_system.settings
-    access_token = checking_system_settings['access_token']
-    api = YandexContestAPI(
-        access_token=access_token,
-        refresh_token=access_token)
-    try:
-        status, json_data = api.submission_details(
-            checker.settings['contest_id'],
-            remote_submission_id, full=True, timeout=10)
-    except Unavailable as e:
-        scheduler = django_rq.get_scheduler('default')
-        scheduler.enqueue_in(timedelta(minutes=10),
-                             monitor_submission_status_in_yandex_contest,
-                             submission_id,
-                             remote_submission_id,
-                             delay_min=1)
-        logger.info(f"Remote server is unavailable. "
-                    f"Repeat job in 10 minutes.")
-        return f"Unavailable. Requeue job in 10 minutes. "
-    except ContestAPIError as e:
-        raise
-    # Wait until remote submission check is not finished
-    if json_data['status'] == 'FAILED':
-        logger.error(f"Remote check for local "
-                     f"submission {submission_id} has failed!")
-        raise ContestAPIError(f"runId {remote_submission_id} has failed")
-    elif json_data['status'] != 'FINISHED':
-        scheduler = django_rq.get_scheduler('default')
-        scheduler.enqueue_in(timedelta(minutes=delay_min),
-                             monitor_submission_status_in_yandex_contest,
-                             submission_id,
-                             remote_submission_id,
-                             delay_min=delay_min + 1)
-        logger.info(f"Submission check {remote_submission_id} is not finished. "
-                    f"Rerun in {delay_min} minutes.")
-        return f"ContestAPIError. Requeue job in {delay_min} minutes"
-    # TODO: Investigate how to escape html and store it in json
-    # TODO: g.e. look at encoders in simplejson
-    json_data.pop("source", None)
-    json_data.pop("diff", None)
-    if "checkerLog" in json_data:
-        # Output could contain null character \u0000 which is not valid for
-        # the postgres jsonb field type
-        for row in json_data["checkerLog"]:
-            row.pop("input", None)
-            row.pop("output", None)
+    """
+    Deprecated: submissions are tracked by `monitor_yandex_contest_submissions`.
+    Kept for the jobs scheduled before the migration.
+    """
+    schedule_yandex_contest_submissions_monitoring()
+
+
+def is_yandex_contest_poll_due(checking_since: datetime,
+                               last_polled_at: Optional[datetime],
+                               now: datetime) -> bool:
+    """
+    Checks that submission status must be updated on the current run of
+    the poller. The delay between checks grows exponentially.
+    """
+    if last_polled_at is None:
+        return True
+    poll_attempts = partial(count_poll_attempts,
+                            base_delay=YANDEX_CONTEST_POLL_INTERVAL,
+                            max_delay=YANDEX_CONTEST_POLL_MAX_DELAY)
+    elapsed = (now - checking_since).total_seconds()
+    elapsed_on_last_poll = (last_polled_at - checking_since).total_seconds()
+    return poll_attempts(elapsed) > poll_attempts(elapsed_on_last_poll)
+
+
+def _get_poll_state_key(submission_id: int) -> str:
+    return YANDEX_CONTEST_POLL_STATE_KEY.format(submission_id=submission_id)
+
+
+def get_yandex_contest_poll_states(submission_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Returns time of the last status check and the number of failed requests
+    for each submission that has been polled before.
+    """
+    cache_keys = {_get_poll_state_key(pk): pk for pk in submission_ids}
+    if not cache_keys:
+        return {}
+    states = cache.get_many(list(cache_keys))
+    return {cache_keys[key]: state for key, state in states.items()}
+
+
+def save_yandex_contest_poll_states(states: Dict[int, Dict[str, Any]]) -> None:
+    cache.set_many({_get_poll_state_key(pk): state
+                    for pk, state in states.items()},
+                   timeout=YANDEX_CONTEST_POLL_STATE_TIMEOUT)
+
+
+def fetch_yandex_contest_submissions_details(submissions: List["Submission"]) -> Tuple[List[Tuple["Submission", Dict[str, Any]]], List["Submission"]]:
+    """
+    Requests remote submission details concurrently. Submissions of the contest
+    are skipped till the next run if the Yandex.Contest API is unavailable.
+
+    Returns submission details and submissions with failed requests.
+    """
+    clients: Dict[str, YandexContestAPI] = {}
+    unavailable_contests = set()
+    lock = threading.Lock()
+
+    def get_details(client: YandexContestAPI, contest_id: int, run_id: int):
+        """Returns submission details or error flag"""
+        with lock:
+            if contest_id in unavailable_contests:
+                return None, False
+        try:
+            _, json_data = client.submission_details(contest_id, run_id,
+                                                     full=True, timeout=10)
+            return json_data, False
+        except (Unavailable, requests.ConnectionError, requests.Timeout):
+            with lock:
+                unavailable_contests.add(contest_id)
+            logger.info(f"Yandex.Contest API is unavailable for contest {contest_id}")
+            return None, False
+        except (ContestAPIError, requests.RequestException):
+            logger.exception(f"Yandex.Contest api request error [runId = {run_id}]")
+            return None, True
+
+    with ThreadPoolExecutor(max_workers=YANDEX_CONTEST_POLL_MAX_WORKERS) as executor:
+        futures = []
+        for submission in submissions:
+            checker = submission.checker
+            access_token = checker.checking_system.settings['access_token']
+            if access_token not in clients:
+                clients[access_token] = YandexContestAPI(access_token=access_token,
+                                                         refresh_token=access_token)
+            future = executor.submit(get_details, clients[access_token],
+                                     checker.settings['contest_id'],
+                                     submission.meta['runId'])
+            futures.append((submission, future))
+        results = []
+        failed = []
+        for submission, future in futures:
+            json_data, has_error = future.result()
+            if json_data is not None:
+                results.append((submission, json_data))
+            elif has_error:
+                failed.append(submission)
+    return results, failed
+
+
+def _save_submissions(submissions: List["Submission"], update_fields: List[str]) -> None:
+    from grading.models import Submission
     with transaction.atomic():
-        submission.meta = json_data
-        if json_data['verdict'] == SubmissionVerdict.OK.value:
-            submission.status = submission.STATUSES.PASSED
+        Submission.objects.bulk_update(submissions, fields=update_fields)
+        # Send signal to trigger callbacks:
+        # - upload passed code review submission to gerrit
+        for submission in submissions:
+            post_save.send(Submission, instance=submission, created=False,
+                           update_fields=frozenset(update_fields))
+
+
+def update_yandex_contest_submissions(results: List[Tuple["Submission", Dict[str, Any]]]) -> List["Submission"]:
+    """
+    Saves verdicts of the finished remote checks in one transaction.
+    Returns updated submissions.
+    """
+    from grading.constants import SubmissionStatus
+    finished = []
+    for submission, json_data in results:
+        # Wait until remote submission check is not finished
+        if json_data['status'] == 'FAILED':
+            logger.error(f"Remote check for local "
+                         f"submission {submission.pk} has failed!")
+            submission.status = SubmissionStatus.SUBMIT_FAIL
+        elif json_data['status'] != 'FINISHED':
+            continue
+        elif json_data['verdict'] == SubmissionVerdict.OK.value:
+            submission.status = SubmissionStatus.PASSED
         else:
-            submission.status = submission.STATUSES.FAILED
-        submission.save(update_fields=["status", "meta"])
+            submission.status = SubmissionStatus.FAILED
+        # TODO: Investigate how to escape html and store it in json
+        # TODO: g.e. look at encoders in simplejson
+        json_data.pop("source", None)
+        json_data.pop("diff", None)
+        if "checkerLog" in json_data:
+            # Output could contain null character \u0000 which is not valid for
+            # the postgres jsonb field type
+            for row in json_data["checkerLog"]:
+                row.pop("input", None)
+                row.pop("output", None)
+        submission.meta = json_data
+        finished.append(submission)
+    if finished:
+        _save_submissions(finished, update_fields=["status", "meta"])
+    return finished
+
+
+def fail_yandex_contest_submissions(submissions: List["Submission"]) -> None:
+    """
+    Stops tracking of the submissions that can't be checked, e.g. remote
+    submission id is unknown or the API constantly responds with an error.
+    """
+    from grading.constants import SubmissionStatus
+    for submission in submissions:
+        logger.error(f"Stop tracking status of the submission {submission.pk}")
+        submission.status = SubmissionStatus.SUBMIT_FAIL
+    if submissions:
+        _save_submissions(submissions, update_fields=["status"])
+
+
+@job('default', timeout=YANDEX_CONTEST_POLL_MAX_DELAY)
+def monitor_yandex_contest_submissions():
+    """
+    Tracks status of all submissions on checking in Yandex.Contest.
+    Reschedules itself until all remote checks are finished.
+    """
+    # Release the flag before anything else so the next run could be
+    # scheduled even if this run is skipped
+    release_cache_lock(YANDEX_CONTEST_POLLER_SCHEDULED)
+    if not acquire_cache_lock(YANDEX_CONTEST_POLLER_RUNNING,
+                              timeout=YANDEX_CONTEST_POLL_MAX_DELAY):
+        # Previous run is still in progress, try again later since it
+        # could miss the recently added submissions
+        logger.info("Yandex.Contest submissions poller is already running")
+        schedule_yandex_contest_submissions_monitoring()
+        return
+    try:
+        has_pending = poll_yandex_contest_submissions()
+    finally:
+        release_cache_lock(YANDEX_CONTEST_POLLER_RUNNING)
+    if has_pending:
+        schedule_yandex_contest_submissions_monitoring()
+
+
+def poll_yandex_contest_submissions() -> bool:
+    """
+    Updates status of the submissions on checking in Yandex.Contest which
+    are due for a check. Returns True if some of them are still in progress.
+    """
+    from grading.constants import SubmissionStatus
+    from grading.models import Submission
+    now = get_now_utc()
+    checking_system = "assignment_submission__student_assignment__assignment__checker__checking_system"
+    submissions = list(Submission.objects
+                       .filter(status=SubmissionStatus.CHECKING,
+                               **{f"{checking_system}__type": CheckingSystemTypes.YANDEX_CONTEST})
+                       .select_related("assignment_submission",
+                                       "assignment_submission__student_assignment__assignment__checker",
+                                       checking_system)
+                       .order_by("pk"))
+    unknown = [s for s in submissions if "runId" not in s.meta]
+    pollable = [s for s in submissions if "runId" in s.meta]
+    poll_states = get_yandex_contest_poll_states(s.pk for s in pollable)
+    due = []
+    for submission in pollable:
+        state = poll_states.get(submission.pk, {})
+        if is_yandex_contest_poll_due(submission.modified_at,
+                                      state.get("polled_at"), now):
+            due.append(submission)
+    results, failed = fetch_yandex_contest_submissions_details(due)
+    finished = update_yandex_contest_submissions(results)
+    failed_ids = {s.pk for s in failed}
+    new_poll_states = {}
+    exhausted = []
+    for submission in due:
+        state = poll_states.get(submission.pk, {})
+        errors = state.get("errors", 0) + int(submission.pk in failed_ids)
+        new_poll_states[submission.pk] = {"polled_at": now, "errors": errors}
+        if errors >= YANDEX_CONTEST_POLL_MAX_ERRORS:
+            exhausted.append(submission)
+    save_yandex_contest_poll_states(new_poll_states)
+    fail_yandex_contest_submissions(unknown + exhausted)
+    logger.info(f"Checked {len(due)} of {len(submissions)} submissions, "
+                f"{len(finished)} finished, "
+                f"{len(unknown) + len(exhausted)} failed")
+    return len(finished) + len(exhausted) < len(pollable)
@@ -0,0 +1,42 @@
+import pytest
+import requests
+
+from grading.api.yandex_contest import (
+    ContestAPIError, ResponseStatus, Unavailable, YandexContestAPI, get_session
+)
+
+
+def _response(status_code, text=''):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = text.encode()
+    return response
+
+
+def test_get_session_is_shared():
+    session = get_session()
+    assert get_session() is session
+    adapter = session.get_adapter(YandexContestAPI.BASE_URL)
+    assert adapter.max_retries.total > 0
+    assert 'POST' not in adapter.max_retries.allowed_methods
+
+
+def test_request_and_check_errors(mocker):
+    mocked_request = mocker.patch('requests.Session.request')
+    url = YandexContestAPI.CONTEST_URL.format(contest_id=1)
+    mocked_request.return_value = _response(ResponseStatus.SUCCESS, '{}')
+    response = YandexContestAPI.request_and_check(url, 'get')
+    assert response.json() == {}
+    mocked_request.return_value = _response(ResponseStatus.NOT_FOUND,
+                                            'Not Found')
+    with pytest.raises(ContestAPIError) as e:
+        YandexContestAPI.request_and_check(url, 'get')
+    assert e.value.code == ResponseStatus.NOT_FOUND
+    assert e.value.message == 'Not Found'
+    # Unknown server error after all retries
+    mocked_request.return_value = _response(503)
+    with pytest.raises(Unavailable):
+        YandexContestAPI.request_and_check(url, 'get')
+    mocked_request.side_effect = requests.ConnectionError
+    with pytest.raises(Unavailable):
+        YandexContestAPI.request_and_check(url, 'get')
@@ -0,0 +1,105 @@
+import pytest
+
+from django.core.cache import caches
+
+from core.locks import acquire_cache_lock
+from grading.api.yandex_contest import ContestAPIError, SubmissionVerdict
+from grading.constants import CheckingSystemTypes, SubmissionStatus
+from grading.tasks import (
+    YANDEX_CONTEST_POLL_MAX_ERRORS, YANDEX_CONTEST_POLLER_RUNNING,
+    get_yandex_contest_poll_states, monitor_yandex_contest_submissions,
+    save_yandex_contest_poll_states
+)
+from grading.tests.factories import CheckerFactory, SubmissionFactory
+from learning.models import AssignmentSubmissionTypes
+from learning.tests.factories import AssignmentCommentFactory
+
+
+@pytest.fixture
+def mocked_scheduler(mocker):
+    caches['default'].clear()
+    mocker.patch('grading.tasks.add_new_submission_to_checking_system')
+    return mocker.patch('django_rq.get_scheduler').return_value
+
+
+def create_checking_submission(checker, **meta):
+    comment = AssignmentCommentFactory(
+        student_assignment__assignment__checker=checker,
+        type=AssignmentSubmissionTypes.SOLUTION)
+    return SubmissionFactory(assignment_submission=comment,
+                             status=SubmissionStatus.CHECKING,
+                             meta=meta)
+
+
+def _details(status, verdict=None):
+    return 200, {"status": status, "verdict": verdict, "source": "code"}
+
+
+@pytest.mark.django_db
+def test_monitor_yandex_contest_submissions(mocker, mocked_scheduler):
+    checker = CheckerFactory(checking_system__type=CheckingSystemTypes.YANDEX_CONTEST)
+    submission1 = create_checking_submission(checker, runId=1)
+    submission2 = create_checking_submission(checker, runId=2)
+    submission3 = create_checking_submission(checker, runId=3)
+    details = {
+        1: _details("FINISHED", SubmissionVerdict.OK.value),
+        2: _details("FINISHED", SubmissionVerdict.WA.value),
+        3: _details("RUNNING"),
+    }
+    mocked_api = mocker.patch('grading.tasks.YandexContestAPI.submission_details')
+    mocked_api.side_effect = lambda contest_id, run_id, **kw: details[run_id]
+    monitor_yandex_contest_submissions()
+    assert mocked_api.call_count == 3
+    submission1.refresh_from_db()
+    assert submission1.status == SubmissionStatus.PASSED
+    assert "source" not in submission1.meta
+    submission2.refresh_from_db()
+    assert submission2.status == SubmissionStatus.FAILED
+    submission3.refresh_from_db()
+    assert submission3.status == SubmissionStatus.CHECKING
+    assert mocked_scheduler.enqueue_in.call_count == 1
+    # Submission was polled a moment ago
+    monitor_yandex_contest_submissions()
+    assert mocked_api.call_count == 3
+    assert mocked_scheduler.enqueue_in.call_count == 2
+    poll_states = get_yandex_contest_poll_states([submission3.pk])
+    assert poll_states[submission3.pk]["errors"] == 0
+    # Finish remote check
+    caches['default'].clear()
+    details[3] = _details("FINISHED", SubmissionVerdict.OK.value)
+    monitor_yandex_contest_submissions()
+    assert mocked_api.call_count == 4
+    submission3.refresh_from_db()
+    assert submission3.status == SubmissionStatus.PASSED
+    assert mocked_scheduler.enqueue_in.call_count == 2
+
+
+@pytest.mark.django_db
+def test_monitor_yandex_contest_submissions_concurrent_run(mocker, mocked_scheduler):
+    checker = CheckerFactory(checking_system__type=CheckingSystemTypes.YANDEX_CONTEST)
+    create_checking_submission(checker, runId=1)
+    mocked_api = mocker.patch('grading.tasks.YandexContestAPI.submission_details')
+    acquire_cache_lock(YANDEX_CONTEST_POLLER_RUNNING, timeout=60)
+    monitor_yandex_contest_submissions()
+    assert mocked_api.call_count == 0
+    # Skipped run schedules the next one
+    assert mocked_scheduler.enqueue_in.call_count == 1
+
+
+@pytest.mark.django_db
+def test_monitor_yandex_contest_submissions_gives_up(mocker, mocked_scheduler):
+    checker = CheckerFactory(checking_system__type=CheckingSystemTypes.YANDEX_CONTEST)
+    unknown = create_checking_submission(checker)
+    broken = create_checking_submission(checker, runId=1)
+    save_yandex_contest_poll_states({
+        broken.pk: {"polled_at": None, "errors": YANDEX_CONTEST_POLL_MAX_ERRORS - 1}
+    })
+    mocked_api = mocker.patch('grading.tasks.YandexContestAPI.submission_details')
+    mocked_api.side_effect = ContestAPIError(404, "Not Found")
+    monitor_yandex_contest_submissions()
+    assert mocked_api.call_count == 1
+    unknown.refresh_from_db()
+    assert unknown.status == SubmissionStatus.SUBMIT_FAIL
+    broken.refresh_from_db()
+    assert broken.status == SubmissionStatus.SUBMIT_FAIL
+    assert mocked_scheduler.enqueue_in.call_count == 0
@@ -1,6 +1,8 @@
+from functools import partial
+
 import pytest
 
-from grading.utils import parse_yandex_contest_url
+from grading.utils import count_poll_attempts, parse_yandex_contest_url
 
 
 def test_parse_yandex_contest_url_should_fail_for_wrong_domain():
@@ -52,3 +54,18 @@ def test_parse_yandex_contest_url_should_resolve_valid_links():
     parsed_url = parse_yandex_contest_url("https://contest.yandex.ru/contest/14")
     assert parsed_url.contest_id == 14
     assert parsed_url.problem_alias is None
+
+
+def test_count_poll_attempts():
+    poll_attempts = partial(count_poll_attempts, base_delay=15, max_delay=60)
+    assert poll_attempts(-5) == 0
+    assert poll_attempts(0) == 0
+    assert poll_attempts(14) == 0
+    assert poll_attempts(15) == 1
+    # Checkpoints: 15, 45, 105, 165, 225, ...
+    assert poll_attempts(44) == 1
+    assert poll_attempts(45) == 2
+    assert poll_attempts(105) == 3
+    assert poll_attempts(164) == 3
+    assert poll_attempts(165) == 4
+    assert poll_attempts(225) == 5
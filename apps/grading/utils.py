@@ -18,6 +18,23 @@ def get_yandex_contest_url(contest_id: int,
                                              problem_id=problem_id)
 
 
+def count_poll_attempts(elapsed: float, *, base_delay: float,
+                        max_delay: float) -> int:
+    """
+    Returns the number of status checks that should have been made
+    *elapsed* seconds after the start of the remote check.
+    The delay between checks doubles from *base_delay* up to *max_delay*.
+    """
+    attempts = 0
+    delay = base_delay
+    checkpoint = base_delay
+    while checkpoint <= elapsed:
+        attempts += 1
+        delay = min(delay * 2, max_delay)
+        checkpoint += delay
+    return attempts
+
+
 class YandexContestScoreSource(Enum):
     CONTEST = 'contest'
     PROBLEM = 'problem'
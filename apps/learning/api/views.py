@@ -19,6 +19,7 @@ from api.views import APIBaseView
 from auth.mixins import RolePermissionRequiredMixin
 from core.api.fields import CharSeparatedField, ScoreField
 from core.http import AuthenticatedAPIRequest
+from core.utils import render_markdown_many
 from courses.models import Assignment, Course
 from courses.permissions import CreateAssignment
 from courses.selectors import course_personal_assignments, get_course_teachers
@@ -78,6 +79,17 @@ class CourseAssignmentList(RolePermissionRequiredMixin, ApiErrorsMixin, ListAPIV
                 .filter(course_id=self.kwargs['course_id'])
                 .order_by('-deadline_at'))
 
+    def list(self, request, *args, **kwargs):
+        assignments = list(self.filter_queryset(self.get_queryset()))
+        texts = render_markdown_many((a.text for a in assignments),
+                                     use_persisted=True)
+        context = self.get_serializer_context()
+        context['rendered_texts'] = {a.pk: text for a, text
+                                     in zip(assignments, texts)}
+        serializer = self.get_serializer(assignments, many=True,
+                                         context=context)
+        return Response(serializer.data)
+
 
 # FIXME: return all records with deletedAt info (useful for queue)
 class CourseStudentsList(RolePermissionRequiredMixin, APIBaseView):
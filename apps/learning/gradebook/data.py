@@ -1,22 +1,40 @@
 from collections import OrderedDict
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 import numpy as np
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Q
 from django.utils.functional import cached_property
 
 from core.db.utils import normalize_score
-from courses.constants import AssignmentStatus
+from courses.constants import AssignmentFormat, AssignmentStatus
 from courses.models import Assignment, Course
 from learning.models import Enrollment, StudentAssignment, StudentGroup
+from learning.services.gradebook_service import get_gradebook_cache_version
 from learning.settings import GradeTypes
+from users.models import StudentTypes, User
 
-__all__ = ('GradebookStudent', 'GradeBookData', 'gradebook_data',
-           'get_student_assignment_state')
+__all__ = ('GradebookStudent', 'GradeBookData', 'GradeBookScores',
+           'gradebook_data', 'gradebook_data_values',
+           'get_cached_gradebook_data', 'get_student_assignment_state')
+
+# Scores, penalties and weights are stored with 2 decimal places, numeric
+# matrices keep them as integers multiplied by this value to avoid
+# rounding errors of floating point arithmetic
+SCORE_SCALE = 100
+
+GRADEBOOK_CACHE_KEY = "gradebook_{course_id}_{student_group}_{version}"
+# Limits lifetime of changes made outside of the services that
+# invalidate the cache (e.g. student profile data)
+GRADEBOOK_CACHE_TIMEOUT = 60 * 60
+
+
+def _to_scaled_int(value: Decimal) -> int:
+    return int(value.scaleb(2))
 
 
 class GradebookStudent:
@@ -69,12 +87,212 @@ class GradebookStudent:
         return None
 
 
+class NamedRecord:
+    __slots__ = ('pk', 'name')
+
+    def __init__(self, pk: int, name: str):
+        self.pk = pk
+        self.name = name
+
+    @property
+    def id(self) -> int:
+        return self.pk
+
+    def __str__(self):
+        return self.name
+
+
+def _get_named_record(cache: Dict[int, NamedRecord], pk: Optional[int],
+                      name: Optional[str]) -> Optional[NamedRecord]:
+    if pk is None:
+        return None
+    if pk not in cache:
+        cache[pk] = NamedRecord(pk, name)
+    return cache[pk]
+
+
+class UserRecord:
+    """Read-only subset of the `users.models.User` fields."""
+    __slots__ = ('pk', 'username', 'first_name', 'last_name', 'patronymic',
+                 'yandex_login', 'stepic_id', 'codeforces_login')
+
+    def __init__(self, pk, username, first_name, last_name, patronymic,
+                 yandex_login, stepic_id, codeforces_login):
+        self.pk = pk
+        self.username = username
+        self.first_name = first_name
+        self.last_name = last_name
+        self.patronymic = patronymic
+        self.yandex_login = yandex_login
+        self.stepic_id = stepic_id
+        self.codeforces_login = codeforces_login
+
+    @property
+    def id(self) -> int:
+        return self.pk
+
+    get_absolute_url = User.get_absolute_url
+    get_abbreviated_short_name = User.get_abbreviated_short_name
+    get_short_name = User.get_short_name
+    get_full_name = User.get_full_name
+
+
+class StudentProfileRecord:
+    """Read-only subset of the `users.models.StudentProfile` fields."""
+    __slots__ = ('user_id', 'type', 'branch', 'invitation')
+
+    def __init__(self, user_id: int, type: str, branch: NamedRecord,
+                 invitation: Optional[NamedRecord]):
+        self.user_id = user_id
+        self.type = type
+        self.branch = branch
+        self.invitation = invitation
+
+    def get_type_display(self) -> str:
+        return StudentTypes.values[self.type]
+
+
+class EnrollmentRecord:
+    """Read-only subset of the `learning.models.Enrollment` fields."""
+    __slots__ = ('pk', 'grade', 'student_group', 'student', 'student_profile')
+
+    def __init__(self, pk: int, grade: str,
+                 student_group: Optional[NamedRecord], student: UserRecord,
+                 student_profile: StudentProfileRecord):
+        self.pk = pk
+        self.grade = grade
+        self.student_group = student_group
+        self.student = student
+        self.student_profile = student_profile
+
+    @property
+    def student_id(self) -> int:
+        return self.student.pk
+
+    @property
+    def student_group_id(self) -> Optional[int]:
+        return self.student_group.pk if self.student_group else None
+
+
+class PersonalAssignmentRecord:
+    """Read-only subset of the `learning.models.StudentAssignment` fields."""
+    __slots__ = ('pk', 'score', 'penalty', 'status', 'student_id', 'assignment')
+
+    def __init__(self, pk: int, score: Optional[Decimal],
+                 penalty: Optional[Decimal], status: str, student_id: int,
+                 assignment: Assignment):
+        self.pk = pk
+        self.score = score
+        self.penalty = penalty
+        self.status = status
+        self.student_id = student_id
+        self.assignment = assignment
+
+    @property
+    def id(self) -> int:
+        return self.pk
+
+    @property
+    def assignment_id(self) -> int:
+        return self.assignment.pk
+
+    final_score = StudentAssignment.final_score
+    weighted_final_score = StudentAssignment.weighted_final_score
+    state_display = StudentAssignment.state_display
+    get_score_display = StudentAssignment.get_score_display
+    get_score_verbose_display = StudentAssignment.get_score_verbose_display
+    get_teacher_url = StudentAssignment.get_teacher_url
+
+
 @dataclass
 class GradebookAssignment:
     index: int
     assignment: Assignment
 
 
+class GradeBookScores:
+    """
+    Numeric representation of the gradebook. Rows are students, columns are
+    assignments (the same indexes as in `GradeBookData.student_assignments`).
+
+    Scores and penalties are integers scaled by `SCORE_SCALE`, *has_score*
+    and *has_penalty* masks tell whether the value is set, since zero-filled
+    matrices can't distinguish the missing value and zero.
+    """
+    def __init__(self, num_students: int, assignments: Dict[int, GradebookAssignment]):
+        shape = (num_students, len(assignments))
+        self.scores = np.zeros(shape, dtype=np.int64)
+        self.penalties = np.zeros(shape, dtype=np.int64)
+        self.has_score = np.zeros(shape, dtype=bool)
+        self.has_penalty = np.zeros(shape, dtype=bool)
+        gradebook_assignments = sorted(assignments.values(), key=lambda ga: ga.index)
+        self.weights = np.array([_to_scaled_int(ga.assignment.weight)
+                                 for ga in gradebook_assignments], dtype=np.int64)
+        self.passing_scores = np.array([ga.assignment.passing_score * SCORE_SCALE
+                                        for ga in gradebook_assignments],
+                                       dtype=np.int64)
+        self.is_penalty_format = np.array(
+            [ga.assignment.submission_type == AssignmentFormat.PENALTY
+             for ga in gradebook_assignments], dtype=bool)
+
+    def add(self, student_index: int, assignment_index: int,
+            score: Optional[Decimal], penalty: Optional[Decimal]) -> None:
+        if score is not None:
+            self.scores[student_index, assignment_index] = _to_scaled_int(score)
+            self.has_score[student_index, assignment_index] = True
+        if penalty is not None:
+            self.penalties[student_index, assignment_index] = _to_scaled_int(penalty)
+            self.has_penalty[student_index, assignment_index] = True
+
+    @cached_property
+    def final_scores(self) -> np.ndarray:
+        """
+        Vectorized version of `StudentAssignment.final_score`. Missing
+        values are equal to zero, see `.missing` mask.
+        """
+        # Negative penalty value is stored in a score field for `penalty`
+        # assignment format
+        final_scores = np.where(self.is_penalty_format, -self.scores,
+                                self.scores + self.penalties)
+        return np.where(self.missing, 0, final_scores)
+
+    @cached_property
+    def missing(self) -> np.ndarray:
+        """Mask of cells without final score."""
+        return np.where(self.is_penalty_format, ~self.has_score,
+                        ~self.has_score & ~self.has_penalty)
+
+    def total_scores(self) -> np.ndarray:
+        """
+        Returns sum of weighted final scores for each student scaled
+        by `SCORE_SCALE ** 2`.
+        """
+        return self.final_scores @ self.weights
+
+    def total_scores_display(self) -> List[Decimal]:
+        scale = Decimal(SCORE_SCALE ** 2)
+        return [normalize_score(Decimal(int(total)) / scale)
+                for total in self.total_scores()]
+
+    def assignment_averages(self) -> np.ndarray:
+        """
+        Returns average final score for each assignment (not scaled).
+        Value is `nan` if nobody has a score for the assignment.
+        """
+        scored = (~self.missing).sum(axis=0)
+        totals = self.final_scores.sum(axis=0) / SCORE_SCALE
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(scored > 0, totals / scored, np.nan)
+
+    def pass_counts(self) -> np.ndarray:
+        """
+        Returns the number of students with final score greater or equal to
+        the passing score for each assignment.
+        """
+        is_passed = (self.final_scores >= self.passing_scores) & ~self.missing
+        return is_passed.sum(axis=0)
+
+
 class GradeBookData:
     # Magic "100" constant - width of assignment column
     ASSIGNMENT_COLUMN_WIDTH = 100
@@ -84,7 +302,8 @@ class GradeBookData:
                  students: Dict[int, GradebookStudent],
                  assignments: Dict[int, GradebookAssignment],
                  student_assignments: np.ndarray,
-                 show_weight: bool = False):
+                 show_weight: bool = False,
+                 scores: Optional[GradeBookScores] = None):
         """
         X-axis of student_assignments ndarray is students data.
         We make some assertions on that, but still can fail in case
@@ -96,6 +315,7 @@ class GradeBookData:
         self.assignments = assignments
         self.student_assignments = student_assignments
         self.show_weight = show_weight
+        self.scores = scores
 
     def get_table_width(self):
         # First 3 columns in gradebook table, see `pages/_gradebook.scss`
@@ -163,19 +383,142 @@ def gradebook_data(course: Course, student_group: Optional[int] = None) -> Grade
     """
     # Collect active enrollments
     enrolled_students = OrderedDict()
-    course_enrollments = (Enrollment.active
-                          .filter(course=course))
-    if student_group is not None:
-        course_enrollments = course_enrollments.filter(student_group=student_group)
-    enrollments = (course_enrollments
+    enrollments = (_get_enrollments_queryset(course, student_group)
                    .select_related("student",
                                    "student_profile__branch",
                                    "student_profile__invitation",
-                                   "student_group")
-                   .order_by("student__last_name", "pk"))
+                                   "student_group"))
     for index, e in enumerate(enrollments.iterator()):
         enrolled_students[e.student_id] = GradebookStudent(e, index)
-    # Collect course assignments
+    assignments = _get_gradebook_assignments(course, student_group)
+    # Collect students progress
+    student_assignments = np.empty((len(enrolled_students), len(assignments)),
+                                   dtype=object)
+    scores = GradeBookScores(len(enrolled_students), assignments)
+    queryset = (_get_student_assignments_queryset(course, student_group)
+                .only("pk",
+                      "score",
+                      "penalty",
+                      "status",
+                      "meta",
+                      "assignment_id",
+                      "student_id"))
+    for student_assignment in queryset.iterator():
+        student_id = student_assignment.student_id
+        if student_id not in enrolled_students:
+            continue
+        student_index = enrolled_students[student_id].index
+        gradebook_assignment = assignments[student_assignment.assignment_id]
+        student_assignment.assignment = gradebook_assignment.assignment
+        student_assignments[student_index][gradebook_assignment.index] = student_assignment
+        scores.add(student_index, gradebook_assignment.index,
+                   student_assignment.score, student_assignment.penalty)
+    return _build_gradebook(course, enrolled_students, assignments,
+                            student_assignments, scores)
+
+
+def gradebook_data_values(course: Course,
+                          student_group: Optional[int] = None) -> GradeBookData:
+    """
+    Read-only alternative to `gradebook_data`. Builds the same gradebook
+    from `values_list` tuples without model instantiation (except course
+    assignments), personal assignments and enrollments are represented by
+    compact records with the subset of model API used in templates
+    and exports.
+
+    Note: records can't be saved, use `gradebook_data` to edit the gradebook.
+    """
+    branches: Dict[int, NamedRecord] = {}
+    invitations: Dict[int, NamedRecord] = {}
+    student_groups: Dict[int, NamedRecord] = {}
+    enrolled_students = OrderedDict()
+    enrollments = (_get_enrollments_queryset(course, student_group)
+                   .values_list("pk",
+                                "grade",
+                                "student_group_id",
+                                "student_group__name",
+                                "student_id",
+                                "student__username",
+                                "student__first_name",
+                                "student__last_name",
+                                "student__patronymic",
+                                "student__yandex_login",
+                                "student__stepic_id",
+                                "student__codeforces_login",
+                                "student_profile__type",
+                                "student_profile__branch_id",
+                                "student_profile__branch__name",
+                                "student_profile__invitation_id",
+                                "student_profile__invitation__name"))
+    for index, row in enumerate(enrollments.iterator()):
+        (enrollment_id, grade, group_id, group_name, student_id, *user_fields,
+         student_type, branch_id, branch_name, invitation_id, invitation_name) = row
+        student = UserRecord(student_id, *user_fields)
+        branch = _get_named_record(branches, branch_id, branch_name)
+        invitation = _get_named_record(invitations, invitation_id,
+                                       invitation_name)
+        student_profile = StudentProfileRecord(student_id, student_type,
+                                               branch, invitation)
+        group = _get_named_record(student_groups, group_id, group_name)
+        enrollment = EnrollmentRecord(enrollment_id, grade, group, student,
+                                      student_profile)
+        enrolled_students[student_id] = GradebookStudent(enrollment, index)
+    assignments = _get_gradebook_assignments(course, student_group)
+    student_assignments = np.empty((len(enrolled_students), len(assignments)),
+                                   dtype=object)
+    scores = GradeBookScores(len(enrolled_students), assignments)
+    queryset = (_get_student_assignments_queryset(course, student_group)
+                .values_list("pk",
+                             "score",
+                             "penalty",
+                             "status",
+                             "assignment_id",
+                             "student_id"))
+    for pk, score, penalty, status, assignment_id, student_id in queryset.iterator():
+        if student_id not in enrolled_students:
+            continue
+        student_index = enrolled_students[student_id].index
+        gradebook_assignment = assignments[assignment_id]
+        student_assignments[student_index][gradebook_assignment.index] = (
+            PersonalAssignmentRecord(pk, score, penalty, status, student_id,
+                                     gradebook_assignment.assignment))
+        scores.add(student_index, gradebook_assignment.index, score, penalty)
+    return _build_gradebook(course, enrolled_students, assignments,
+                            student_assignments, scores)
+
+
+def get_cached_gradebook_data(course: Course,
+                              student_group: Optional[int] = None) -> GradeBookData:
+    """
+    Returns read-only gradebook data (see `gradebook_data_values`) from
+    the cache. Cache is invalidated on updating scores, final grades,
+    enrollments or course assignments.
+    """
+    version = get_gradebook_cache_version(course.pk)
+    cache_key = GRADEBOOK_CACHE_KEY.format(course_id=course.pk,
+                                           student_group=student_group or "all",
+                                           version=version)
+    gradebook = cache.get(cache_key)
+    if gradebook is None:
+        gradebook = gradebook_data_values(course, student_group)
+        cache.set(cache_key, gradebook, GRADEBOOK_CACHE_TIMEOUT)
+    else:
+        gradebook.course = course
+    return gradebook
+
+
+def _get_enrollments_queryset(course: Course, student_group: Optional[int]):
+    """Returns active enrollments ordered by student last name."""
+    course_enrollments = (Enrollment.active
+                          .filter(course=course))
+    if student_group is not None:
+        course_enrollments = course_enrollments.filter(student_group=student_group)
+    return course_enrollments.order_by("student__last_name", "pk")
+
+
+def _get_gradebook_assignments(
+        course: Course,
+        student_group: Optional[int]) -> Dict[int, GradebookAssignment]:
     assignments = OrderedDict()
     queryset = Assignment.objects.filter(course_id=course.pk)
     if student_group is not None:
@@ -195,47 +538,36 @@ def gradebook_data(course: Course, student_group: Optional[int] = None) -> Grade
                 .order_by("deadline_at", "pk"))
     for index, a in enumerate(queryset.iterator()):
         assignments[a.pk] = GradebookAssignment(index, assignment=a)
-    # Collect students progress
-    student_assignments = np.empty((len(enrolled_students), len(assignments)),
-                                   dtype=object)
+    return assignments
+
+
+def _get_student_assignments_queryset(course: Course,
+                                      student_group: Optional[int]):
     filters = [Q(assignment__course_id=course.pk)]
     if student_group is not None:
         filters.append(Q(assignment__assignmentgroup__group=student_group) |
                        Q(assignment__assignmentgroup__group__isnull=True))
-    queryset = (StudentAssignment.objects
-                .filter(*filters)
-                .only("pk",
-                      "score",
-                      "penalty",
-                      "status",
-                      "meta",
-                      "assignment_id",
-                      "student_id")
-                .order_by("student_id", "assignment_id"))
-    for student_assignment in queryset.iterator():
-        student_id = student_assignment.student_id
-        if student_id not in enrolled_students:
-            continue
-        student_index = enrolled_students[student_id].index
-        gradebook_assignment = assignments[student_assignment.assignment_id]
-        student_assignment.assignment = gradebook_assignment.assignment
-        student_assignments[student_index][gradebook_assignment.index] = student_assignment
+    return (StudentAssignment.objects
+            .filter(*filters)
+            .order_by("student_id", "assignment_id"))
+
+
+def _build_gradebook(course: Course,
+                     students: Dict[int, GradebookStudent],
+                     assignments: Dict[int, GradebookAssignment],
+                     student_assignments: np.ndarray,
+                     scores: GradeBookScores) -> GradeBookData:
     # Aggregate student total score
-    for student_id in enrolled_students:
-        gradebook_student = enrolled_students[student_id]
-        student_progress = student_assignments[gradebook_student.index]
-        total_score = Decimal(0)
-        for s in student_progress:
-            if s is not None and s.final_score is not None:
-                total_score += s.weighted_final_score
-        total_score = normalize_score(total_score)
-        setattr(gradebook_student, "total_score", total_score)
+    total_scores = scores.total_scores_display()
+    for gradebook_student in students.values():
+        gradebook_student.total_score = total_scores[gradebook_student.index]
     show_weight = any(ga.assignment.weight < 1 for ga in assignments.values())
     return GradeBookData(course=course,
-                         students=enrolled_students,
+                         students=students,
                          assignments=assignments,
                          student_assignments=student_assignments,
-                         show_weight=show_weight)
+                         show_weight=show_weight,
+                         scores=scores)
 
 
 def get_student_assignment_state(student_assignment: StudentAssignment) -> str:
@@ -1,11 +1,13 @@
 import csv
 import logging
+from dataclasses import dataclass, field
 from decimal import Decimal
 from typing import IO, Callable, Dict, List, Optional
 
 from rest_framework import serializers
 
 from django.core.exceptions import ValidationError, PermissionDenied
+from django.db.models import TextChoices
 from django.utils.translation import gettext_lazy as _
 
 from core.forms import ScoreField
@@ -19,7 +21,7 @@ from grading.utils import YandexContestScoreSource
 from learning.models import Enrollment, StudentAssignment
 from learning.services.enrollment_service import update_enrollment_grade
 from learning.services.personal_assignment_service import (
-    update_personal_assignment_score
+    bulk_update_personal_assignment_scores
 )
 from learning.settings import AssignmentScoreUpdateSource, EnrollmentGradeUpdateSource, GradeTypes
 from users.models import User
@@ -30,6 +32,88 @@ CSVColumnName = str
 CSVColumnValue = str
 
 
+class ScoreImportStatus(TextChoices):
+    UPDATED = 'updated', _("Updated")
+    UNCHANGED = 'unchanged', _("Unchanged")
+    # Overridden by the next record of the same student
+    SKIPPED = 'skipped', _("Skipped")
+    INVALID = 'invalid', _("Invalid score")
+
+
+@dataclass
+class ScoreImportRecord:
+    # CSV row number or participant position in the contest standings
+    row_number: int
+    student_assignment_id: int
+    score_new: Optional[Decimal]
+    status: Optional[ScoreImportStatus] = None
+    score_old: Optional[Decimal] = None
+    error: str = ""
+
+
+@dataclass
+class ScoreImportResult:
+    records: List[ScoreImportRecord] = field(default_factory=list)
+    # Records that don't match any personal assignment
+    not_found: int = 0
+
+    @property
+    def found(self) -> int:
+        return len(self.records)
+
+    @property
+    def imported(self) -> int:
+        return sum(1 for r in self.records if r.status in (ScoreImportStatus.UPDATED,
+                                                          ScoreImportStatus.UNCHANGED))
+
+    def count(self, status: ScoreImportStatus) -> int:
+        return sum(1 for r in self.records if r.status == status)
+
+    def to_dict(self) -> Dict[str, int]:
+        stats = {status.value: self.count(status) for status in ScoreImportStatus}
+        stats['not_found'] = self.not_found
+        return stats
+
+
+def assignment_import_scores(*, assignment: Assignment,
+                             result: ScoreImportResult,
+                             changed_by: User,
+                             source: AssignmentScoreUpdateSource) -> ScoreImportResult:
+    """
+    Saves valid scores of the collected import records in one transaction
+    and sets the status of each record.
+    """
+    scores = {}
+    latest_records: Dict[int, ScoreImportRecord] = {}
+    for record in result.records:
+        if record.status == ScoreImportStatus.INVALID:
+            continue
+        if record.score_new is not None and record.score_new > assignment.maximum_score:
+            record.status = ScoreImportStatus.INVALID
+            record.error = f"Score {record.score_new} is greater than the maximum score"
+            logger.info(f"Invalid score {record.score_new} on line {record.row_number}")
+            continue
+        previous_record = latest_records.get(record.student_assignment_id)
+        if previous_record is not None:
+            previous_record.status = ScoreImportStatus.SKIPPED
+        latest_records[record.student_assignment_id] = record
+        scores[record.student_assignment_id] = record.score_new
+    updated = bulk_update_personal_assignment_scores(assignment=assignment,
+                                                     scores=scores,
+                                                     changed_by=changed_by,
+                                                     source=source)
+    for student_assignment_id, record in latest_records.items():
+        if student_assignment_id in updated:
+            record.status = ScoreImportStatus.UPDATED
+            record.score_old = updated[student_assignment_id]
+        else:
+            record.status = ScoreImportStatus.UNCHANGED
+            record.score_old = record.score_new
+    logger.info(f"{len(updated)} personal assignments of the assignment "
+                f"{assignment.pk} have been updated")
+    return result
+
+
 def get_assignment_checker(assignment: Assignment) -> Checker:
     if assignment.submission_type != AssignmentFormat.YANDEX_CONTEST:
         raise ValidationError("Wrong assignment format", code="invalid")
@@ -40,7 +124,7 @@ def get_assignment_checker(assignment: Assignment) -> Checker:
 
 def assignment_import_scores_from_yandex_contest(*, checker: Checker,
                                                  assignment: Assignment,
-                                                 triggered_by: User) -> None:
+                                                 triggered_by: User) -> ScoreImportResult:
     contest_id = checker.settings['contest_id']
 
     # Note: There is no API call to check that yandex contest problem max
@@ -48,29 +132,27 @@ def assignment_import_scores_from_yandex_contest(*, checker: Checker,
     enrolled_students = (Enrollment.active
                          .filter(course_id=assignment.course_id)
                          .exclude(student_profile__user__yandex_login_normalized='')
-                         .select_related('student_profile__user')
-                         .only('student_profile__user'))
-    students = {e.student_profile.user.yandex_login_normalized: e.student_profile.user
-                for e in enrolled_students}
-    student_assignments = StudentAssignment.objects.filter(assignment=assignment).order_by()
-    student_assignments = {s.student_id: s for s in student_assignments}
+                         .values_list('student_profile__user__yandex_login_normalized',
+                                      'student_profile__user_id'))
+    students = dict(enrolled_students)
+    student_assignments = (StudentAssignment.objects
+                           .filter(assignment=assignment)
+                           .values_list('student_id', 'pk', 'score')
+                           .order_by())
+    student_assignments = {student_id: (pk, score) for student_id, pk, score in student_assignments}
 
+    score_input = checker.settings.get('score_input')
     access_token = checker.checking_system.settings['access_token']
     client = YandexContestAPI(access_token=access_token, refresh_token=access_token)
-    for participant_results in yandex_contest_scoreboard_iterator(client, contest_id):
-        if participant_results.yandex_login not in students:
-            continue
-        student = students[participant_results.yandex_login]
+    result = ScoreImportResult()
+    scoreboard = yandex_contest_scoreboard_iterator(client, contest_id)
+    for row_number, participant_results in enumerate(scoreboard, start=1):
+        student_id = students.get(participant_results.yandex_login)
         # Student could leave the course or is on academic leave
-        if student.pk not in student_assignments:
+        if student_id not in student_assignments:
+            result.not_found += 1
             continue
-        student_assignment = student_assignments[student.pk]
-        assert student_assignment.assignment_id == assignment.pk
-        student_assignment.assignment = assignment
-        student_assignment.student = student
-
-        score_old = student_assignment.score
-        score_input = checker.settings.get('score_input')
+        student_assignment_id, score_old = student_assignments[student_id]
         if score_input == YandexContestScoreSource.PROBLEM.value:
             problem_alias = checker.settings['problem_id']
             gen = (pr for pr in participant_results.problems if pr.problem_alias == problem_alias)
@@ -84,12 +166,13 @@ def assignment_import_scores_from_yandex_contest(*, checker: Checker,
             score_new = participant_results.score_total
         else:
             raise serializers.ParseError("Unknown score input")
-
-        update_personal_assignment_score(student_assignment=student_assignment,
-                                         changed_by=triggered_by,
-                                         score_old=score_old,
-                                         score_new=score_new,
-                                         source=AssignmentScoreUpdateSource.API_YANDEX_CONTEST)
+        result.records.append(ScoreImportRecord(row_number=row_number,
+                                                student_assignment_id=student_assignment_id,
+                                                score_new=score_new))
+    return assignment_import_scores(assignment=assignment,
+                                    result=result,
+                                    changed_by=triggered_by,
+                                    source=AssignmentScoreUpdateSource.API_YANDEX_CONTEST)
 
 
 def assignment_import_scores_from_csv(csv_file: IO,
@@ -98,7 +181,12 @@ def assignment_import_scores_from_csv(csv_file: IO,
                                       student_assignments: Dict[CSVColumnValue, StudentAssignment],
                                       changed_by: User,
                                       audit_log_source: AssignmentScoreUpdateSource,
-                                      transform_value: Optional[Callable[[CSVColumnValue], CSVColumnValue]] = None):
+                                      transform_value: Optional[Callable[[CSVColumnValue], CSVColumnValue]] = None
+                                      ) -> ScoreImportResult:
+    """
+    Parses the whole file before saving, the file with invalid score format
+    is not imported at all.
+    """
     # Remove BOM by using 'utf-8-sig'
     f = (bs.decode("utf-8-sig") for bs in csv_file)
     reader = csv.DictReader(f)
@@ -109,35 +197,32 @@ def assignment_import_scores_from_csv(csv_file: IO,
 
     logger.info(f"Start processing csv")
 
-    found = 0
-    imported = 0
+    assignment = None
+    result = ScoreImportResult()
     for row_number, row in enumerate(reader, start=1):
         lookup_value = row[lookup_column_name].strip()
         if transform_value:
             lookup_value = transform_value(lookup_value)
         if lookup_value not in student_assignments:
+            result.not_found += 1
             continue
-        found += 1
         student_assignment = student_assignments[lookup_value]
+        assignment = student_assignment.assignment
         try:
             score_new = _score_to_python(row["score"])
         except ValidationError as e:
             logger.debug(e.message)
             raise ValidationError(f'Row {row_number}: {e.message}',
                                   code='invalid_score')
-            # TODO: collect errors instead?
-        try:
-            update_personal_assignment_score(student_assignment=student_assignment,
-                                             changed_by=changed_by,
-                                             score_old=student_assignment.score,
-                                             score_new=score_new,
-                                             source=audit_log_source)
-            logger.info(f"{score_new} points has written to the personal assignment {student_assignment.pk}")
-        except ValidationError:
-            logger.info(f"Invalid score {score_new} on line {row_number}")
-            continue
-        imported += 1
-    return found, imported
+        result.records.append(ScoreImportRecord(row_number=row_number,
+                                                student_assignment_id=student_assignment.pk,
+                                                score_new=score_new))
+    if assignment is None:
+        return result
+    return assignment_import_scores(assignment=assignment,
+                                    result=result,
+                                    changed_by=changed_by,
+                                    source=audit_log_source)
 
 
 def enrollment_import_grades_from_csv(csv_file: IO,
@@ -10,6 +10,7 @@ from bs4 import BeautifulSoup
 
 from django.contrib.messages import constants as messages_constants
 from django.contrib.messages import get_messages
+from django.core.cache import caches
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils.encoding import force_bytes, smart_bytes
 from django.utils.timezone import now
@@ -28,14 +29,23 @@ from courses.tests.factories import (
 from grading.tests.factories import CheckerFactory
 from learning.gradebook import (
     BaseGradebookForm, GradeBookFilterForm, GradeBookFormFactory,
-    get_student_assignment_state, gradebook_data
+    get_cached_gradebook_data, get_student_assignment_state, gradebook_data,
+    gradebook_data_values
+)
+from learning.gradebook.services import (
+    ScoreImportStatus, assignment_import_scores_from_csv
 )
-from learning.gradebook.services import assignment_import_scores_from_csv
 from learning.gradebook.views import ImportCourseGradesBaseView
-from learning.models import AssignmentSubmissionTypes, Enrollment, StudentAssignment, EnrollmentGradeLog
+from learning.models import (
+    AssignmentScoreAuditLog, AssignmentSubmissionTypes, Enrollment, EnrollmentGradeLog,
+    StudentAssignment
+)
 from learning.permissions import EditGradebook, ViewGradebook
+from learning.services.gradebook_service import (
+    get_gradebook_cache_version, invalidate_gradebook_cache
+)
 from learning.services.personal_assignment_service import (
-    get_personal_assignments_by_stepik_id
+    get_personal_assignments_by_stepik_id, update_personal_assignment_score
 )
 from learning.settings import (
     AssignmentScoreUpdateSource, Branches, GradeTypes, StudentStatuses, EnrollmentGradeUpdateSource
@@ -388,6 +398,109 @@ def test_total_score_weighted(client):
     assert head_student.total_score == expected_total_score - 2
 
 
+@pytest.mark.django_db
+def test_gradebook_data_scores_aggregates():
+    course = CourseFactory()
+    e1, e2, e3 = EnrollmentFactory.create_batch(3, course=course)
+    a1 = AssignmentFactory(course=course, weight=Decimal('0.5'),
+                           passing_score=3, maximum_score=10)
+    a2 = AssignmentFactory(course=course, passing_score=1, maximum_score=3,
+                           submission_type=AssignmentFormat.PENALTY)
+    (StudentAssignment.objects
+     .filter(assignment=a1, student=e1.student)
+     .update(score=Decimal('4.5')))
+    (StudentAssignment.objects
+     .filter(assignment=a1, student=e2.student)
+     .update(score=2))
+    (StudentAssignment.objects
+     .filter(assignment=a2, student=e2.student)
+     .update(score=1))
+    data = gradebook_data(course)
+    scores = data.scores
+    a1_index = data.assignments[a1.pk].index
+    a2_index = data.assignments[a2.pk].index
+    assert data.students[e1.student_id].total_score == Decimal('2.25')
+    assert data.students[e2.student_id].total_score == 0
+    assert data.students[e3.student_id].total_score == 0
+    averages = scores.assignment_averages()
+    assert averages[a1_index] == pytest.approx(3.25)
+    assert averages[a2_index] == pytest.approx(-1)
+    pass_counts = scores.pass_counts()
+    assert pass_counts[a1_index] == 1
+    assert pass_counts[a2_index] == 0
+
+
+@pytest.mark.django_db
+def test_gradebook_data_values():
+    course = CourseFactory()
+    student_group = StudentGroupFactory(course=course)
+    e1, e2 = EnrollmentFactory.create_batch(2, course=course,
+                                            student_group=student_group)
+    a1, a2 = AssignmentFactory.create_batch(2, course=course, maximum_score=10)
+    (StudentAssignment.objects
+     .filter(assignment=a1, student=e1.student)
+     .update(score=7))
+    expected = gradebook_data(course)
+    data = gradebook_data_values(course)
+    assert list(data.students) == list(expected.students)
+    assert list(data.assignments) == list(expected.assignments)
+    assert data.show_weight == expected.show_weight
+    for student_id, gradebook_student in data.students.items():
+        expected_student = expected.students[student_id]
+        assert gradebook_student.index == expected_student.index
+        assert gradebook_student.enrollment_id == expected_student.enrollment_id
+        assert gradebook_student.total_score == expected_student.total_score
+        assert gradebook_student.student_type == expected_student.student_type
+        assert gradebook_student.student_group.pk == student_group.pk
+        assert (gradebook_student.student.get_absolute_url() ==
+                expected_student.student.get_absolute_url())
+    for row, expected_row in zip(data.student_assignments,
+                                 expected.student_assignments):
+        for sa, expected_sa in zip(row, expected_row):
+            assert sa.pk == expected_sa.pk
+            assert sa.score == expected_sa.score
+            assert sa.state_display == expected_sa.state_display
+            assert sa.get_teacher_url() == expected_sa.get_teacher_url()
+    assert (GradeBookFormFactory.transform_to_initial(data) ==
+            GradeBookFormFactory.transform_to_initial(expected))
+
+
+@pytest.mark.django_db
+def test_get_cached_gradebook_data(django_assert_num_queries):
+    teacher = TeacherFactory()
+    course = CourseFactory(teachers=[teacher])
+    enrollment = EnrollmentFactory(course=course)
+    assignment = AssignmentFactory(course=course, maximum_score=10)
+    data = get_cached_gradebook_data(course)
+    assert data.students[enrollment.student_id].total_score == 0
+    with django_assert_num_queries(0):
+        get_cached_gradebook_data(course)
+    student_assignment = StudentAssignment.objects.get(assignment=assignment)
+    update_personal_assignment_score(student_assignment=student_assignment,
+                                     changed_by=teacher,
+                                     score_old=None,
+                                     score_new=Decimal(5),
+                                     source=AssignmentScoreUpdateSource.FORM_GRADEBOOK)
+    data = get_cached_gradebook_data(course)
+    assert data.students[enrollment.student_id].total_score == 5
+    AssignmentFactory(course=course)
+    data = get_cached_gradebook_data(course)
+    assert len(data.assignments) == 2
+
+
+@pytest.mark.django_db
+def test_gradebook_cache_version_is_shared():
+    course = CourseFactory()
+    version = get_gradebook_cache_version(course.pk)
+    # Version doesn't depend on the local cache of the process
+    caches['default'].clear()
+    assert get_gradebook_cache_version(course.pk) == version
+    invalidate_gradebook_cache(course.pk)
+    new_version = get_gradebook_cache_version(course.pk)
+    assert new_version != version
+    assert get_gradebook_cache_version(course.pk) == new_version
+
+
 @pytest.mark.django_db
 def test_save_gradebook_form(client):
     """Make sure that all fields are optional. Save only sent data"""
@@ -684,6 +797,51 @@ def test_gradebook_import_assignment_scores_from_csv_by_stepik_id_smoke(client,
         assert a_s.score == Decimal(expected_score)
 
 
+@pytest.mark.django_db
+def test_assignment_import_scores_from_csv_result():
+    teacher = TeacherFactory()
+    course = CourseFactory(teachers=[teacher])
+    students = StudentFactory.create_batch(3)
+    for i, student in enumerate(students, start=1):
+        student.stepic_id = i
+        student.save()
+        EnrollmentFactory(student=student, course=course)
+    assignment = AssignmentFactory(course=course, maximum_score=50)
+    (StudentAssignment.objects
+     .filter(assignment=assignment, student=students[1])
+     .update(score=20))
+    csv_file = BytesIO(force_bytes("stepik_id,score\n"
+                                   "1,10\n"
+                                   "1,15\n"
+                                   "2,20\n"
+                                   "3,51\n"
+                                   "4,30\n"))
+    result = assignment_import_scores_from_csv(
+        csv_file,
+        required_headers=['stepik_id', 'score'],
+        lookup_column_name='stepik_id',
+        student_assignments=get_personal_assignments_by_stepik_id(assignment=assignment),
+        changed_by=teacher,
+        audit_log_source=AssignmentScoreUpdateSource.CSV_STEPIK)
+    assert [r.status for r in result.records] == [
+        ScoreImportStatus.SKIPPED,
+        ScoreImportStatus.UPDATED,
+        ScoreImportStatus.UNCHANGED,
+        ScoreImportStatus.INVALID,
+    ]
+    assert result.found == 4
+    assert result.imported == 2
+    assert result.not_found == 1
+    scores = dict(StudentAssignment.objects
+                  .filter(assignment=assignment)
+                  .values_list('student_id', 'score'))
+    assert scores == {students[0].pk: 15, students[1].pk: 20, students[2].pk: None}
+    audit_log = AssignmentScoreAuditLog.objects.get()
+    assert audit_log.score_old is None
+    assert audit_log.score_new == 15
+    assert audit_log.changed_by == teacher
+
+
 @pytest.mark.django_db
 def test_gradebook_import_assignment_score_by_stepik_id(client):
     teacher = TeacherFactory()
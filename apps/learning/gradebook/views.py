@@ -28,7 +28,8 @@ from grading.api.yandex_contest import (
     ContestAPIError, Unavailable, YandexContestAPI, cast_contest_error
 )
 from learning.gradebook import (
-    BaseGradebookForm, GradeBookFilterForm, GradeBookFormFactory, gradebook_data
+    BaseGradebookForm, GradeBookFilterForm, GradeBookFormFactory, gradebook_data,
+    get_cached_gradebook_data
 )
 from learning.gradebook.data import get_student_assignment_state
 from learning.gradebook.services import (
@@ -109,7 +110,8 @@ class GradeBookView(PermissionRequiredMixin, CourseURLParamsMixin,
         selected_group = None
         if filter_form.is_valid():
             selected_group = filter_form.cleaned_data['student_group']
-        form = self.get_form(request.user, student_group=selected_group)
+        form = self.get_form(request.user, student_group=selected_group,
+                             for_display=True)
         context = self.get_context_data(form=form, filter_form=filter_form)
         return self.render_to_response(context)
 
@@ -127,8 +129,16 @@ class GradeBookView(PermissionRequiredMixin, CourseURLParamsMixin,
         return self.form_invalid(form)
 
     def get_form(self, user: User, data=None, files=None,
-                 student_group: Optional[int] = None, **kwargs):
-        self.gradebook = gradebook_data(self.course, student_group)
+                 student_group: Optional[int] = None,
+                 for_display: bool = False, **kwargs):
+        """
+        Set `for_display=True` if the form won't be saved, gradebook data
+        will be loaded from the cache without model instantiation.
+        """
+        if for_display:
+            self.gradebook = get_cached_gradebook_data(self.course, student_group)
+        else:
+            self.gradebook = gradebook_data(self.course, student_group)
         can_edit_gradebook = user.has_perm(EditGradebook.name, self.course)
         cls = GradeBookFormFactory.build_form_class(self.gradebook, is_readonly=not can_edit_gradebook)
         # Set initial data for all GET-requests
@@ -171,7 +181,8 @@ class GradeBookView(PermissionRequiredMixin, CourseURLParamsMixin,
         student_group = None
         if filter_form.is_valid():
             student_group = filter_form.cleaned_data['student_group']
-        self.gradebook = gradebook_data(self.course, student_group=student_group)
+        self.gradebook = get_cached_gradebook_data(self.course,
+                                                   student_group=student_group)
         current_data = GradeBookFormFactory.transform_to_initial(self.gradebook)
         data = form.data.copy()
         for k, v in current_data.items():
@@ -214,7 +225,7 @@ class GradeBookCSVView(PermissionRequiredMixin, CourseURLParamsMixin,
         return self.course
 
     def get(self, request, *args, **kwargs):
-        gradebook = gradebook_data(self.course)
+        gradebook = get_cached_gradebook_data(self.course)
         response = HttpResponse(content_type='text/csv; charset=utf-8')
         filename = "{}-{}-{}.csv".format(kwargs['course_slug'],
                                          kwargs['semester_year'],
@@ -310,9 +321,9 @@ class ImportAssignmentScoresBaseView(PermissionRequiredMixin, generic.View):
 
     def import_scores(self, assignment, csv_file):
         try:
-            found, imported = self._import_scores(assignment, csv_file)
+            result = self._import_scores(assignment, csv_file)
             msg = _("Imported records for assignment {} - {} out of {}").format(
-                assignment.title, imported, found)
+                assignment.title, result.imported, result.found)
             messages.info(self.request, msg)
         except ValidationError as e:
             msg = _('<b>Not all records were processed. '
@@ -479,11 +490,10 @@ class GradebookImportScoresFromYandexContest(RolePermissionRequiredMixin, APIBas
         assignment = get_object_or_404(queryset)
 
         checker = get_assignment_checker(assignment)
-        assignment_import_scores_from_yandex_contest(checker=checker, assignment=assignment,
-                                                     triggered_by=request.user)
+        result = assignment_import_scores_from_yandex_contest(checker=checker, assignment=assignment,
+                                                              triggered_by=request.user)
 
-        # TODO: return stats with updated/skipped/invalid/students without yandex login
-        return Response(status=status.HTTP_201_CREATED, data={})
+        return Response(status=status.HTTP_201_CREATED, data=result.to_dict())
 
     def handle_exception(self, exc):
         if isinstance(exc, (Unavailable, ContestAPIError)):
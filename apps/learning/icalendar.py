@@ -11,7 +11,6 @@ from icalendar.prop import vInline
 
 from django.conf import settings
 from django.contrib.sites.models import Site
-from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from core.urls import reverse
@@ -100,8 +99,11 @@ class ICalendarEvent(ABC):
 
     def create(self, instance, user: User) -> ICalEvent:
         uid = self.get_calendar_event_id(instance, user)
-        event_component = ICalEvent(uid=vText(uid), dtstamp=timezone.now())
         event_properties = self._model_to_dict(instance)
+        # Stable timestamp keeps the rendered feed the same for unchanged
+        # data, the feed content is used to calculate ETag
+        event_component = ICalEvent(uid=vText(uid),
+                                    dtstamp=event_properties['last-modified'])
         for k, v in event_properties.items():
             event_component.add(k, v)
         return event_component
@@ -635,7 +635,7 @@ class StudentAssignment(SoftDeletionModel, TimezoneAwareMixin, TimeStampedModel,
 
     tracker = FieldTracker(fields=['score'])
 
-    derivable_fields = ['execution_time']
+    derivable_fields = ['execution_time', 'meta']
 
     class Meta:
         ordering = ["assignment", "student"]
@@ -664,6 +664,28 @@ class StudentAssignment(SoftDeletionModel, TimezoneAwareMixin, TimeStampedModel,
             return True
         return False
 
+    @classmethod
+    def bulk_compute_fields(cls, objects, *derivable_fields: str) -> None:
+        from learning.services.personal_assignment_service import (
+            bulk_update_personal_assignments_stats
+        )
+        if 'meta' in derivable_fields:
+            bulk_update_personal_assignments_stats(objects)
+            derivable_fields = tuple(f for f in derivable_fields if f != 'meta')
+            if not derivable_fields:
+                return
+        super().bulk_compute_fields(objects, *derivable_fields)
+
+    def _compute_meta(self):
+        from learning.services.personal_assignment_service import (
+            calculate_personal_assignment_stats, is_personal_assignment_stats_changed
+        )
+        stats = calculate_personal_assignment_stats(self)
+        if stats is None or not is_personal_assignment_stats_changed(self, stats):
+            return False
+        self.meta = {**(self.meta or {}), 'stats': stats}
+        return True
+
     def get_teacher_url(self):
         return reverse('teaching:student_assignment_detail',
                        kwargs={"pk": self.pk})
@@ -1,16 +1,22 @@
+import csv
+import datetime
 import io
+import tempfile
 from abc import ABCMeta, abstractmethod
 from operator import attrgetter
-from typing import Dict, List, Literal, Set
+from typing import IO, Any, Dict, Iterator, List, Literal, Set
 
 from pandas import DataFrame, ExcelWriter
+from xlsxwriter import Workbook
 
 from django.conf import settings
 from django.db.models import Case, Count, F, IntegerField, Prefetch, Q, When
-from django.http import HttpResponse, FileResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.encoding import force_str
 
 from admission.models import Applicant
 from core.reports import ReportFileOutput
+from core.utils import iter_queryset_chunks
 from courses.constants import SemesterTypes
 from courses.models import Course, MetaCourse, Semester
 from courses.selectors import course_teachers_prefetch_queryset
@@ -26,6 +32,7 @@ from users.managers import (
     get_shad_courses_progress,
 )
 from users.models import SHADCourseRecord, StudentProfile, StudentTypes, User
+from users.services import get_student_progress_summaries
 
 
 def dataframe_to_response(df: DataFrame, output_format: str, filename: str):
@@ -61,6 +68,84 @@ class DataFrameResponse:
         return response
 
 
+def report_to_streaming_response(
+    report: "ProgressReport", output_format: str, filename: str, queryset=None
+):
+    rows = report.iter_rows(queryset)
+    if output_format == "csv":
+        return StreamingReportResponse.as_csv(rows, filename)
+    elif output_format == "xlsx":
+        return StreamingReportResponse.as_xlsx(rows, filename)
+    raise ValueError("Supported output formats: csv, xlsx")
+
+
+class _Echo:
+    """Implements `.write` method of the file-like interface."""
+
+    def write(self, value):
+        return value
+
+
+class StreamingReportResponse:
+    """
+    Writes rows produced by `ProgressReport.iter_rows` without collecting
+    the whole report in memory. Output is the same as `DataFrameResponse`
+    produces for `ProgressReport.generate`, e.g. the first column (ID)
+    is used as a dataframe index and is not exported.
+    """
+
+    @staticmethod
+    def as_csv(rows: Iterator[List[Any]], filename):
+        writer = csv.writer(_Echo())
+        content = (writer.writerow(row[1:]) for row in rows)
+        response = StreamingHttpResponse(content, content_type="text/csv")
+        response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+        return response
+
+    @staticmethod
+    def as_xlsx(rows: Iterator[List[Any]], filename):
+        output = tempfile.TemporaryFile()
+        write_report_xlsx(rows, output)
+        output.seek(0)
+        content_type = (
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=f"{filename}.xlsx",
+            content_type=content_type,
+        )
+
+
+def write_report_csv(rows: Iterator[List[Any]], output: IO[str]) -> None:
+    writer = csv.writer(output)
+    for row in rows:
+        writer.writerow(row[1:])
+
+
+def write_report_xlsx(rows: Iterator[List[Any]], output: IO[bytes]) -> None:
+    # In constant memory mode each row is flushed to disk once
+    # the next one has been started.
+    workbook = Workbook(
+        output,
+        {"constant_memory": True, "default_date_format": "yyyy-mm-dd"},
+    )
+    worksheet = workbook.add_worksheet()
+    header_format = workbook.add_format({"bold": True})
+    for row_index, row in enumerate(rows):
+        cell_format = header_format if row_index == 0 else None
+        for col_index, value in enumerate(row[1:]):
+            worksheet.write(row_index, col_index, _to_xlsx_value(value), cell_format)
+    workbook.close()
+
+
+def _to_xlsx_value(value):
+    if value is None or isinstance(value, (int, float, datetime.date)):
+        return value
+    return force_str(value)
+
+
 def generate_projects_headers(headers_number):
     return [
         h
@@ -196,42 +281,88 @@ class ProgressReport:
         unique_meta_courses: Dict[int, MetaCourse] = {}
         # Aggregate max number of courses for each type. Result headers
         # depend on these values.
-        shads_max, online_max, projects_max = 0, 0, 0
+        stats = self._new_export_stats()
         for student_profile in student_profiles:
             student_account = student_profile.user
             self.process_student(student_account, unique_courses, unique_meta_courses)
-            shads_max = max(shads_max, len(student_account.shads))
-            online_max = max(online_max, len(student_account.online_courses))
-            projects_max = max(projects_max, len(student_account.projects_progress))
-
-        # Alphabetically sort meta courses by name
-        meta_course_names = [(mc.name, mc.pk) for mc in unique_meta_courses.values()]
-        meta_course_names.sort()
-        meta_courses: Dict[int, MetaCourse] = {}
-        for _, pk in meta_course_names:
-            meta_courses[pk] = unique_meta_courses[pk]
-
-        headers = self._generate_headers(
-            courses=unique_courses,
-            meta_courses=meta_courses,
-            shads_max=shads_max,
-            online_max=online_max,
-            projects_max=projects_max,
-        )
+            self._update_export_stats(stats, student_account)
 
+        context = self._get_export_context(unique_courses, unique_meta_courses, stats)
+        headers = self._generate_headers(**context)
         data = []
         for student_profile in student_profiles:
-            row = self._export_row(
-                student_profile,
-                courses=unique_courses,
-                meta_courses=meta_courses,
-                shads_max=shads_max,
-                online_max=online_max,
-                projects_max=projects_max,
-            )
+            row = self._export_row(student_profile, **context)
             data.append(row)
         return DataFrame.from_records(columns=headers, data=data, index="ID")
 
+    def iter_rows(self, queryset=None, chunk_size=500) -> Iterator[List[Any]]:
+        """
+        Memory efficient alternative to `.generate()`. Yields headers first
+        and then data rows one by one.
+
+        Student profiles are fetched in chunks (prefetch lookups are
+        applied per chunk) twice: the first pass only aggregates values
+        that headers depend on (max number of shad/online courses,
+        projects and the set of meta courses), the second one exports rows.
+        """
+        if queryset is None:
+            queryset = self.get_queryset()
+        unique_courses: Dict[int, Course] = {}
+        unique_meta_courses: Dict[int, MetaCourse] = {}
+        stats = self._new_export_stats()
+        for student_profiles in self._iter_chunks(queryset, chunk_size):
+            students = [sp.user for sp in student_profiles]
+            # Courses of the chunk are fetched again even if they've been
+            # seen before, excluding them in the query makes the IN clause
+            # grow with each chunk
+            for course in self.get_courses_queryset(students):
+                unique_courses.setdefault(course.pk, course)
+            for student_account in students:
+                self.process_student(
+                    student_account, unique_courses, unique_meta_courses
+                )
+                self._update_export_stats(stats, student_account)
+
+        context = self._get_export_context(unique_courses, unique_meta_courses, stats)
+        yield self._generate_headers(**context)
+        for student_profiles in self._iter_chunks(queryset, chunk_size):
+            for student_profile in student_profiles:
+                self.process_student(
+                    student_profile.user, unique_courses, unique_meta_courses
+                )
+                yield self._export_row(student_profile, **context)
+
+    @staticmethod
+    def _iter_chunks(queryset, chunk_size) -> Iterator[List[StudentProfile]]:
+        """
+        Splits ordered queryset into chunks with keyset pagination by
+        the queryset ordering fields.
+        """
+        yield from iter_queryset_chunks(queryset, chunk_size,
+                                        ordering=queryset.query.order_by)
+
+    def _new_export_stats(self) -> Dict[str, Any]:
+        return {"shads_max": 0, "online_max": 0, "projects_max": 0}
+
+    def _update_export_stats(self, stats, student) -> None:
+        stats["shads_max"] = max(stats["shads_max"], len(student.shads))
+        stats["online_max"] = max(stats["online_max"], len(student.online_courses))
+        stats["projects_max"] = max(
+            stats["projects_max"], len(student.projects_progress)
+        )
+
+    def _get_export_context(self, courses, meta_courses, stats) -> Dict[str, Any]:
+        """
+        Returns keyword arguments for `._generate_headers` and `._export_row`.
+        """
+        # Alphabetically sort meta courses by name
+        meta_course_names = [(mc.name, mc.pk) for mc in meta_courses.values()]
+        meta_course_names.sort()
+        sorted_meta_courses: Dict[int, MetaCourse] = {}
+        for _, pk in meta_course_names:
+            sorted_meta_courses[pk] = meta_courses[pk]
+        return {"courses": courses, "meta_courses": sorted_meta_courses, **stats}
+
     def process_student(self, student, unique_courses, unique_meta_courses):
         grades: Dict[int, Enrollment] = {}
         for enrollment in student.enrollments_progress:
@@ -492,49 +623,17 @@ class OfficialDiplomasReport(ProgressReport):
         super().__init__(**kwargs)
         self.diploma_issued_on = diploma_issued_on
 
-    def generate(self, queryset=None) -> DataFrame:
-        student_profiles = queryset or self.get_queryset()
-        # It's possible to prefetch all related courses but nested
-        # .prefetch_related() is extremely slow, that's why we use map instead
-        students = (sp.user for sp in student_profiles)
-        unique_courses: Dict[int, Course] = {}
-        for c in self.get_courses_queryset(students):
-            unique_courses[c.pk] = c
+    def _new_export_stats(self) -> Dict[str, Any]:
+        stats = super()._new_export_stats()
+        stats["shad_courses"] = set()
+        return stats
 
-        unique_meta_courses: Dict[int, MetaCourse] = {}
-        unique_shad_courses: Set[str] = set()
-        # Aggregate max number of courses for each type. Result headers
-        # depend on these values.
-        shads_max, online_max, projects_max = 0, 0, 0
-        for student_profile in student_profiles:
-            student = student_profile.user
-            self.process_student(student, unique_courses, unique_meta_courses)
-            self.process_shad(student, unique_shad_courses)
-            shads_max = max(shads_max, len(student.shads))
-            online_max = max(online_max, len(student.online_courses))
-            projects_max = max(projects_max, len(student.projects_progress))
-
-        headers = self._generate_headers(
-            courses=unique_courses,
-            meta_courses=unique_meta_courses,
-            shad_courses=unique_shad_courses,
-            shads_max=shads_max,
-            online_max=online_max,
-            projects_max=projects_max,
-        )
-        data = []
-        for student_profile in student_profiles:
-            row = self._export_row(
-                student_profile,
-                courses=unique_courses,
-                meta_courses=unique_meta_courses,
-                shad_courses=unique_shad_courses,
-                shads_max=shads_max,
-                online_max=online_max,
-                projects_max=projects_max,
-            )
-            data.append(row)
-        return DataFrame.from_records(columns=headers, data=data, index="ID")
+    def _update_export_stats(self, stats, student) -> None:
+        super()._update_export_stats(stats, student)
+        self.process_shad(student, stats["shad_courses"])
+
+    def _get_export_context(self, courses, meta_courses, stats) -> Dict[str, Any]:
+        return {"courses": courses, "meta_courses": meta_courses, **stats}
 
     def get_queryset(self):
         exclude_grades = GradeTypes.unsatisfactory_grades
@@ -1159,8 +1258,12 @@ class WillGraduateStatsReport(ReportFileOutput):
         self.data = []
         students = self.get_queryset()
         current_semester = Semester.get_current()
-        for student in students.all():
-            stats = student.stats(current_semester)
+        students = students.all()
+        progress_summaries = get_student_progress_summaries(
+            [student.pk for student in students], current_semester
+        )
+        for student in students:
+            stats = progress_summaries[student.pk].to_stats()
             # 1. Оставлено комментариев на сайте с 23:00 до 8:00 по мск
             time_range_in_utc = Q(created__hour__gte=20) | Q(created__hour__lte=5)
             assignment_comments_after_23 = (
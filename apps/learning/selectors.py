@@ -1,3 +1,4 @@
+import datetime
 from typing import List, Optional, Union
 
 from django.db.models import Q, QuerySet
@@ -46,12 +47,24 @@ def get_active_enrollments(course: Union[CourseID, Course]) -> EnrollmentQuerySe
             .filter(course=course))
 
 
-def get_student_classes(user, filters: List[Q] = None,
-                        with_venue=False) -> CourseClassQuerySet:
+def get_date_range_filters(start_date: Optional[datetime.date],
+                           end_date: Optional[datetime.date]) -> List[Q]:
+    filters = []
+    if start_date:
+        filters.append(Q(date__gte=start_date))
+    if end_date:
+        filters.append(Q(date__lte=end_date))
+    return filters
+
+
+def get_student_classes(user, filters: List[Q] = None, with_venue=False, *,
+                        start_date: Optional[datetime.date] = None,
+                        end_date: Optional[datetime.date] = None) -> CourseClassQuerySet:
     # Student could be manually enrolled in the course without
     # checking branch compatibility, skip filtering by branch
     branch_list = []
-    qs = (get_classes(branch_list, filters)
+    qs = (get_classes(branch_list, filters,
+                      start_date=start_date, end_date=end_date)
           .for_student(user)
           .order_by("-date", "-starts_at"))
     if with_venue:
@@ -60,25 +73,36 @@ def get_student_classes(user, filters: List[Q] = None,
 
 
 # TODO: move to courses.selectors
-def get_teacher_classes(user, filters: List[Q] = None,
-                        with_venue=False) -> CourseClassQuerySet:
+def get_teacher_classes(user, filters: List[Q] = None, with_venue=False, *,
+                        start_date: Optional[datetime.date] = None,
+                        end_date: Optional[datetime.date] = None) -> CourseClassQuerySet:
     branch_list = []
-    qs = get_classes(branch_list, filters).for_teacher(user)
+    qs = (get_classes(branch_list, filters,
+                      start_date=start_date, end_date=end_date)
+          .for_teacher(user))
     if with_venue:
         qs = qs.select_related('venue', 'venue__location')
     return qs
 
 
-def get_classes(branch_list, filters: List[Q] = None) -> CourseClassQuerySet:
-    filters = filters or []
+def get_classes(branch_list, filters: List[Q] = None, *,
+                start_date: Optional[datetime.date] = None,
+                end_date: Optional[datetime.date] = None) -> CourseClassQuerySet:
+    """
+    Provide `start_date` and `end_date` to get classes in a date range
+    (both inclusive).
+    """
+    filters = [*(filters or []), *get_date_range_filters(start_date, end_date)]
     return (CourseClass.objects
             .filter(*filters)
             .in_branches(*branch_list)
             .select_calendar_data())
 
 
-def get_study_events(filters: List[Q] = None) -> QuerySet:
-    filters = filters or []
+def get_study_events(filters: List[Q] = None, *,
+                     start_date: Optional[datetime.date] = None,
+                     end_date: Optional[datetime.date] = None) -> QuerySet:
+    filters = [*(filters or []), *get_date_range_filters(start_date, end_date)]
     return (Event.objects
             .filter(*filters)
             .select_related('venue')
@@ -1,9 +1,8 @@
 from datetime import timedelta
-from itertools import islice
-from typing import Iterable, List, Optional, Union
+from typing import Callable, Iterable, List, Optional, Union
 
 from django.core.files.uploadedfile import UploadedFile
-from django.db import router
+from django.db import router, transaction
 from django.db.models import Avg, Q
 
 from core.services import SoftDeleteService
@@ -11,8 +10,15 @@ from courses.models import Assignment, AssignmentAttachment, CourseTeacher
 from learning.models import (
     AssignmentNotification, Enrollment, StudentAssignment, StudentGroup
 )
+from learning.services.gradebook_service import invalidate_gradebook_cache
 from learning.services.notification_service import notify_student_new_assignment
 from learning.settings import StudentStatuses
+from notifications.cache import invalidate_unread_notifications_cache
+
+STUDENT_ASSIGNMENTS_BATCH_SIZE = 1000
+# Learners count starting from which personal assignments are generated
+# in the background job
+STUDENT_ASSIGNMENTS_ASYNC_THRESHOLD = 500
 
 
 class AssignmentService:
@@ -47,17 +53,21 @@ class AssignmentService:
 
     @classmethod
     def _restore_student_assignments(cls, assignment: Assignment,
-                                     student_ids: Iterable[int]):
-        qs = (StudentAssignment.trash
-              .filter(assignment=assignment, student_id__in=student_ids))
-        for student_assignment in qs:
+                                     student_ids: Iterable[int]) -> List[StudentAssignment]:
+        student_assignments = list(StudentAssignment.trash
+                                   .filter(assignment=assignment,
+                                           student_id__in=student_ids))
+        if student_assignments:
             # TODO: reset score? execution_time?
-            student_assignment.restore()
+            using = router.db_for_write(StudentAssignment)
+            SoftDeleteService(using).restore(student_assignments)
+        return student_assignments
 
     # TODO: send notification to teachers
     @classmethod
     def bulk_create_student_assignments(cls, assignment: Assignment,
-                                        for_groups: Iterable[Union[int, None]] = None):
+                                        for_groups: Iterable[Union[int, None]] = None,
+                                        *, on_progress: Optional[Callable[[int, int], None]] = None) -> int:
         """
         Generates personal assignments to store student progress.
         By default it creates record for each enrolled student who's not
@@ -67,6 +77,10 @@ class AssignmentService:
         You can process students from the specific groups only by setting
         `for_groups`. Special value `for_groups=[..., None]` - includes
         enrollments without student group.
+
+        Students are processed in batches, `on_progress` is called with
+        the number of processed and total students after each batch.
+        Returns the number of created or restored personal assignments.
         """
         filters = [
             Q(course_id=assignment.course_id),
@@ -93,37 +107,55 @@ class AssignmentService:
         already_exist = set(StudentAssignment.objects
                             .filter(assignment=assignment, student__in=students)
                             .values_list('student_id', flat=True))
-        # Restore personal assignments
-        in_trash = set(StudentAssignment.trash
-                       .filter(assignment=assignment, student__in=students)
-                       .values_list('student_id', flat=True))
-        if in_trash:
-            cls._restore_student_assignments(assignment, in_trash)
-        # Create personal assignments if necessary
-        already_created = already_exist | in_trash
-        batch_size = 100
-        to_create = (sid for sid in students if sid not in already_created)
-        objs = (StudentAssignment(assignment=assignment, student_id=student_id)
-                for student_id in to_create)
-        while True:
-            batch = list(islice(objs, batch_size))
-            if not batch:
-                break
-            StudentAssignment.objects.bulk_create(batch, batch_size)
-        # TODO: move to the separated method
-        # Generate notifications
-        to_notify = [sid for sid in students if sid not in already_exist]
-        created = (StudentAssignment.objects
-                   .filter(assignment=assignment, student_id__in=to_notify)
-                   .values_list('pk', 'student_id', named=True))
-        objs = (notify_student_new_assignment(sa, commit=False) for sa
-                in created)
-        batch_size = 100
-        while True:
-            batch = list(islice(objs, batch_size))
-            if not batch:
-                break
-            AssignmentNotification.objects.bulk_create(batch, batch_size)
+        to_process = [sid for sid in students if sid not in already_exist]
+        total = len(to_process)
+        generated = 0
+        batch_size = STUDENT_ASSIGNMENTS_BATCH_SIZE
+        for offset in range(0, total, batch_size):
+            student_ids = to_process[offset:offset + batch_size]
+            with transaction.atomic():
+                # Records could be created by concurrent enrollment while
+                # the previous batches were processed
+                already_exist = set(StudentAssignment.objects
+                                    .filter(assignment=assignment,
+                                            student_id__in=student_ids)
+                                    .values_list('student_id', flat=True))
+                student_ids = [sid for sid in student_ids
+                               if sid not in already_exist]
+                student_assignments = cls._restore_student_assignments(
+                    assignment, student_ids)
+                restored = {sa.student_id for sa in student_assignments}
+                objs = [StudentAssignment(assignment=assignment,
+                                          student_id=student_id)
+                        for student_id in student_ids
+                        if student_id not in restored]
+                # Primary keys are returned by the INSERT statement, no need
+                # to query created records before generating notifications
+                created = StudentAssignment.objects.bulk_create(objs)
+                student_assignments.extend(created)
+                notifications = [notify_student_new_assignment(sa, commit=False)
+                                 for sa in student_assignments]
+                AssignmentNotification.objects.bulk_create(notifications)
+            generated += len(student_assignments)
+            invalidate_unread_notifications_cache(student_ids)
+            if on_progress is not None:
+                on_progress(min(offset + batch_size, total), total)
+        if generated:
+            invalidate_gradebook_cache(assignment.course_id)
+        return generated
+
+    @classmethod
+    def generate_student_assignments(cls, assignment: Assignment) -> None:
+        """
+        Generates personal assignments for the new assignment. Processing
+        is postponed to the background job if the course has many learners.
+        """
+        from learning.tasks import generate_student_assignments
+        if assignment.course.learners_count < STUDENT_ASSIGNMENTS_ASYNC_THRESHOLD:
+            cls.bulk_create_student_assignments(assignment)
+        else:
+            transaction.on_commit(lambda: generate_student_assignments.delay(
+                assignment_id=assignment.pk))
 
     @classmethod
     def bulk_remove_student_assignments(cls, assignment: Assignment,
@@ -157,9 +189,14 @@ class AssignmentService:
         using = router.db_for_write(StudentAssignment)
         SoftDeleteService(using).delete(student_assignments)
         # Hard delete notifications
-        (AssignmentNotification.objects
-         .filter(student_assignment__in=student_assignments)
-         .delete())
+        notifications = (AssignmentNotification.objects
+                         .filter(student_assignment__in=student_assignments))
+        user_ids = list(notifications
+                        .filter(is_unread=True)
+                        .values_list('user_id', flat=True)
+                        .distinct())
+        notifications.delete()
+        invalidate_unread_notifications_cache(user_ids)
 
     @classmethod
     def sync_student_assignments(cls, assignment: Assignment):
@@ -192,6 +229,8 @@ class AssignmentService:
         if groups_remove:
             cls.bulk_remove_student_assignments(assignment,
                                                 for_groups=groups_remove)
+        if groups_add or groups_remove:
+            invalidate_gradebook_cache(assignment.course_id)
 
     @classmethod
     def get_mean_execution_time(cls, assignment: Assignment):
@@ -13,6 +13,7 @@ from courses.constants import AssignmentFormat
 from courses.models import Course, CourseGroupModes
 from learning.models import Enrollment, StudentGroup, EnrollmentGradeLog
 from learning.services import AssignmentService
+from learning.services.gradebook_service import invalidate_gradebook_cache
 from learning.services.notification_service import (
     remove_course_notifications_for_student
 )
@@ -175,6 +176,7 @@ def update_enrollment_grade(enrollment: Enrollment, *,
                             editor: User, source: EnrollmentGradeUpdateSource,
                             grade_changed_at: Optional[datetime.date] = None) -> [bool, Enrollment]:
     from learning.permissions import EditGradebook
+    from users.services import update_student_progress_summaries
     if not editor.has_perm(EditGradebook.name, enrollment.course):
         raise PermissionDenied
     if new_grade not in GradeTypes.values or old_grade not in GradeTypes.values:
@@ -187,6 +189,8 @@ def update_enrollment_grade(enrollment: Enrollment, *,
     if not updated:
         return False, enrollment
     enrollment.grade = new_grade
+    invalidate_gradebook_cache(enrollment.course_id)
+    update_student_progress_summaries([enrollment.student_id])
 
     log_entry = EnrollmentGradeLog(grade=new_grade,
                                    enrollment_id=enrollment.pk,
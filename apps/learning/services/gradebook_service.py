@@ -0,0 +1,41 @@
+import uuid
+
+from django.db import transaction
+
+from core.locks import get_shared_connection
+
+# Version is stored in the shared redis database since the default cache
+# is not shared between web and queue workers
+GRADEBOOK_CACHE_VERSION_KEY = "learning.gradebook_version_{course_id}"
+
+
+def get_gradebook_cache_version(course_id: int) -> str:
+    """
+    Returns current version of the course gradebook data. Cached gradebook
+    snapshots are keyed by this value.
+    """
+    cache_key = GRADEBOOK_CACHE_VERSION_KEY.format(course_id=course_id)
+    redis_client = get_shared_connection()
+    version = redis_client.get(cache_key)
+    if version is None:
+        redis_client.set(cache_key, uuid.uuid4().hex, nx=True)
+        version = redis_client.get(cache_key)
+    return version.decode() if isinstance(version, bytes) else version
+
+
+def invalidate_gradebook_cache(course_id: int) -> None:
+    """
+    Changes version of the course gradebook data. Snapshots of the previous
+    version are never read again and will be evicted by timeout.
+
+    Version is changed once again after the current transaction is committed
+    since concurrent request could cache not yet committed state
+    under the new version.
+    """
+    cache_key = GRADEBOOK_CACHE_VERSION_KEY.format(course_id=course_id)
+
+    def change_version():
+        get_shared_connection().set(cache_key, uuid.uuid4().hex)
+
+    change_version()
+    transaction.on_commit(change_version)
@@ -3,10 +3,12 @@ from learning.models import (
     AssignmentComment, AssignmentNotification, AssignmentSubmissionTypes,
     CourseNewsNotification, Enrollment, StudentAssignment
 )
+from notifications.cache import invalidate_unread_notifications_cache
 
 
 # TODO: store it closer to services or here?
 def remove_course_notifications_for_student(enrollment: Enrollment):
+    # Hard delete notifications
     (AssignmentNotification.objects
      .filter(user_id=enrollment.student_id,
              student_assignment__assignment__course_id=enrollment.course_id)
@@ -15,6 +17,7 @@ def remove_course_notifications_for_student(enrollment: Enrollment):
      .filter(user_id=enrollment.student_id,
              course_offering_news__course_id=enrollment.course_id)
      .delete())
+    invalidate_unread_notifications_cache([enrollment.student_id])
 
 
 def notify_student_new_assignment(student_assignment, commit=True):
@@ -60,4 +63,5 @@ def create_notifications_about_new_submission(submission: AssignmentComment):
                                        is_about_passed=is_solution)
             notifications.append(n)
     AssignmentNotification.objects.bulk_create(notifications)
+    invalidate_unread_notifications_cache(n.user_id for n in notifications)
     return len(notifications)
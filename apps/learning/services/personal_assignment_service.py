@@ -1,3 +1,4 @@
+import json
 import logging
 from collections import defaultdict
 from datetime import timedelta
@@ -5,18 +6,22 @@ from decimal import Decimal
 from functools import partial
 from typing import Any, Dict, List, Optional, Tuple
 
+from rest_framework.utils.encoders import JSONEncoder
+
 from django.core.exceptions import ValidationError, MultipleObjectsReturned
 from django.core.files.uploadedfile import UploadedFile
 from django.db import transaction
 from django.db.models import (
-    Case, Count, DateTimeField, F, IntegerField, Max, Min, When, Window
+    Case, Count, DateTimeField, Exists, F, IntegerField, Max, Min, OuterRef, When
 )
+from django.db.models.signals import post_save
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
+from core.services import mark_derivable_fields_dirty
 from core.timezone import get_now_utc
 from core.typings import assert_never
-from core.utils import _empty
+from core.utils import _empty, bucketize
 from courses.constants import AssigneeMode, AssignmentStatus
 from courses.models import Assignment, CourseTeacher
 from courses.selectors import personal_assignments_list
@@ -26,16 +31,20 @@ from learning.models import (
     PersonalAssignmentActivity, StudentAssignment, StudentGroup, StudentGroupTeacherBucket
 )
 from learning.services import StudentGroupService
+from learning.services.gradebook_service import invalidate_gradebook_cache
 from learning.settings import AssignmentScoreUpdateSource
 from users.models import User
 
 logger = logging.getLogger(__name__)
 
 
-def update_personal_assignment_stats(*, personal_assignment: StudentAssignment) -> None:
+def calculate_personal_assignments_stats(personal_assignments: List[StudentAssignment]) -> Dict[int, Dict[str, Any]]:
     """
-    Calculates personal assignment stats and saves it in a `stats` property
-    of the .meta json field.
+    Calculates stats stored in a `stats` property of the .meta json field
+    for each personal assignment with at least one published submission.
+    Makes 2 queries regardless of the number of personal assignments:
+    grouped aggregate of the submissions and the latest submission of
+    each personal assignment.
 
     Full Example:
         {
@@ -48,6 +57,9 @@ def update_personal_assignment_stats(*, personal_assignment: StudentAssignment)
             "activity": "sc",  // code of the latest activity
         }
     """
+    if not personal_assignments:
+        return {}
+    students = {pa.pk: pa.student_id for pa in personal_assignments}
     solutions_count = Count(
         Case(When(type=AssignmentSubmissionTypes.SOLUTION,
                   then=1),
@@ -60,47 +72,101 @@ def update_personal_assignment_stats(*, personal_assignment: StudentAssignment)
         Case(When(type=AssignmentSubmissionTypes.SOLUTION,
                   then=F('created')),
              output_field=DateTimeField()))
-    window = {
-        'partition_by': [F('student_assignment_id')],
-        'order_by': F('created').asc()
+    submissions = (AssignmentComment.published
+                   .filter(student_assignment_id__in=students.keys()))
+    totals = (submissions
+              .order_by()
+              .values('student_assignment_id')  # group by
+              .annotate(submissions_total=Count('*'),
+                        solutions_total=solutions_count,
+                        solution_first=solution_first,
+                        solution_latest=solution_latest))
+    latest_submissions = {
+        s['student_assignment_id']: s for s in
+        (submissions
+         .order_by('student_assignment_id', '-created', '-pk')
+         .distinct('student_assignment_id')
+         .values('student_assignment_id', 'type', 'author_id'))
     }
-    latest_submission = (AssignmentComment.published
-                         .filter(student_assignment_id=personal_assignment.pk)
-                         .annotate(submissions_total=Window(expression=Count('*'), **window),
-                                   solutions_total=Window(expression=solutions_count, **window),
-                                   solution_first=Window(expression=solution_first, **window),
-                                   solution_latest=Window(expression=solution_latest, **window))
-                         .order_by('created')
-                         .last())
-    if latest_submission is None:
-        return
-
-    if latest_submission.type == AssignmentSubmissionTypes.SOLUTION:
-        latest_activity = PersonalAssignmentActivity.SOLUTION
-    elif latest_submission.type == AssignmentSubmissionTypes.COMMENT:
-        is_student = latest_submission.author_id == personal_assignment.student_id
-        if is_student:
-            latest_activity = PersonalAssignmentActivity.STUDENT_COMMENT
+    stats = {}
+    for total in totals:
+        personal_assignment_id = total['student_assignment_id']
+        latest_submission = latest_submissions[personal_assignment_id]
+        if latest_submission['type'] == AssignmentSubmissionTypes.SOLUTION:
+            latest_activity = PersonalAssignmentActivity.SOLUTION
+        elif latest_submission['type'] == AssignmentSubmissionTypes.COMMENT:
+            is_student = latest_submission['author_id'] == students[personal_assignment_id]
+            if is_student:
+                latest_activity = PersonalAssignmentActivity.STUDENT_COMMENT
+            else:
+                latest_activity = PersonalAssignmentActivity.TEACHER_COMMENT
         else:
-            latest_activity = PersonalAssignmentActivity.TEACHER_COMMENT
-    else:
-        raise ValueError('Unknown submission type')
+            raise ValueError('Unknown submission type')
+        new_stats = {'activity': str(latest_activity)}
+        comments_total = total['submissions_total'] - total['solutions_total']
+        if comments_total:
+            new_stats['comments'] = comments_total
+        # Omit default or null values to save space
+        if total['solutions_total']:
+            solution_stats = {
+                'count': total['solutions_total'],
+                'first': total['solution_first'].replace(microsecond=0),
+            }
+            if total['solutions_total'] > 1:
+                solution_stats['last'] = total['solution_latest'].replace(microsecond=0)
+            new_stats['solutions'] = solution_stats
+        stats[personal_assignment_id] = new_stats
+    return stats
+
+
+def calculate_personal_assignment_stats(personal_assignment: StudentAssignment) -> Optional[Dict[str, Any]]:
+    """
+    Returns stats of the personal assignment or None if there are
+    no submissions.
+    """
+    stats = calculate_personal_assignments_stats([personal_assignment])
+    return stats.get(personal_assignment.pk)
+
+
+def is_personal_assignment_stats_changed(personal_assignment: StudentAssignment,
+                                         new_stats: Dict[str, Any]) -> bool:
+    # Stored stats are deserialized from json, e.g. datetime is a string
+    serialize = partial(json.dumps, cls=JSONEncoder, sort_keys=True)
+    stats = (personal_assignment.meta or {}).get('stats')
+    return serialize(stats) != serialize(new_stats)
+
+
+def bulk_update_personal_assignments_stats(personal_assignments: List[StudentAssignment]) -> int:
+    """
+    Recalculates stats of personal assignments and saves them with one
+    bulk update. Returns the number of updated records.
+    """
+    stats = calculate_personal_assignments_stats(personal_assignments)
+    to_update = []
+    for personal_assignment in personal_assignments:
+        new_stats = stats.get(personal_assignment.pk)
+        if new_stats is not None and is_personal_assignment_stats_changed(personal_assignment, new_stats):
+            personal_assignment.meta = {
+                **(personal_assignment.meta or {}),
+                'stats': stats[personal_assignment.pk]
+            }
+            to_update.append(personal_assignment)
+    StudentAssignment.objects.bulk_update(to_update, fields=['meta'],
+                                          batch_size=1000)
+    return len(to_update)
+
+
+def update_personal_assignment_stats(*, personal_assignment: StudentAssignment) -> None:
+    """
+    Calculates personal assignment stats and saves it in a `stats` property
+    of the .meta json field.
+    """
+    new_stats = calculate_personal_assignment_stats(personal_assignment)
+    if new_stats is None:
+        return
     # Django 3.2 doesn't support partial update of the json field,
     # better to select_for_update
     meta = personal_assignment.meta or {}
-    new_stats = {'activity': str(latest_activity)}
-    comments_total = latest_submission.submissions_total - latest_submission.solutions_total
-    if comments_total:
-        new_stats['comments'] = comments_total
-    # Omit default or null values to save space
-    if latest_submission.solutions_total:
-        solution_stats = {
-            'count': latest_submission.solutions_total,
-            'first': latest_submission.solution_first.replace(microsecond=0),
-        }
-        if latest_submission.solutions_total > 1:
-            solution_stats['last'] = latest_submission.solution_latest.replace(microsecond=0)
-        new_stats['solutions'] = solution_stats
     meta['stats'] = new_stats
     (StudentAssignment.objects
      .filter(pk=personal_assignment.pk)
@@ -136,9 +202,8 @@ def create_assignment_solution(*, personal_assignment: StudentAssignment,
                                  meta=meta,
                                  attached_file=attachment)
     solution.save()
-    from learning.tasks import update_student_assignment_stats
-    update_stats = partial(update_student_assignment_stats.delay, personal_assignment.pk)
-    transaction.on_commit(update_stats)
+    mark_derivable_fields_dirty(StudentAssignment, [personal_assignment.pk],
+                                'meta')
 
     return solution
 
@@ -203,9 +268,8 @@ def create_assignment_comment(*, personal_assignment: StudentAssignment,
         }
     comment.save()
 
-    from learning.tasks import update_student_assignment_stats
-    update_stats = partial(update_student_assignment_stats.delay, personal_assignment.pk)
-    transaction.on_commit(update_stats)
+    mark_derivable_fields_dirty(StudentAssignment, [personal_assignment.pk],
+                                'meta')
 
     return comment
 
@@ -243,6 +307,7 @@ def update_personal_assignment_status(*, student_assignment: StudentAssignment,
                .update(status=status_new, modified=get_now_utc()))
     if updated:
         student_assignment.status = status_new
+        invalidate_gradebook_cache(student_assignment.assignment.course_id)
     return updated
 
 
@@ -262,6 +327,7 @@ def update_personal_assignment_score(*, student_assignment: StudentAssignment,
         return False, student_assignment
 
     student_assignment.score = score_new
+    invalidate_gradebook_cache(student_assignment.assignment.course_id)
     if score_new != score_old:
         audit_log = AssignmentScoreAuditLog(student_assignment=student_assignment,
                                             changed_by=changed_by,
@@ -273,6 +339,53 @@ def update_personal_assignment_score(*, student_assignment: StudentAssignment,
     return True, student_assignment
 
 
+def bulk_update_personal_assignment_scores(*, assignment: Assignment,
+                                           scores: Dict[int, Optional[Decimal]],
+                                           changed_by: User,
+                                           source: AssignmentScoreUpdateSource) -> Dict[int, Optional[Decimal]]:
+    """
+    Sets new scores of the assignment personal assignments in one transaction,
+    *scores* maps personal assignment id to the new score.
+
+    Current scores are read under the row lock, unchanged values are
+    skipped. Returns previous score for each updated personal assignment.
+    """
+    for score_new in scores.values():
+        if score_new is not None and score_new > assignment.maximum_score:
+            raise ValidationError(f"Score {score_new} is greater than the maximum "
+                                  f"score {assignment.maximum_score}",
+                                  code="score_overflow")
+    changed_at = get_now_utc()
+    updated_personal_assignments = []
+    audit_logs = []
+    with transaction.atomic():
+        personal_assignments = (StudentAssignment.objects
+                                .select_for_update()
+                                .filter(assignment=assignment, pk__in=scores.keys())
+                                .only('pk', 'score')
+                                .order_by('pk'))
+        for student_assignment in personal_assignments:
+            score_old = student_assignment.score
+            score_new = scores[student_assignment.pk]
+            if score_old == score_new:
+                continue
+            student_assignment.score = score_new
+            student_assignment.score_changed = changed_at
+            updated_personal_assignments.append(student_assignment)
+            audit_logs.append(AssignmentScoreAuditLog(student_assignment_id=student_assignment.pk,
+                                                      changed_by=changed_by,
+                                                      score_old=score_old,
+                                                      score_new=score_new,
+                                                      source=source))
+        StudentAssignment.objects.bulk_update(updated_personal_assignments,
+                                              fields=['score', 'score_changed'],
+                                              batch_size=1000)
+        AssignmentScoreAuditLog.objects.bulk_create(audit_logs, batch_size=1000)
+    if audit_logs:
+        invalidate_gradebook_cache(assignment.course_id)
+    return {log.student_assignment_id: log.score_old for log in audit_logs}
+
+
 def create_personal_assignment_review(*,
                                       student_assignment: StudentAssignment,
                                       reviewer: User,
@@ -326,41 +439,139 @@ def create_personal_assignment_review(*,
     return comment
 
 
+class AssigneeLoadLedger:
+    """
+    In-memory ledger of teachers load for the assignment with
+    `STUDENT_GROUP_BALANCED` assignee mode.
+
+    Teacher load consists of the actual load (the number of personal
+    assignments where the teacher is an assignee) and the expected load.
+    Unassigned personal assignments of the student group are expected to be
+    distributed equally among all teachers of the bucket.
+
+    The ledger is seeded with a fixed number of queries, after that each
+    assignee decision is made without hitting the database. Call
+    `.assign()`/`.unassign()` to keep the ledger in sync with changes.
+    """
+
+    def __init__(self, *, assignment_id: int,
+                 bucket_groups: Dict[int, List[int]],
+                 bucket_teachers: Dict[int, List[int]],
+                 expected_groups_load: Dict[int, int],
+                 actual_teachers_load: Dict[int, int]):
+        self.assignment_id = assignment_id
+        self.bucket_groups = bucket_groups
+        self.bucket_teachers = bucket_teachers
+        self.expected_groups_load = defaultdict(int, expected_groups_load)
+        self.actual_teachers_load = defaultdict(int, actual_teachers_load)
+        self._group_buckets = defaultdict(list)
+        for bucket_id, group_ids in bucket_groups.items():
+            for group_id in group_ids:
+                self._group_buckets[group_id].append(bucket_id)
+        self._teacher_buckets = defaultdict(list)
+        for bucket_id, teacher_ids in bucket_teachers.items():
+            for teacher_id in teacher_ids:
+                self._teacher_buckets[teacher_id].append(bucket_id)
+
+    @classmethod
+    def seed(cls, assignment_id: int) -> "AssigneeLoadLedger":
+        buckets = (StudentGroupTeacherBucket.objects
+                   .filter(assignment_id=assignment_id)
+                   .order_by('pk'))
+        bucket_groups = bucketize(
+            buckets.values_list('pk', 'groups').order_by('pk', 'groups'),
+            key=lambda x: x[0], value_transform=lambda x: x[1])
+        bucket_teachers = bucketize(
+            buckets.values_list('pk', 'teachers').order_by('pk', 'teachers'),
+            key=lambda x: x[0], value_transform=lambda x: x[1])
+        student_group_field = "student__enrollment__student_group"
+        expected_groups_load = (StudentAssignment.objects
+                                .filter(assignee__isnull=True,
+                                        assignment=assignment_id,
+                                        student__enrollment__is_deleted=False,
+                                        student__enrollment__student_group__buckets__assignment=assignment_id)
+                                .values(student_group_field)
+                                .annotate(count=Count(student_group_field))
+                                .order_by())
+        actual_teachers_load = (StudentAssignment.objects
+                                .filter(assignee__isnull=False,
+                                        assignment=assignment_id)
+                                .values('assignee_id')
+                                .annotate(assignee_count=Count('assignee_id'))
+                                .order_by())
+        return cls(
+            assignment_id=assignment_id,
+            bucket_groups={k: [g for g in v if g is not None]
+                           for k, v in bucket_groups.items()},
+            bucket_teachers={k: [t for t in v if t is not None]
+                             for k, v in bucket_teachers.items()},
+            expected_groups_load={sa[student_group_field]: sa["count"]
+                                  for sa in expected_groups_load},
+            actual_teachers_load={sa['assignee_id']: sa['assignee_count']
+                                  for sa in actual_teachers_load})
+
+    def get_bucket_id(self, student_group_id: int) -> Optional[int]:
+        """
+        Returns bucket of the student group or None if student group is
+        in none of the buckets.
+        """
+        buckets = self._group_buckets.get(student_group_id, [])
+        if len(buckets) > 1:
+            raise MultipleObjectsReturned(
+                f"StudentGroup {student_group_id} is in multiple buckets")
+        return buckets[0] if buckets else None
+
+    def get_expected_load(self, bucket_id: int) -> Dict[int, float]:
+        """
+        For each teacher in a bucket calculates amount of expected load
+        over all buckets in which teacher is.
+        """
+        candidates = self.bucket_teachers.get(bucket_id, [])
+        related_buckets = sorted({b for teacher_id in candidates
+                                  for b in self._teacher_buckets[teacher_id]})
+        expected_teachers_loads = defaultdict(int)
+        for rel_bucket_id in related_buckets:
+            rel_bucket_teachers = self.bucket_teachers[rel_bucket_id]
+            for group_id in self.bucket_groups[rel_bucket_id]:
+                exp_group_load = self.expected_groups_load[group_id]
+                for teacher_id in rel_bucket_teachers:
+                    if teacher_id in candidates:
+                        expected_teachers_loads[teacher_id] += exp_group_load / len(rel_bucket_teachers)
+        return dict(expected_teachers_loads)
+
+    def get_assignee_id(self, bucket_id: int) -> Optional[int]:
+        """Returns teacher with minimal overall load in a bucket."""
+        teachers_load = self.get_expected_load(bucket_id)
+        for teacher_id in teachers_load:
+            teachers_load[teacher_id] += self.actual_teachers_load[teacher_id]
+        if not teachers_load:
+            return None
+        return min(teachers_load.items(), key=lambda item: item[1])[0]
+
+    def assign(self, student_group_id: int, teacher_id: int) -> None:
+        """Moves unassigned personal assignment to the teacher load."""
+        if self.expected_groups_load[student_group_id] > 0:
+            self.expected_groups_load[student_group_id] -= 1
+        self.actual_teachers_load[teacher_id] += 1
+
+    def unassign(self, student_group_id: int, teacher_id: int) -> None:
+        if self.actual_teachers_load[teacher_id] > 0:
+            self.actual_teachers_load[teacher_id] -= 1
+        self.expected_groups_load[student_group_id] += 1
+
+
 def calculate_teachers_overall_expected_load_in_bucket(bucket: StudentGroupTeacherBucket) -> dict:
     """
         For each teacher in a bucket calculates amount of expected load
          over all buckets in which teacher is.
         In all baskets in which the teacher is located, the expected load will be the same.
     """
-    candidates = list(t.id for t in bucket.teachers.only("teacher_id"))
-    related_buckets = (StudentGroupTeacherBucket.objects
-                       .filter(assignment=bucket.assignment_id,
-                               teachers__in=candidates)
-                       .distinct()
-                       .prefetch_related("groups", "teachers"))
-    student_group_field = "student__enrollment__student_group"
-    # for each group calculate count of expected solutions
-    expected_groups_load = (StudentAssignment.objects
-                            .filter(assignee__isnull=True,
-                                    assignment=bucket.assignment_id,
-                                    student__enrollment__is_deleted=False,
-                                    student__enrollment__student_group__buckets__in=related_buckets)
-                            .values(student_group_field)
-                            .annotate(count=Count(student_group_field))
-                            .order_by())
-    expected_groups_load = {sa[student_group_field]: sa["count"] for sa in expected_groups_load}
-    expected_teachers_loads = defaultdict(int)
-    for rel_bucket in related_buckets:
-        rel_bucket_teachers = rel_bucket.teachers.only("teacher_id")
-        for group in rel_bucket.groups.only("id"):
-            exp_group_load = expected_groups_load.get(group.id, 0)
-            for teacher in rel_bucket_teachers:
-                if teacher.id in candidates:
-                    expected_teachers_loads[teacher.id] += exp_group_load / len(rel_bucket_teachers)
-    return {k: v for k, v in expected_teachers_loads.items() if k in candidates}
-
-
-def get_assignee_with_minimal_load(student_assignment: StudentAssignment) -> List[CourseTeacher]:
+    ledger = AssigneeLoadLedger.seed(bucket.assignment_id)
+    return ledger.get_expected_load(bucket.pk)
+
+
+def get_assignee_with_minimal_load(student_assignment: StudentAssignment, *,
+                                   ledger: Optional[AssigneeLoadLedger] = None) -> List[CourseTeacher]:
     student_id = student_assignment.student_id
     assignment = student_assignment.assignment
     try:
@@ -372,34 +583,95 @@ def get_assignee_with_minimal_load(student_assignment: StudentAssignment) -> Lis
         logger.info(f"User {student_assignment.student_id} has left the course.")
         return []
     student_group_id = enrollment.student_group_id
-    assignees_load = (StudentAssignment.objects
-                      .filter(assignee__isnull=False,
-                              assignment=assignment)
-                      .values('assignee_id')
-                      .annotate(assignee_count=Count('assignee_id'))
-                      .order_by())
-    buckets = (StudentGroupTeacherBucket.objects
-               .filter(assignment=assignment)
-               .prefetch_related('groups', 'teachers'))
+    if ledger is None:
+        ledger = AssigneeLoadLedger.seed(assignment.pk)
     try:
-        target_bucket = buckets.get(groups__in=[student_group_id])
-    except StudentGroupTeacherBucket.DoesNotExist:
-        logger.info(f"StudentGroup {student_group_id} in none of the buckets.")
-        return []
+        bucket_id = ledger.get_bucket_id(student_group_id)
     except MultipleObjectsReturned:
         logger.error(f"Buckets are in inconsistent states.")
         raise
-    teachers_load = calculate_teachers_overall_expected_load_in_bucket(target_bucket)
-    for sa in assignees_load:
-        if sa['assignee_id'] in teachers_load:
-            teachers_load[sa['assignee_id']] += sa['assignee_count']
+    if bucket_id is None:
+        logger.info(f"StudentGroup {student_group_id} in none of the buckets.")
+        return []
     result = []
-    if teachers_load:
-        min_load_teacher_pk = min(teachers_load.items(), key=lambda item: item[1])[0]
+    min_load_teacher_pk = ledger.get_assignee_id(bucket_id)
+    if min_load_teacher_pk is not None:
         result.append(CourseTeacher.objects.get(pk=min_load_teacher_pk))
     return result
 
 
+def set_assignees_with_minimal_load(*, assignment: Assignment,
+                                    student_assignments: List[StudentAssignment]) -> int:
+    """
+    Auto assigns responsible teachers for personal assignments of the
+    assignment with `STUDENT_GROUP_BALANCED` assignee mode in one pass.
+    Takes into account the load changes made while processing previous
+    personal assignments.
+
+    Auto assigning trigger is reset like in
+    `maybe_set_assignee_for_personal_assignment`, including records of
+    students who left the course (no assignee is set in that case).
+
+    Returns the number of personal assignments with a new assignee.
+    """
+    ledger = AssigneeLoadLedger.seed(assignment.pk)
+    student_ids = [sa.student_id for sa in student_assignments]
+    student_groups = dict(Enrollment.active
+                          .filter(course_id=assignment.course_id,
+                                  student_id__in=student_ids)
+                          .values_list('student_id', 'student_group_id'))
+    to_update = []
+    assigned = 0
+    for student_assignment in student_assignments:
+        teacher_id = None
+        if (not student_assignment.assignee_id and
+                student_assignment.student_id in student_groups):
+            student_group_id = student_groups[student_assignment.student_id]
+            bucket_id = ledger.get_bucket_id(student_group_id)
+            if bucket_id is not None:
+                teacher_id = ledger.get_assignee_id(bucket_id)
+            if teacher_id is not None:
+                ledger.assign(student_group_id, teacher_id)
+                student_assignment.assignee_id = teacher_id
+                assigned += 1
+        if teacher_id is None and not student_assignment.trigger_auto_assign:
+            continue
+        student_assignment.trigger_auto_assign = False
+        student_assignment.modified = now()
+        to_update.append(student_assignment)
+    update_fields = ['assignee', 'trigger_auto_assign', 'modified']
+    with transaction.atomic():
+        StudentAssignment.objects.bulk_update(to_update, fields=update_fields)
+        # Keep the same side effects as `.save()` has
+        for student_assignment in to_update:
+            post_save.send(StudentAssignment, instance=student_assignment,
+                           created=False, update_fields=frozenset(update_fields))
+    return assigned
+
+
+def set_assignees_for_pending_personal_assignments(assignment: Assignment) -> int:
+    """
+    Auto assigns responsible teachers for all personal assignments of the
+    assignment with student activity since the last run, so many
+    submissions made around the deadline share the same teachers load
+    ledger instead of seeding it for every submission.
+    """
+    student_activity = (AssignmentComment.published
+                        .filter(student_assignment=OuterRef('pk'),
+                                author_id=OuterRef('student_id')))
+    with transaction.atomic():
+        # Rows are locked in the same order, concurrent calls wait for the
+        # current batch instead of using outdated teachers load
+        pending = list(StudentAssignment.objects
+                       .filter(Exists(student_activity),
+                               assignment=assignment,
+                               trigger_auto_assign=True)
+                       .select_for_update(of=('self',))
+                       .order_by('pk'))
+        return set_assignees_with_minimal_load(assignment=assignment,
+                                               student_assignments=pending)
+
+
 def resolve_assignees_for_personal_assignment(student_assignment: StudentAssignment) -> List[CourseTeacher]:
     """
     Returns candidates who can be auto-assign as a responsible teacher for the
@@ -449,6 +721,11 @@ def maybe_set_assignee_for_personal_assignment(submission_id: int) -> None:
         return None
     if not student_assignment.trigger_auto_assign:
         return None
+    assignment = student_assignment.assignment
+    if (not student_assignment.assignee_id and
+            assignment.assignee_mode == AssigneeMode.STUDENT_GROUP_BALANCED):
+        set_assignees_for_pending_personal_assignments(assignment)
+        return None
     update_fields = ['trigger_auto_assign', 'modified']
     # Do not overwrite assignee if someone already set the value.
     if not student_assignment.assignee_id:
@@ -19,6 +19,7 @@ from learning.models import (
     StudentGroup, StudentGroupAssignee, StudentGroupTeacherBucket
 )
 from learning.services.assignment_service import AssignmentService
+from learning.services.gradebook_service import invalidate_gradebook_cache
 from users.models import StudentProfile, StudentTypes
 
 CourseTeacherId = int
@@ -407,6 +408,7 @@ class StudentGroupService:
         if updated != len(enrollments):
             # Enrollments are not in a source group
             raise IntegrityError("Some students have not been moved. Abort")
+        invalidate_gradebook_cache(source.course_id)
 
         source_group_assignments = cls.available_assignments(source)
         target_group_assignments = cls.available_assignments(destination)
@@ -1,19 +1,24 @@
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from core.page_cache import invalidate_page_cache
 from courses.models import (
-    Assignment, Course, CourseBranch, CourseGroupModes, CourseNews, CourseTeacher,
-    StudentGroupTypes
+    Assignment, Course, CourseBranch, CourseClass, CourseGroupModes, CourseNews,
+    CourseTeacher, StudentGroupTypes
 )
 from learning.models import (
     AssignmentComment, AssignmentNotification, AssignmentSubmissionTypes,
-    CourseNewsNotification, Enrollment, StudentAssignment, StudentGroup
+    CourseNewsNotification, Enrollment, GraduateProfile, StudentAssignment,
+    StudentGroup
 )
 from learning.services import StudentGroupService
 from learning.services.enrollment_service import update_course_learners_count
+from learning.services.gradebook_service import invalidate_gradebook_cache
 # FIXME: post_delete нужен? Что лучше - удалять StudentGroup + SET_NULL у Enrollment или делать soft-delete?
 # FIXME: группу лучше удалить, т.к. она будет предлагаться для новых заданий, хотя типа уже удалена.
 from learning.tasks import convert_assignment_submission_ipynb_file_to_html
+from notifications.cache import invalidate_unread_notifications_cache
+from users.services import update_student_progress_summaries
 
 
 @receiver(post_save, sender=Course)
@@ -23,6 +28,12 @@ def manage_student_group_for_course_root_branch(sender, instance, created,
     pass
 
 
+@receiver(post_save, sender=GraduateProfile)
+@receiver(post_delete, sender=GraduateProfile)
+def invalidate_public_pages_cache(sender, *args, **kwargs):
+    invalidate_page_cache(sender._meta.label)
+
+
 @receiver(post_save, sender=CourseBranch)
 def create_student_group_from_course_branch(sender, instance: CourseBranch,
                                             created, *args, **kwargs):
@@ -49,6 +60,29 @@ def compute_course_learners_count(sender, instance: Enrollment, created,
     if created and instance.is_deleted:
         return
     update_course_learners_count(instance.course_id)
+    invalidate_gradebook_cache(instance.course_id)
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def update_student_progress_on_enrollment_change(sender, instance: Enrollment,
+                                                 *args, **kwargs):
+    update_student_progress_summaries([instance.student_id])
+
+
+@receiver(post_save, sender=CourseClass)
+@receiver(post_delete, sender=CourseClass)
+def update_student_progress_on_club_classes_change(sender, instance: CourseClass,
+                                                   *args, **kwargs):
+    """Contribution of the club course depends on the number of classes"""
+    if kwargs.get('created') is False:
+        return
+    if not instance.course.is_club_course:
+        return
+    student_ids = (Enrollment.active
+                   .filter(course_id=instance.course_id)
+                   .values_list('student_id', flat=True))
+    update_student_progress_summaries(student_ids)
 
 
 @receiver(post_save, sender=CourseNews)
@@ -69,6 +103,13 @@ def create_notifications_about_course_news(sender, instance: CourseNews,
             CourseNewsNotification(user_id=co_t.teacher_id,
                                    course_offering_news_id=instance.pk))
     CourseNewsNotification.objects.bulk_create(notifications)
+    invalidate_unread_notifications_cache(n.user_id for n in notifications)
+
+
+@receiver(post_save, sender=AssignmentNotification)
+@receiver(post_save, sender=CourseNewsNotification)
+def invalidate_unread_notifications(sender, instance, *args, **kwargs):
+    invalidate_unread_notifications_cache([instance.user_id])
 
 
 @receiver(post_save, sender=Assignment)
@@ -93,6 +134,13 @@ def create_deadline_change_notification(sender, instance, created,
                 continue
 
 
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+def invalidate_gradebook_on_assignment_change(sender, instance: Assignment,
+                                              *args, **kwargs):
+    invalidate_gradebook_cache(instance.course_id)
+
+
 @receiver(post_save, sender=AssignmentComment)
 def convert_ipynb_files(sender, instance: AssignmentComment, *args, **kwargs):
     # TODO: convert for solutions only? both?
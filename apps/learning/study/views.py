@@ -92,9 +92,11 @@ class TimetableView(PermissionRequiredMixin, WeekEventsView):
 
     def get_events(self, iso_year, iso_week) -> Iterable[CalendarEvent]:
         w = Week(iso_year, iso_week)
-        in_range = [Q(date__range=[w.monday(), w.sunday()])]
         user = self.request.user
-        for c in get_student_classes(user, in_range, with_venue=True):
+        classes = get_student_classes(user, with_venue=True,
+                                      start_date=w.monday(),
+                                      end_date=w.sunday())
+        for c in classes:
             yield TimetableEvent.create(c, time_zone=user.time_zone)
 
 
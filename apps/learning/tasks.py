@@ -1,14 +1,18 @@
 import logging
 
 from django_rq import job
+from rq import get_current_job
 
+from core.services import mark_derivable_fields_dirty
+from courses.models import Assignment
 from files.utils import convert_ipynb_to_html
 from learning.models import AssignmentComment, StudentAssignment, SubmissionAttachment
+from learning.services.assignment_service import AssignmentService
 from learning.services.notification_service import (
     create_notifications_about_new_submission
 )
 from learning.services.personal_assignment_service import (
-    update_personal_assignment_stats, maybe_set_assignee_for_personal_assignment
+    maybe_set_assignee_for_personal_assignment
 )
 
 logger = logging.getLogger(__file__)
@@ -38,12 +42,11 @@ def convert_assignment_submission_ipynb_file_to_html(*, assignment_submission_id
 
 @job('default')
 def update_student_assignment_stats(student_assignment_id: int) -> None:
-    student_assignment = (StudentAssignment.objects
-                          .filter(pk=student_assignment_id)
-                          .first())
-    if not student_assignment:
-        return
-    update_personal_assignment_stats(personal_assignment=student_assignment)
+    """
+    Deprecated: stats are recomputed through the dirty fields queue.
+    Kept for the jobs enqueued before the migration.
+    """
+    mark_derivable_fields_dirty(StudentAssignment, [student_assignment_id], 'meta')
 
 
 @job('high')
@@ -71,3 +74,23 @@ def generate_notifications_about_new_submission(*, assignment_submission_id):
         return
     count = create_notifications_about_new_submission(submission)
     return f'Generated {count} notifications'
+
+
+@job('default')
+def generate_student_assignments(*, assignment_id: int) -> None:
+    assignment = Assignment.objects.filter(pk=assignment_id).first()
+    if not assignment:
+        logger.debug(f"Assignment with id={assignment_id} not found")
+        return
+    current_job = get_current_job()
+
+    def report_progress(processed: int, total: int) -> None:
+        logger.info(f"Assignment {assignment_id}: {processed} of {total} "
+                    f"personal assignments are generated")
+        if current_job is not None:
+            current_job.meta['progress'] = {"processed": processed,
+                                            "total": total}
+            current_job.save_meta()
+
+    AssignmentService.bulk_create_student_assignments(
+        assignment, on_progress=report_progress)
@@ -3,7 +3,7 @@ from typing import Any, Dict, Iterable
 
 from vanilla import TemplateView
 
-from django.db.models import Prefetch, Q
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from django.views import generic
 
@@ -37,9 +37,10 @@ class TimetableView(TeacherOnlyMixin, MonthEventsCalendarView):
 
     def get_events(self, month_period: MonthPeriod, **kwargs):
         start, end = extended_month_date_range(month_period, expand=1)
-        in_range = [Q(date__range=[start, end])]
         user = self.request.user
-        for c in get_teacher_classes(user, in_range, with_venue=True):
+        classes = get_teacher_classes(user, with_venue=True,
+                                      start_date=start, end_date=end)
+        for c in classes:
             yield TimetableEvent.create(c, time_zone=user.time_zone)
 
 
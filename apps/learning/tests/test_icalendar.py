@@ -1,9 +1,11 @@
+import datetime
 from itertools import chain
 
 import pytest
 from icalendar import Calendar, Event
 
 from django.contrib.sites.models import Site
+from django.core.cache import caches
 
 from core.urls import reverse
 from courses.tests.factories import AssignmentFactory, CourseClassFactory, CourseFactory
@@ -57,6 +59,52 @@ def test_course_classes(client, settings, mocker):
         assert cc.name in cal_events
 
 
+@pytest.mark.django_db
+def test_course_classes_conditional_get(client, settings):
+    user = StudentFactory()
+    course = CourseFactory()
+    EnrollmentFactory(student=user, course=course)
+    course_class = CourseClassFactory(course=course)
+    url = user.get_classes_icalendar_url()
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response['ETag']
+    assert 'Last-Modified' in response
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    # Re-rendered feed (e.g. on another pod) has the same ETag
+    caches['default'].clear()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    # Last-Modified isn't used as a validator
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+    assert response.status_code == 200
+    # Changes of the related models are visible after the cache expiration
+    venue = course_class.venue
+    venue.address = 'New venue address'
+    venue.save()
+    caches['default'].clear()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert b'New venue address' in response.content
+    etag = response['ETag']
+    course_class.name = 'New class name'
+    course_class.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    # Classes out of the horizon are excluded
+    horizon = datetime.timedelta(days=settings.ICALENDAR_PAST_EVENTS_HORIZON + 1)
+    past_class = CourseClassFactory(course=course,
+                                    date=datetime.date.today() - horizon)
+    response = client.get(url)
+    cal = Calendar.from_ical(response.content)
+    cal_events = {evt['SUMMARY'] for evt in
+                  cal.subcomponents if isinstance(evt, Event)}
+    assert cal_events == {'New class name'}
+    assert past_class.name not in cal_events
+
+
 @pytest.mark.django_db
 def test_assignments(client, settings, mocker):
     mocker.patch('code_reviews.gerrit.tasks.update_password_in_gerrit')
@@ -10,6 +10,7 @@ from subdomains.utils import get_domain
 
 from django.contrib.sites.models import Site
 from django.core import mail, management
+from django.core.cache import caches
 
 from core.models import SiteConfiguration
 from core.tests.factories import BranchFactory, SiteConfigurationFactory, SiteFactory
@@ -24,12 +25,17 @@ from courses.models import Assignment, CourseTeacher
 from courses.tests.factories import (
     AssignmentFactory, CourseFactory, CourseNewsFactory, CourseTeacherFactory
 )
-from learning.models import AssignmentNotification, CourseNewsNotification
+from learning.models import (
+    AssignmentNotification, CourseNewsNotification, StudentAssignment
+)
 from learning.services.enrollment_service import (
     EnrollmentService, is_course_failed_by_student
 )
 from learning.settings import Branches, GradeTypes, StudentStatuses
 from learning.tests.factories import *
+from notifications.cache import (
+    UnreadNotificationsCache, invalidate_unread_notifications_cache
+)
 from notifications.management.commands.notify import (
     get_assignment_notification_context, get_course_news_notification_context
 )
@@ -476,3 +482,39 @@ def test_remove_course_news_notifications_on_leaving_course(settings):
     EnrollmentService.leave(enrollment)
     assert CourseNewsNotification.objects.count() == 1
     assert CourseNewsNotification.objects.get() == cn
+
+
+@pytest.mark.django_db
+def test_unread_notifications_cache(django_assert_num_queries):
+    course = CourseFactory()
+    enrollment = EnrollmentFactory(course=course)
+    student = enrollment.student
+    assignment = AssignmentFactory(course=course)
+    student_assignment = StudentAssignment.objects.get(assignment=assignment,
+                                                       student=student)
+    CourseNewsFactory(course=course)
+    unread = UnreadNotificationsCache(student.pk)
+    assert unread.assignments_student == {student_assignment.pk}
+    assert not unread.assignments_teacher
+    assert unread.assignment_ids_set == {assignment.pk}
+    assert unread.courseoffering_news == {course.pk}
+    # State is shared among requests and workers
+    caches['default'].clear()
+    with django_assert_num_queries(0):
+        assert UnreadNotificationsCache(student.pk).assignments == {student_assignment.pk}
+    # Invalidate on mark-read
+    (AssignmentNotification.unread
+     .filter(user=student)
+     .update(is_unread=False))
+    assert UnreadNotificationsCache(student.pk).assignments == {student_assignment.pk}
+    invalidate_unread_notifications_cache([student.pk])
+    assert not UnreadNotificationsCache(student.pk).assignments
+    # Invalidate on create
+    AssignmentNotificationFactory(user=student,
+                                  student_assignment=student_assignment)
+    assert UnreadNotificationsCache(student.pk).assignments == {student_assignment.pk}
+    # Invalidate on delete
+    EnrollmentService.leave(enrollment)
+    unread = UnreadNotificationsCache(student.pk)
+    assert not unread.assignments
+    assert not unread.courseoffering_news
@@ -582,3 +582,23 @@ def test_export_highest_or_max_grade(settings):
     assert df[meta_course.name].iloc[0] == GradeTypes.EXCELLENT
     df = ProgressReportFull(on_course_duplicate='store_last').generate()
     assert df[meta_course.name].iloc[0] == GradeTypes.GOOD
+
+
+@pytest.mark.django_db
+def test_report_iter_rows_same_as_generate(settings):
+    teacher = TeacherFactory.create()
+    term = SemesterFactory.create_current()
+    co1, co2 = CourseFactory.create_batch(2, semester=term, teachers=[teacher])
+    student1, student2, student3 = StudentFactory.create_batch(3)
+    EnrollmentFactory(student=student1, course=co1, grade=GradeTypes.GOOD)
+    EnrollmentFactory(student=student2, course=co2, grade=GradeTypes.EXCELLENT)
+    SHADCourseRecordFactory(student=student3, grade=GradeTypes.GOOD)
+    OnlineCourseRecordFactory.create(student=student2)
+    for report in (ProgressReportFull(grade_getter="grade_honest"),
+                   ProgressReportForSemester(term)):
+        df = report.generate()
+        # Small chunk size to make sure headers are aggregated across chunks
+        headers, *rows = list(report.iter_rows(chunk_size=1))
+        assert headers == ["ID", *df.columns]
+        assert [row[0] for row in rows] == list(df.index)
+        assert all(len(row) == len(headers) for row in rows)
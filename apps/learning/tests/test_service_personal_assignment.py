@@ -8,6 +8,10 @@ from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db import transaction
 
+from core.models import DirtyDerivableField
+from core.services import (
+    get_dirty_fields_queue_stats, recompute_dirty_derivable_fields
+)
 from courses.constants import AssigneeMode, AssignmentFormat, AssignmentStatus
 from courses.models import CourseGroupModes, CourseTeacher
 from courses.tests.factories import AssignmentFactory, CourseFactory, CourseTeacherFactory
@@ -16,12 +20,15 @@ from learning.models import (
     PersonalAssignmentActivity, StudentAssignment, StudentGroupTeacherBucket
 )
 from learning.services import EnrollmentService, StudentGroupService
+from learning.tasks import update_student_assignment_stats
 from learning.services.personal_assignment_service import (
     create_assignment_comment, create_assignment_solution,
     create_personal_assignment_review, resolve_assignees_for_personal_assignment,
     update_personal_assignment_score, update_personal_assignment_stats,
     update_personal_assignment_status, get_assignee_with_minimal_load,
-    calculate_teachers_overall_expected_load_in_bucket
+    calculate_teachers_overall_expected_load_in_bucket, set_assignees_with_minimal_load,
+    bulk_update_personal_assignments_stats, maybe_set_assignee_for_personal_assignment,
+    AssigneeLoadLedger
 )
 from learning.settings import AssignmentScoreUpdateSource
 from learning.tests.factories import (
@@ -94,6 +101,62 @@ def test_service_update_personal_assignment_stats_unpublished():
     assert student_assignment.meta is None
 
 
+@pytest.mark.django_db
+def test_recompute_personal_assignment_stats_from_queue():
+    curator = CuratorFactory()
+    student_assignment = StudentAssignmentFactory()
+    for message in ['Comment1', 'Comment2']:
+        create_assignment_comment(personal_assignment=student_assignment,
+                                  is_draft=False,
+                                  created_by=curator,
+                                  message=message)
+    assert DirtyDerivableField.objects.count() == 2
+    queue_stats = get_dirty_fields_queue_stats()
+    assert len(queue_stats) == 1
+    assert queue_stats[0].depth == 2
+    student_assignment.refresh_from_db()
+    assert student_assignment.meta is None
+    # Duplicates are merged
+    assert recompute_dirty_derivable_fields() == 1
+    assert not DirtyDerivableField.objects.exists()
+    student_assignment.refresh_from_db()
+    assert student_assignment.stats['comments'] == 2
+    assert student_assignment.stats['activity'] == PersonalAssignmentActivity.TEACHER_COMMENT
+    # Deprecated job puts the record in the queue
+    update_student_assignment_stats(student_assignment.pk)
+    assert DirtyDerivableField.objects.filter(object_id=student_assignment.pk).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_update_personal_assignments_stats():
+    curator = CuratorFactory()
+    student_assignment1, student_assignment2, student_assignment3 = StudentAssignmentFactory.create_batch(3)
+    create_assignment_comment(personal_assignment=student_assignment1,
+                              is_draft=False, created_by=curator,
+                              message='Comment')
+    create_assignment_solution(personal_assignment=student_assignment1,
+                               created_by=student_assignment1.student,
+                               message="solution")
+    create_assignment_comment(personal_assignment=student_assignment2,
+                              is_draft=False,
+                              created_by=student_assignment2.student,
+                              message='Comment')
+    personal_assignments = [student_assignment1, student_assignment2,
+                            student_assignment3]
+    assert bulk_update_personal_assignments_stats(personal_assignments) == 2
+    for personal_assignment in personal_assignments:
+        personal_assignment.refresh_from_db()
+    assert student_assignment1.stats['activity'] == PersonalAssignmentActivity.SOLUTION
+    assert student_assignment1.stats['comments'] == 1
+    assert student_assignment1.stats['solutions']['count'] == 1
+    assert student_assignment2.stats['activity'] == PersonalAssignmentActivity.STUDENT_COMMENT
+    assert 'solutions' not in student_assignment2.stats
+    assert student_assignment3.meta is None
+    # Stats are up to date
+    assert bulk_update_personal_assignments_stats(personal_assignments) == 0
+    assert not student_assignment1.compute_fields('meta', commit=False)
+
+
 @pytest.mark.django_db
 def test_service_update_personal_assignment_stats_published(django_capture_on_commit_callbacks):
     curator = CuratorFactory()
@@ -1232,3 +1295,87 @@ def test_get_assignee_with_minial_load_assignment_load_independency():
     # Independency check in both directions
     assignee_a2_sa1 = get_assignee_with_minimal_load(sg1_a2_sa)[0]
     assert assignee_a2_sa1 == teachers[1]
+
+
+@pytest.mark.django_db
+def test_set_assignees_with_minimal_load():
+    course, teachers, student_groups, buckets = create_buckets_testing_environment(
+        group_sizes=[2, 3, 1],  # One group not in any of buckets
+        buckets_structs={
+            (0, 1): {0, 1},
+        }
+    ).values()
+    assignment = buckets[0].assignment
+    student_assignments = list(StudentAssignment.objects
+                               .filter(assignment=assignment)
+                               .order_by('pk'))
+    assert len(student_assignments) == 6
+    updated = set_assignees_with_minimal_load(assignment=assignment,
+                                              student_assignments=student_assignments)
+    assert updated == 5
+    assignees = (StudentAssignment.objects
+                 .filter(assignment=assignment, assignee__isnull=False)
+                 .values_list('assignee_id', flat=True))
+    assert sorted(assignees) == sorted([teachers[0].pk] * 3 + [teachers[1].pk] * 2)
+    # Nothing to update
+    assert set_assignees_with_minimal_load(assignment=assignment,
+                                           student_assignments=student_assignments) == 0
+
+
+@pytest.mark.django_db
+def test_set_assignees_with_minimal_load_student_left_course():
+    course, teachers, student_groups, buckets = create_buckets_testing_environment(
+        group_sizes=[2],
+        buckets_structs={
+            (0,): {0},
+        }
+    ).values()
+    assignment = buckets[0].assignment
+    enrollment = student_groups[0].enrollments.first()
+    enrollment.is_deleted = True
+    enrollment.save()
+    student_assignments = list(StudentAssignment.objects
+                               .filter(assignment=assignment)
+                               .order_by('pk'))
+    StudentAssignment.objects.filter(assignment=assignment).update(trigger_auto_assign=True)
+    for student_assignment in student_assignments:
+        student_assignment.trigger_auto_assign = True
+    assert set_assignees_with_minimal_load(assignment=assignment,
+                                           student_assignments=student_assignments) == 1
+    student_assignment = StudentAssignment.objects.get(assignment=assignment,
+                                                       student_id=enrollment.student_id)
+    # Auto assigning trigger is reset like for the other assignee modes
+    assert student_assignment.assignee_id is None
+    assert student_assignment.trigger_auto_assign is False
+
+
+@pytest.mark.django_db
+def test_maybe_set_assignee_for_personal_assignment_balanced_batch(mocker):
+    mocker.patch('learning.tasks.handle_submission_assignee_and_notifications.delay')
+    course, teachers, student_groups, buckets = create_buckets_testing_environment(
+        group_sizes=[3],
+        buckets_structs={
+            (0,): {0, 1},
+        }
+    ).values()
+    assignment = buckets[0].assignment
+    student_assignments = list(StudentAssignment.objects
+                               .filter(assignment=assignment)
+                               .order_by('pk'))
+    # Teacher activity doesn't trigger auto assigning
+    AssignmentCommentFactory(student_assignment=student_assignments[2],
+                             author=teachers[0].teacher)
+    comments = [AssignmentCommentFactory(student_assignment=sa, author=sa.student)
+                for sa in student_assignments[:2]]
+    seed = mocker.spy(AssigneeLoadLedger, 'seed')
+    maybe_set_assignee_for_personal_assignment(comments[0].pk)
+    # Personal assignments with student activity are processed together
+    maybe_set_assignee_for_personal_assignment(comments[1].pk)
+    assert seed.call_count == 1
+    for student_assignment in student_assignments:
+        student_assignment.refresh_from_db()
+    assignees = {sa.assignee_id for sa in student_assignments[:2]}
+    assert assignees == {teachers[0].pk, teachers[1].pk}
+    assert not any(sa.trigger_auto_assign for sa in student_assignments[:2])
+    assert student_assignments[2].assignee_id is None
+    assert student_assignments[2].trigger_auto_assign is True
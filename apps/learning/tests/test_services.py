@@ -169,6 +169,78 @@ def test_assignment_service_bulk_create_personal_assignments_notifications(setti
     assert AssignmentNotification.objects.count() == 2
 
 
+@pytest.mark.django_db
+def test_assignment_service_bulk_create_personal_assignments_in_batches(mocker):
+    mocker.patch('learning.services.assignment_service.STUDENT_ASSIGNMENTS_BATCH_SIZE', 2)
+    course = CourseFactory(group_mode=StudentGroupTypes.MANUAL)
+    enrollments = EnrollmentFactory.create_batch(5, course=course)
+    assignment = AssignmentFactory(course=course)
+    StudentAssignment.objects.all().delete()
+    AssignmentService.create_or_restore_student_assignment(assignment, enrollments[0])
+    student_assignment = AssignmentService.create_or_restore_student_assignment(assignment, enrollments[1])
+    student_assignment.delete()
+    AssignmentNotification.objects.all().delete()
+    progress = []
+    processed = AssignmentService.bulk_create_student_assignments(
+        assignment, on_progress=lambda *args: progress.append(args))
+    assert processed == 4
+    assert progress == [(2, 4), (4, 4)]
+    assert StudentAssignment.objects.filter(assignment=assignment).count() == 5
+    student_assignment.refresh_from_db()
+    assert not student_assignment.is_deleted
+    notified = set(AssignmentNotification.objects
+                   .values_list('student_assignment__student_id', flat=True))
+    assert notified == {e.student_id for e in enrollments[1:]}
+
+
+@pytest.mark.django_db
+def test_assignment_service_bulk_create_personal_assignments_concurrent_enrollment(mocker):
+    mocker.patch('learning.services.assignment_service.STUDENT_ASSIGNMENTS_BATCH_SIZE', 2)
+    mocked_invalidate = mocker.patch('learning.services.assignment_service.invalidate_gradebook_cache')
+    course = CourseFactory(group_mode=StudentGroupTypes.MANUAL)
+    enrollments = EnrollmentFactory.create_batch(4, course=course)
+    assignment = AssignmentFactory(course=course)
+    StudentAssignment.objects.all().delete()
+    mocked_invalidate.reset_mock()
+
+    def enroll_concurrently(processed, total):
+        if processed == 2:
+            # Personal assignment for the student from the next batch
+            processed_students = set(StudentAssignment.objects
+                                     .filter(assignment=assignment)
+                                     .values_list('student_id', flat=True))
+            enrollment = next(e for e in enrollments
+                              if e.student_id not in processed_students)
+            AssignmentService.create_or_restore_student_assignment(assignment, enrollment)
+
+    generated = AssignmentService.bulk_create_student_assignments(
+        assignment, on_progress=enroll_concurrently)
+    assert generated == 3
+    assert StudentAssignment.objects.filter(assignment=assignment).count() == 4
+    mocked_invalidate.assert_called_once_with(course.pk)
+
+
+@pytest.mark.django_db
+def test_assignment_service_generate_student_assignments(mocker, django_capture_on_commit_callbacks):
+    mocker.patch('learning.services.assignment_service.STUDENT_ASSIGNMENTS_ASYNC_THRESHOLD', 2)
+    mocked_job = mocker.patch('learning.tasks.generate_student_assignments.delay')
+    course = CourseFactory(group_mode=StudentGroupTypes.MANUAL)
+    EnrollmentFactory(course=course)
+    assignment = AssignmentFactory(course=course)
+    StudentAssignment.objects.all().delete()
+    assignment.course.refresh_from_db()
+    AssignmentService.generate_student_assignments(assignment)
+    assert StudentAssignment.objects.filter(assignment=assignment).count() == 1
+    assert not mocked_job.called
+    EnrollmentFactory(course=course)
+    StudentAssignment.objects.all().delete()
+    assignment.course.refresh_from_db()
+    with django_capture_on_commit_callbacks(execute=True):
+        AssignmentService.generate_student_assignments(assignment)
+    assert StudentAssignment.objects.filter(assignment=assignment).count() == 0
+    mocked_job.assert_called_once_with(assignment_id=assignment.pk)
+
+
 @pytest.mark.django_db
 def test_assignment_service_remove_personal_assignments():
     branch_spb = BranchFactory(code=Branches.SPB)
@@ -1,12 +1,20 @@
-from typing import Iterable, NamedTuple
+import datetime
+import hashlib
+from calendar import timegm
+from typing import Iterable, NamedTuple, Optional
 
 from django.conf import settings
-from django.db.models import Q
+from django.core.cache import cache
+from django.db.models import Count, Max, Q, QuerySet
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from django.views import generic
 
+from core.timezone import get_now_utc
+from courses.models import Assignment, CourseClass
 from learning.icalendar import (
     StudentAssignmentICalendarEvent, StudentClassICalendarEvent,
     StudyEventICalendarEvent, TeacherAssignmentICalendarEvent,
@@ -18,6 +26,13 @@ from learning.selectors import (
 )
 from users.models import User
 
+ICALENDAR_CACHE_KEY = "icalendar_{digest}"
+# Cache key is versioned, the timeout limits staleness of the data that is
+# not taken into account by the version (e.g. venue address). ETag is
+# calculated from the feed content, so it follows the served data and
+# doesn't depend on the pod or the time of rendering.
+ICALENDAR_CACHE_TIMEOUT = 3600
+
 
 class ICalendarMeta(NamedTuple):
     name: str
@@ -25,27 +40,81 @@ class ICalendarMeta(NamedTuple):
     file_name: str
 
 
+class ICalendarVersion(NamedTuple):
+    last_modified: Optional[datetime.datetime]
+    total: int
+
+
+def get_icalendar_version(queryset: QuerySet) -> ICalendarVersion:
+    """
+    Any change, addition or removal of the calendar records changes
+    the version.
+    """
+    values = (queryset
+              .order_by()
+              .aggregate(last_modified=Max('modified'), total=Count('pk')))
+    return ICalendarVersion(**values)
+
+
+def get_classes_horizon_date() -> datetime.date:
+    """Course classes before this date are excluded from calendar feeds."""
+    horizon = datetime.timedelta(days=settings.ICALENDAR_PAST_EVENTS_HORIZON)
+    return (get_now_utc() - horizon).date()
+
+
 # TODO: add secret link for each student
 class UserICalendarView(generic.base.View):
+    """
+    Calendar clients poll feeds frequently. The feed version is calculated
+    with a single aggregate query, rendered feeds are cached by this version
+    and unchanged feeds are answered with 304 Not Modified.
+    """
     def get(self, request, *args, **kwargs):
         user = self.get_user()
         site = self.request.site
         url_builder = request.build_absolute_uri
-        product_id = f"-//{site.name} Calendar//{site.domain}//"
         tz = user.time_zone or settings.DEFAULT_TIMEZONE
         calendar_meta = self.get_calendar_meta(user, site, url_builder, tz)
-        events = self.get_calendar_events(user, site, url_builder, tz)
-        cal = generate_icalendar(product_id,
-                                 name=calendar_meta.name,
-                                 description=calendar_meta.description,
-                                 time_zone=tz,
-                                 events=events)
-        response = HttpResponse(cal.to_ical(),
-                                content_type="text/calendar; charset=UTF-8")
-        response['Content-Disposition'] = "attachment; filename=\"{}\"".format(
-            calendar_meta.file_name)
+        version = self.get_calendar_version(user)
+        digest = self.get_calendar_digest(user, site, tz, calendar_meta, version)
+        cache_key = ICALENDAR_CACHE_KEY.format(digest=digest)
+        content = cache.get(cache_key)
+        if content is None:
+            product_id = f"-//{site.name} Calendar//{site.domain}//"
+            events = self.get_calendar_events(user, site, url_builder, tz)
+            cal = generate_icalendar(product_id,
+                                     name=calendar_meta.name,
+                                     description=calendar_meta.description,
+                                     time_zone=tz,
+                                     events=events)
+            content = cal.to_ical()
+            cache.set(cache_key, content, timeout=ICALENDAR_CACHE_TIMEOUT)
+        etag = quote_etag(hashlib.md5(content).hexdigest())
+        # Last-Modified is not used as a validator since it can't track
+        # removed records and changes of the related models
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content,
+                                    content_type="text/calendar; charset=UTF-8")
+            response['Content-Disposition'] = "attachment; filename=\"{}\"".format(
+                calendar_meta.file_name)
+        response['ETag'] = etag
+        if version.last_modified is not None:
+            last_modified = timegm(version.last_modified.utctimetuple())
+            response['Last-Modified'] = http_date(last_modified)
         return response
 
+    def get_calendar_digest(self, user, site, tz, calendar_meta: ICalendarMeta,
+                            version: ICalendarVersion) -> str:
+        """
+        Returns hash of the feed parameters, it's used as a part of
+        the cache key.
+        """
+        parts = (self.__class__.__name__, user.pk, site.pk, str(tz),
+                 self.request.build_absolute_uri('/'), calendar_meta,
+                 version.last_modified, version.total)
+        return hashlib.md5(repr(parts).encode("utf-8")).hexdigest()
+
     def get_user(self):
         user_id = self.kwargs['pk']
         qs = (User.objects
@@ -57,6 +126,9 @@ class UserICalendarView(generic.base.View):
     def get_calendar_meta(user, site, url_builder, tz) -> ICalendarMeta:
         raise NotImplementedError
 
+    def get_calendar_version(self, user) -> ICalendarVersion:
+        raise NotImplementedError
+
     def get_calendar_events(self, user, site, url_builder, tz) -> Iterable:
         raise NotImplementedError
 
@@ -70,13 +142,24 @@ class ICalClassesView(UserICalendarView):
             file_name="classes.ics"
         )
 
+    def get_calendar_version(self, user) -> ICalendarVersion:
+        start_date = get_classes_horizon_date()
+        student_classes = get_student_classes(user, start_date=start_date)
+        teacher_classes = get_teacher_classes(user, start_date=start_date)
+        queryset = CourseClass.objects.filter(
+            Q(pk__in=student_classes.order_by().values('pk')) |
+            Q(pk__in=teacher_classes.order_by().values('pk')))
+        return get_icalendar_version(queryset)
+
     def get_calendar_events(self, user, site, url_builder, tz):
+        start_date = get_classes_horizon_date()
         event_factory = StudentClassICalendarEvent(tz, url_builder, site)
-        # FIXME: filter out past course classes?
-        for course_class in get_student_classes(user, with_venue=True):
+        for course_class in get_student_classes(user, with_venue=True,
+                                                start_date=start_date):
             yield event_factory.create(course_class, user)
         event_factory = TeacherClassICalendarEvent(tz, url_builder, site)
-        for course_class in get_teacher_classes(user, with_venue=True):
+        for course_class in get_teacher_classes(user, with_venue=True,
+                                                start_date=start_date):
             yield event_factory.create(course_class, user)
 
 
@@ -90,6 +173,20 @@ class ICalAssignmentsView(UserICalendarView):
             description=description,
             file_name="assignments.ics")
 
+    def get_calendar_version(self, user) -> ICalendarVersion:
+        teacher_assignments = (get_teacher_assignments(user)
+                               .with_future_deadline()
+                               .order_by()
+                               .values('pk'))
+        student_assignments = (StudentAssignment.objects
+                               .filter(student=user)
+                               .with_future_deadline()
+                               .order_by()
+                               .values('assignment_id'))
+        queryset = Assignment.objects.filter(
+            Q(pk__in=teacher_assignments) | Q(pk__in=student_assignments))
+        return get_icalendar_version(queryset)
+
     def get_calendar_events(self, user, site, url_builder, tz):
         event_factory = TeacherAssignmentICalendarEvent(tz, url_builder, site)
         for assignment in get_teacher_assignments(user).with_future_deadline():
@@ -113,13 +210,20 @@ class ICalEventsView(UserICalendarView):
             description="Календарь общих событий {}".format(site.name),
             file_name="events.ics")
 
-    def get_calendar_events(self, user, site, url_builder, tz):
-        event_factory = StudyEventICalendarEvent(tz, url_builder, site)
+    @staticmethod
+    def get_study_events(user) -> QuerySet:
         filters = []
         future_events = Q(date__gt=timezone.now())
         filters.append(future_events)
         # FIXME: take into account all teacher branches?
         if hasattr(user, "branch_id") and user.branch_id:
             filters.append(Q(branch_id=user.branch_id))
-        for e in get_study_events(filters).select_related('venue'):
+        return get_study_events(filters)
+
+    def get_calendar_version(self, user) -> ICalendarVersion:
+        return get_icalendar_version(self.get_study_events(user))
+
+    def get_calendar_events(self, user, site, url_builder, tz):
+        event_factory = StudyEventICalendarEvent(tz, url_builder, site)
+        for e in self.get_study_events(user).select_related('venue'):
             yield event_factory.create(e, user)
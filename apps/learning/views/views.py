@@ -28,6 +28,7 @@ from learning.permissions import (
 )
 from learning.services.personal_assignment_service import create_assignment_comment
 from learning.study.forms import AssignmentCommentForm
+from notifications.cache import invalidate_unread_notifications_cache
 from users.mixins import TeacherOnlyMixin
 
 logger = logging.getLogger(__name__)
@@ -119,9 +120,11 @@ class AssignmentSubmissionBaseView(StudentAssignmentURLParamsMixin,
         sa = self.student_assignment
         user = self.request.user
         # Not sure if it's the best place for this, but it's the simplest one
-        (AssignmentNotification.unread
-         .filter(student_assignment=sa, user=user)
-         .update(is_unread=False))
+        updated = (AssignmentNotification.unread
+                   .filter(student_assignment=sa, user=user)
+                   .update(is_unread=False))
+        if updated:
+            invalidate_unread_notifications_cache([user.pk])
         # TODO: move to the StudentAssignment model?
         # Let's consider the last minute of the deadline in favor of the student
         deadline_at = sa.assignment.deadline_at + datetime.timedelta(minutes=1)
@@ -206,6 +209,8 @@ class CourseNewsNotificationUpdate(LoginRequiredMixin, CourseURLParamsMixin,
                    .filter(course_offering_news__course=self.course,
                            user_id=self.request.user.pk)
                    .update(is_unread=False))
+        if updated:
+            invalidate_unread_notifications_cache([self.request.user.pk])
         return JsonResponse({"updated": bool(updated)})
 
 
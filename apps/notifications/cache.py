@@ -0,0 +1,113 @@
+import json
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+from django.utils.functional import cached_property
+
+from core.locks import get_shared_connection
+
+# State is stored in the shared redis database since notifications are
+# created and read by different web and queue workers
+UNREAD_NOTIFICATIONS_CACHE_KEY = "notifications.unread_{user_id}"
+# Protects from stale values in case some write path misses invalidation
+UNREAD_NOTIFICATIONS_CACHE_TIMEOUT = 3600
+
+
+def _get_cache_key(user_id: int) -> str:
+    return UNREAD_NOTIFICATIONS_CACHE_KEY.format(user_id=user_id)
+
+
+def get_unread_notifications_state(user_id: int) -> Dict[str, List[int]]:
+    """
+    Returns unread assignment and course news notifications of the user.
+    State is shared among requests and workers and loaded from
+    the database only if it's missing in redis.
+    """
+    from learning.models import AssignmentNotification, CourseNewsNotification
+    cache_key = _get_cache_key(user_id)
+    redis_client = get_shared_connection()
+    cached_state = redis_client.get(cache_key)
+    if cached_state is not None:
+        state = json.loads(cached_state)
+    else:
+        assignments_student = []
+        assignments_teacher = []
+        assignment_ids = set()
+        unread_assignments = (AssignmentNotification.unread
+                              .filter(user_id=user_id)
+                              .values_list('student_assignment_id',
+                                           'student_assignment__assignment_id',
+                                           'student_assignment__student_id')
+                              .order_by())
+        for student_assignment_id, assignment_id, student_id in unread_assignments:
+            if student_id == user_id:
+                assignments_student.append(student_assignment_id)
+            else:
+                assignments_teacher.append(student_assignment_id)
+            assignment_ids.add(assignment_id)
+        course_ids = (CourseNewsNotification.unread
+                      .filter(user_id=user_id)
+                      .values_list('course_offering_news__course_id', flat=True)
+                      .order_by()
+                      .distinct())
+        state = {
+            "assignments_student": assignments_student,
+            "assignments_teacher": assignments_teacher,
+            "assignment_ids": list(assignment_ids),
+            "course_ids": list(course_ids),
+        }
+        redis_client.set(cache_key, json.dumps(state),
+                         ex=UNREAD_NOTIFICATIONS_CACHE_TIMEOUT)
+    return state
+
+
+def invalidate_unread_notifications_cache(user_ids: Iterable[int]) -> None:
+    """
+    Call it every time unread notifications are created, read or deleted.
+
+    Keys are deleted once again after the current transaction is committed
+    since concurrent request could cache the state before the commit.
+    """
+    cache_keys = [_get_cache_key(user_id) for user_id in set(user_ids)]
+    if not cache_keys:
+        return
+
+    def delete_keys():
+        get_shared_connection().delete(*cache_keys)
+
+    delete_keys()
+    transaction.on_commit(delete_keys)
+
+
+class UnreadNotificationsCache:
+    """
+    Unread notifications of the user. Values are loaded on the first access.
+    """
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+
+    @cached_property
+    def _state(self):
+        return get_unread_notifications_state(self.user_id)
+
+    @cached_property
+    def assignments(self):
+        """Unread student assignment ids"""
+        return self.assignments_student | self.assignments_teacher
+
+    @cached_property
+    def assignments_student(self):
+        return set(self._state["assignments_student"])
+
+    @cached_property
+    def assignments_teacher(self):
+        return set(self._state["assignments_teacher"])
+
+    @cached_property
+    def assignment_ids_set(self):
+        return set(self._state["assignment_ids"])
+
+    @cached_property
+    def courseoffering_news(self):
+        """Course ids with unread news"""
+        return set(self._state["course_ids"])
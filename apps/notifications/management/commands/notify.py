@@ -1,9 +1,12 @@
 import logging
+import queue
 import smtplib
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from functools import partial
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from django_ses import SESBackend
 
@@ -11,7 +14,7 @@ from django.conf import settings
 from django.core.mail import EmailMultiAlternatives, get_connection
 from django.core.mail.backends import smtp
 from django.core.management.base import BaseCommand
-from django.template.loader import render_to_string
+from django.template.loader import get_template
 from django.utils import translation
 from django.utils.decorators import method_decorator
 from django.utils.encoding import smart_str
@@ -21,12 +24,23 @@ from django.utils.module_loading import import_string
 from core.locks import distributed_lock, get_shared_connection
 from core.models import Branch, SiteConfiguration
 from core.urls import replace_hostname
+from core.utils import bucketize
 from courses.models import Course
-from learning.models import AssignmentNotification, CourseNewsNotification
+from learning.models import AssignmentNotification, CourseNewsNotification, Enrollment
 from users.models import User
 
 logger = logging.getLogger(__name__)
 
+# Number of notifications fetched from the database at once
+NOTIFICATIONS_CHUNK_SIZE = 1000
+# Notifications of delivered messages are marked in batches of this size
+EMAIL_BATCH_SIZE = 50
+# Messages from one site are sent by a single worker to respect
+# rate limits of the email service
+EMAIL_DELIVERY_MAX_WORKERS = 4
+
+Notification = Union[AssignmentNotification, CourseNewsNotification]
+
 
 class EmailServiceError(Exception):
     pass
@@ -86,49 +100,116 @@ def report(f, s):
     f.write("{0} {1}".format(dt, s))
 
 
-def send_notification(notification, template, context, stdout,
-                      site_settings: SiteConfiguration):
-    """Sends email notification, then updates notification state in DB"""
-    # XXX: Note that email is mandatory now
-    if not notification.user.email:
-        report(stdout, f"User {notification.user} has no email")
-        notification.is_notified = True
-        notification.save()
-        return
+@dataclass
+class OutgoingEmail:
+    site_id: int
+    notification: Notification
+    message: EmailMultiAlternatives
+    # Computed in advance since workers must not hit the database
+    description: str
 
-    service_health_status = getattr(site_settings, 'service_health_status', None)
-    if service_health_status is None:
-        raise EmailServiceError(f'Unknown smtp health status for {site_settings}')
-    elif service_health_status == EmailServiceHealthCheck.FAIL:
-        msg = (f"skip {notification}. SMTP "
-               f"service {site_settings.default_from_email} is unavailable.")
-        report(stdout, msg)
-        return
 
-    connection = get_email_connection(site_settings)
+def build_notification_email(notification: Notification, template, context,
+                             site_settings: SiteConfiguration,
+                             context_builder: "NotificationContextBuilder") -> OutgoingEmail:
     from_email = site_settings.default_from_email
     subject = "[{}] {}".format(context['course_name'], template['subject'])
-    html_content = linebreaks(render_to_string(template['template_name'],
-                                               context))
+    html_content = linebreaks(context_builder.render(template['template_name'],
+                                                     context))
     text_content = strip_tags(html_content)
     msg = EmailMultiAlternatives(subject=subject,
                                  body=text_content,
                                  from_email=from_email,
-                                 to=[notification.user.email],
-                                 connection=connection)
+                                 to=[notification.user.email])
     msg.attach_alternative(html_content, "text/html")
-    report(stdout, f"sending {notification} ({template})")
+    return OutgoingEmail(site_id=site_settings.site_id,
+                         notification=notification,
+                         message=msg,
+                         description=f"{notification} ({template})")
+
+
+def send_site_emails(site_settings: SiteConfiguration,
+                     emails: List[OutgoingEmail],
+                     delivered: queue.Queue, stdout) -> None:
+    """
+    Sends emails one by one reusing one connection to the email service.
+    Puts each batch of delivered emails to the *delivered* queue and `None`
+    when all emails were processed. Emails sent before a failure are
+    reported too, otherwise they would be sent again on the next run.
+
+    The sending rate is limited by `settings.EMAIL_SEND_COOLDOWN`
+    seconds per message.
+    """
     try:
-        # FIXME: use .send_messages instead to reuse connection and Keep-Alive feature
-        msg.send()
-    except smtplib.SMTPException as e:
-        site_settings.service_health_status = EmailServiceHealthCheck.FAIL
-        logger.exception(e)
-        report(stdout, f"SMTP service {site_settings.default_from_email} is unhealthy")
+        service_health_status = getattr(site_settings, 'service_health_status', None)
+        if service_health_status is None:
+            raise EmailServiceError(f'Unknown smtp health status for {site_settings}')
+        elif service_health_status == EmailServiceHealthCheck.FAIL:
+            report(stdout, f"skip {len(emails)} notifications. SMTP "
+                           f"service {site_settings.default_from_email} is unavailable.")
+            return
+        connection = get_email_connection(site_settings)
+        try:
+            with connection:
+                for index in range(0, len(emails), EMAIL_BATCH_SIZE):
+                    batch = emails[index:index + EMAIL_BATCH_SIZE]
+                    started_at = time.monotonic()
+                    sent = []
+                    try:
+                        for email in batch:
+                            report(stdout, f"sending {email.description}")
+                            if connection.send_messages([email.message]):
+                                sent.append(email)
+                    finally:
+                        if sent:
+                            delivered.put(sent)
+                    elapsed = time.monotonic() - started_at
+                    cooldown = settings.EMAIL_SEND_COOLDOWN * len(batch) - elapsed
+                    if cooldown > 0:
+                        time.sleep(cooldown)
+        except smtplib.SMTPException as e:
+            site_settings.service_health_status = EmailServiceHealthCheck.FAIL
+            logger.exception(e)
+            report(stdout, f"SMTP service {site_settings.default_from_email} is unhealthy")
+    finally:
+        delivered.put(None)
+
+
+def mark_notified(notifications: List[Notification]) -> None:
+    """Updates notifications state with one query per notification model."""
+    by_model = bucketize(notifications, key=lambda n: n.__class__,
+                         value_transform=lambda n: n.pk)
+    for model, notification_ids in by_model.items():
+        (model.objects
+         .filter(pk__in=notification_ids)
+         .update(is_notified=True))
+
+
+def deliver_emails(outboxes: Dict[int, List[OutgoingEmail]],
+                   site_configurations: Dict[int, SiteConfiguration],
+                   stdout) -> None:
+    """
+    Sends emails grouped by site in parallel. Notification state is
+    updated in the current thread after each delivered batch.
+    """
+    if not outboxes:
         return
-    notification.is_notified = True
-    notification.save()
-    time.sleep(settings.EMAIL_SEND_COOLDOWN)
+    delivered = queue.Queue()
+    max_workers = min(len(outboxes), EMAIL_DELIVERY_MAX_WORKERS)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(send_site_emails, site_configurations[site_id],
+                                   emails, delivered, stdout)
+                   for site_id, emails in outboxes.items()]
+        in_progress = len(futures)
+        while in_progress:
+            batch = delivered.get()
+            if batch is None:
+                in_progress -= 1
+                continue
+            mark_notified([email.notification for email in batch])
+    for future in futures:
+        # Re-raise unexpected worker error
+        future.result()
 
 
 def get_assignment_notification_template(notification: AssignmentNotification):
@@ -166,41 +247,123 @@ def _get_abs_url_builder(domain_name):
     return partial(replace_hostname, new_hostname=domain_name)
 
 
+class NotificationContextBuilder:
+    """
+    Builds email context of the notifications sent during one command run.
+
+    Data shared by recipients (enrollments, domain names, compiled
+    templates, assignment and course news context) is computed once.
+    """
+    def __init__(self):
+        # (course_id, user_id) -> enrollment
+        self._enrollments: Dict[Tuple[int, int], Optional[Enrollment]] = {}
+        # branch_id -> url builder
+        self._url_builders: Dict[int, Callable[[str], str]] = {}
+        self._templates = {}
+        # (assignment_id, branch_id) -> context
+        self._assignment_contexts: Dict[Tuple[int, int], Dict] = {}
+        # (course_news_id, branch_id) -> context
+        self._course_news_contexts: Dict[Tuple[int, int], Dict] = {}
+
+    def prefetch_enrollments(self, participants: Iterable[Tuple[int, int]]) -> None:
+        """
+        Resolves enrollments for (course_id, user_id) pairs with one query.
+        """
+        participants = {p for p in participants if p not in self._enrollments}
+        if not participants:
+            return
+        course_ids = {course_id for course_id, _ in participants}
+        user_ids = {user_id for _, user_id in participants}
+        enrollments = (Enrollment.active
+                       .filter(course_id__in=course_ids, student_id__in=user_ids)
+                       .select_related('student_profile__branch')
+                       .order_by())
+        for participant in participants:
+            self._enrollments[participant] = None
+        for enrollment in enrollments:
+            self._enrollments[(enrollment.course_id, enrollment.student_id)] = enrollment
+
+    def resolve_participant_branch(self, course: Course, participant: User) -> Branch:
+        """
+        Returns the same value as `resolve_course_participant_branch` using
+        prefetched enrollments.
+        """
+        key = (course.pk, participant.pk)
+        if key not in self._enrollments:
+            self._enrollments[key] = participant.get_enrollment(course.pk)
+        enrollment = self._enrollments[key]
+        if enrollment:
+            return enrollment.student_profile.branch
+        return course.main_branch
+
+    def get_abs_url_builder(self, branch: Branch) -> Callable[[str], str]:
+        if branch.pk not in self._url_builders:
+            domain_name = get_lms_domain_name(branch)
+            self._url_builders[branch.pk] = _get_abs_url_builder(domain_name)
+        return self._url_builders[branch.pk]
+
+    def render(self, template_name: str, context: Dict) -> str:
+        if template_name not in self._templates:
+            self._templates[template_name] = get_template(template_name)
+        return self._templates[template_name].render(context)
+
+    def get_assignment_notification_context(
+            self, notification: AssignmentNotification,
+            participant_branch: Branch) -> Dict:
+        a_s = notification.student_assignment
+        assignment = a_s.assignment
+        tz_override = notification.user.time_zone
+        abs_url_builder = self.get_abs_url_builder(participant_branch)
+        key = (assignment.pk, participant_branch.pk)
+        if key not in self._assignment_contexts:
+            self._assignment_contexts[key] = {
+                # FIXME: rename
+                'assignment_link': abs_url_builder(assignment.get_teacher_url()),
+                'assignment_name': smart_str(assignment),
+                'assignment_text': smart_str(assignment.text),
+                'course_name': smart_str(assignment.course.meta_course)
+            }
+        context = {
+            **self._assignment_contexts[key],
+            'a_s_link_student': abs_url_builder(a_s.get_student_url()),
+            'a_s_link_teacher': abs_url_builder(a_s.get_teacher_url()),
+            'notification_created': notification.created_local(tz_override),
+            'student_name': smart_str(a_s.student),
+            'deadline_at': assignment.deadline_at_local(tz=tz_override),
+        }
+        return context
+
+    def get_course_news_notification_context(
+            self, notification: CourseNewsNotification,
+            participant_branch: Branch) -> Dict:
+        course_news = notification.course_offering_news
+        key = (course_news.pk, participant_branch.pk)
+        if key not in self._course_news_contexts:
+            abs_url_builder = self.get_abs_url_builder(participant_branch)
+            course = course_news.course
+            self._course_news_contexts[key] = {
+                'course_link': abs_url_builder(course.get_absolute_url()),
+                'course_name': smart_str(course.meta_course),
+                'course_news_name': course_news.title,
+                'course_news_text': course_news.text,
+            }
+        return self._course_news_contexts[key]
+
+
 def get_assignment_notification_context(
         notification: AssignmentNotification,
         participant_branch: Branch) -> Dict:
-    a_s = notification.student_assignment
-    tz_override = notification.user.time_zone
-    domain_name = get_lms_domain_name(participant_branch)
-    abs_url_builder = _get_abs_url_builder(domain_name)
-    context = {
-        'a_s_link_student': abs_url_builder(a_s.get_student_url()),
-        'a_s_link_teacher': abs_url_builder(a_s.get_teacher_url()),
-        # FIXME: rename
-        'assignment_link': abs_url_builder(a_s.assignment.get_teacher_url()),
-        'notification_created': notification.created_local(tz_override),
-        'assignment_name': smart_str(a_s.assignment),
-        'assignment_text': smart_str(a_s.assignment.text),
-        'student_name': smart_str(a_s.student),
-        'deadline_at': a_s.assignment.deadline_at_local(tz=tz_override),
-        'course_name': smart_str(a_s.assignment.course.meta_course)
-    }
-    return context
+    context_builder = NotificationContextBuilder()
+    return context_builder.get_assignment_notification_context(
+        notification, participant_branch)
 
 
 def get_course_news_notification_context(
         notification: CourseNewsNotification,
         participant_branch: Branch) -> Dict:
-    domain_name = get_lms_domain_name(participant_branch)
-    abs_url_builder = _get_abs_url_builder(domain_name)
-    course = notification.course_offering_news.course
-    context = {
-        'course_link': abs_url_builder(course.get_absolute_url()),
-        'course_name': smart_str(course.meta_course),
-        'course_news_name': notification.course_offering_news.title,
-        'course_news_text': notification.course_offering_news.text,
-    }
-    return context
+    context_builder = NotificationContextBuilder()
+    return context_builder.get_course_news_notification_context(
+        notification, participant_branch)
 
 
 def get_email_connection(site_settings: SiteConfiguration):
@@ -222,14 +385,25 @@ def get_email_connection(site_settings: SiteConfiguration):
     return connection
 
 
-def send_assignment_notifications(site_configurations: Dict[int, SiteConfiguration],
-                                  stdout) -> None:
+def _iter_notifications(queryset, chunk_size: int) -> Iterator[List[Notification]]:
+    """Yields notifications in chunks ordered by primary key."""
+    last_pk = 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
+
+
+def get_assignment_notifications() -> Iterator[List[AssignmentNotification]]:
     prefetch = [
         'user__groups',
         'student_assignment',
         'student_assignment__assignment',
         'student_assignment__assignment__course',
         'student_assignment__assignment__course__meta_course',
+        'student_assignment__assignment__course__main_branch',
         'student_assignment__student',
     ]
     notifications = (AssignmentNotification.objects
@@ -237,34 +411,78 @@ def send_assignment_notifications(site_configurations: Dict[int, SiteConfigurati
                              is_notified=False)
                      .select_related("user", "user__branch")
                      .prefetch_related(*prefetch))
-    for notification in notifications:
-        template = get_assignment_notification_template(notification)
-        course = notification.student_assignment.assignment.course
-        branch = resolve_course_participant_branch(course, notification.user)
-        context = get_assignment_notification_context(notification, branch)
-        site_settings: SiteConfiguration = site_configurations[branch.site_id]
-        send_notification(notification, template, context, stdout, site_settings)
+    return _iter_notifications(notifications, NOTIFICATIONS_CHUNK_SIZE)
 
 
-def send_course_news_notifications(site_configurations: Dict[int, SiteConfiguration],
-                                   stdout) -> None:
+def get_course_news_notifications() -> Iterator[List[CourseNewsNotification]]:
     prefetch = [
         'user__groups',
         'course_offering_news__course',
         'course_offering_news__course__meta_course',
         'course_offering_news__course__semester',
+        'course_offering_news__course__main_branch',
     ]
     notifications = (CourseNewsNotification.objects
                      .filter(is_unread=True, is_notified=False)
                      .select_related("user", "course_offering_news")
                      .prefetch_related(*prefetch))
+    return _iter_notifications(notifications, NOTIFICATIONS_CHUNK_SIZE)
+
+
+def build_assignment_notification_email(
+        notification: AssignmentNotification,
+        context_builder: NotificationContextBuilder,
+        site_configurations: Dict[int, SiteConfiguration]) -> OutgoingEmail:
+    template = get_assignment_notification_template(notification)
+    course = notification.student_assignment.assignment.course
+    branch = context_builder.resolve_participant_branch(course, notification.user)
+    context = context_builder.get_assignment_notification_context(notification, branch)
+    site_settings: SiteConfiguration = site_configurations[branch.site_id]
+    return build_notification_email(notification, template, context,
+                                    site_settings, context_builder)
+
+
+def build_course_news_notification_email(
+        notification: CourseNewsNotification,
+        context_builder: NotificationContextBuilder,
+        site_configurations: Dict[int, SiteConfiguration]) -> OutgoingEmail:
+    template = EMAIL_TEMPLATES['new_course_news']
+    course = notification.course_offering_news.course
+    branch = context_builder.resolve_participant_branch(course, notification.user)
+    context = context_builder.get_course_news_notification_context(notification, branch)
+    site_settings: SiteConfiguration = site_configurations[branch.site_id]
+    return build_notification_email(notification, template, context,
+                                    site_settings, context_builder)
+
+
+def get_assignment_notification_course_id(notification: AssignmentNotification) -> int:
+    return notification.student_assignment.assignment.course_id
+
+
+def get_course_news_notification_course_id(notification: CourseNewsNotification) -> int:
+    return notification.course_offering_news.course_id
+
+
+def send_notifications(notifications: List[Notification], *,
+                       get_course_id: Callable[[Notification], int],
+                       build_email,
+                       context_builder: NotificationContextBuilder,
+                       site_configurations: Dict[int, SiteConfiguration],
+                       stdout) -> None:
+    context_builder.prefetch_enrollments((get_course_id(n), n.user_id)
+                                         for n in notifications)
+    outboxes: Dict[int, List[OutgoingEmail]] = {}
+    without_email = []
     for notification in notifications:
-        template = EMAIL_TEMPLATES['new_course_news']
-        course = notification.course_offering_news.course
-        branch = resolve_course_participant_branch(course, notification.user)
-        context = get_course_news_notification_context(notification, branch)
-        site_settings: SiteConfiguration = site_configurations[branch.site_id]
-        send_notification(notification, template, context, stdout, site_settings)
+        # XXX: Note that email is mandatory now
+        if not notification.user.email:
+            report(stdout, f"User {notification.user} has no email")
+            without_email.append(notification)
+            continue
+        email = build_email(notification, context_builder, site_configurations)
+        outboxes.setdefault(email.site_id, []).append(email)
+    mark_notified(without_email)
+    deliver_emails(outboxes, site_configurations, stdout)
 
 
 class EmailServiceHealthCheck:
@@ -298,13 +516,26 @@ class Command(BaseCommand):
         for s in site_settings.values():
             s.service_health_status = EmailServiceHealthCheck.HEALTH
 
-        send_course_news_notifications(site_settings, self.stdout)
-
-        if all(s.service_health_status == EmailServiceHealthCheck.FAIL for s
-               in site_settings.values()):
-            report(self.stdout, 'All services are unhealthy. Try again later.')
-            return
-
-        send_assignment_notifications(site_settings, self.stdout)
+        context_builder = NotificationContextBuilder()
+        chunks = [
+            (get_course_news_notifications(),
+             get_course_news_notification_course_id,
+             build_course_news_notification_email),
+            (get_assignment_notifications(),
+             get_assignment_notification_course_id,
+             build_assignment_notification_email),
+        ]
+        for notifications, get_course_id, build_email in chunks:
+            for chunk in notifications:
+                if all(s.service_health_status == EmailServiceHealthCheck.FAIL
+                       for s in site_settings.values()):
+                    report(self.stdout, 'All services are unhealthy. Try again later.')
+                    return
+                send_notifications(chunk,
+                                   get_course_id=get_course_id,
+                                   build_email=build_email,
+                                   context_builder=context_builder,
+                                   site_configurations=site_settings,
+                                   stdout=self.stdout)
 
         translation.deactivate()
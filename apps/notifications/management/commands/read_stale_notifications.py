@@ -4,6 +4,7 @@ from django.core.management.base import BaseCommand
 
 from courses.models import Semester
 from learning.models import AssignmentNotification, CourseNewsNotification
+from notifications.cache import invalidate_unread_notifications_cache
 
 
 class Command(BaseCommand):
@@ -11,13 +12,20 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         current_term = Semester.get_current()
-        updated = (AssignmentNotification.objects
-                   .filter(created__lt=current_term.starts_at, is_unread=True)
-                   .update(is_unread=False))
+        notifications = (AssignmentNotification.objects
+                         .filter(created__lt=current_term.starts_at,
+                                 is_unread=True))
+        user_ids = set(notifications.values_list('user_id', flat=True)
+                       .distinct())
+        updated = notifications.update(is_unread=False)
         msg = f"{updated} AssignmentNotifications are marked as read"
         self.stdout.write(msg)
-        updated = (CourseNewsNotification.objects
-                   .filter(created__lt=current_term.starts_at, is_unread=True)
-                   .update(is_unread=False))
+        notifications = (CourseNewsNotification.objects
+                         .filter(created__lt=current_term.starts_at,
+                                 is_unread=True))
+        user_ids.update(notifications.values_list('user_id', flat=True)
+                        .distinct())
+        updated = notifications.update(is_unread=False)
         msg = f"{updated} CourseNewsNotifications are marked as read"
         self.stdout.write(msg)
+        invalidate_unread_notifications_cache(user_ids)
@@ -1,3 +1,4 @@
+import smtplib
 from io import StringIO as OutputIO
 from unittest.mock import MagicMock
 
@@ -5,6 +6,7 @@ import pytest
 import pytz
 
 from django.core import mail, management
+from django.core.mail.backends import locmem
 
 from core.tests.factories import BranchFactory
 from courses.constants import SemesterTypes
@@ -15,7 +17,10 @@ from learning.tests.factories import (
     AssignmentNotificationFactory, CourseFactory, CourseNewsNotificationFactory,
     EnrollmentFactory
 )
-from notifications.management.commands.notify import resolve_course_participant_branch
+from notifications.management.commands.notify import (
+    NotificationContextBuilder, resolve_course_participant_branch
+)
+from users.models import User
 from users.tests.factories import CuratorFactory, StudentFactory, TeacherFactory
 
 
@@ -57,6 +62,44 @@ def test_command_notify(settings, mocker):
     assert "sending notification for" in out.getvalue()
 
 
+@pytest.mark.django_db
+def test_command_notify_sends_messages_in_batches(settings, mocker):
+    mocker.patch('core.locks.get_shared_connection', MagicMock())
+    mocker.patch('notifications.management.commands.notify.EMAIL_BATCH_SIZE', 2)
+    send_messages = mocker.spy(locmem.EmailBackend, 'send_messages')
+    settings.DEFAULT_URL_SCHEME = 'https'
+    mail.outbox = []
+    notifications = AssignmentNotificationFactory.create_batch(3, is_about_passed=True)
+    student_without_email = StudentFactory()
+    User.objects.filter(pk=student_without_email.pk).update(email='')
+    no_email = AssignmentNotificationFactory(is_about_passed=True,
+                                             user=student_without_email)
+    out = OutputIO()
+    management.call_command("notify", stdout=out)
+    assert len(mail.outbox) == 3
+    assert send_messages.call_count == 3
+    assert not (AssignmentNotification.objects
+                .filter(pk__in=[n.pk for n in [*notifications, no_email]],
+                        is_notified=False)
+                .exists())
+
+
+@pytest.mark.django_db
+def test_command_notify_marks_sent_messages_on_failure(settings, mocker):
+    mocker.patch('core.locks.get_shared_connection', MagicMock())
+    mocker.patch.object(locmem.EmailBackend, 'send_messages', autospec=True,
+                        side_effect=[1, smtplib.SMTPException("Timeout")])
+    settings.DEFAULT_URL_SCHEME = 'https'
+    notifications = AssignmentNotificationFactory.create_batch(3, is_about_passed=True)
+    out = OutputIO()
+    management.call_command("notify", stdout=out)
+    # The first message was delivered and must not be sent again
+    notified = (AssignmentNotification.objects
+                .filter(pk__in=[n.pk for n in notifications], is_notified=True))
+    assert notified.count() == 1
+    assert "is unhealthy" in out.getvalue()
+
+
 @pytest.mark.django_db
 def test_command_notification_cleanup(client, settings):
     current_term = SemesterFactory.create_current()
@@ -85,3 +128,20 @@ def test_resolve_course_participant_branch():
     assert resolve_course_participant_branch(course, other_teacher) == course.main_branch
     assert resolve_course_participant_branch(course, curator) == course.main_branch
     assert resolve_course_participant_branch(course, student) == enrollment.student_profile.branch
+
+
+@pytest.mark.django_db
+def test_notification_context_builder_resolve_participant_branch(django_assert_num_queries):
+    curator = CuratorFactory()
+    teacher = TeacherFactory(branch=BranchFactory())
+    course = CourseFactory(main_branch=BranchFactory(), teachers=[teacher])
+    enrollment1, enrollment2 = EnrollmentFactory.create_batch(2, course=course)
+    participants = [teacher, curator, enrollment1.student, enrollment2.student]
+    context_builder = NotificationContextBuilder()
+    with django_assert_num_queries(1):
+        context_builder.prefetch_enrollments((course.pk, p.pk) for p in participants)
+    with django_assert_num_queries(0):
+        branches = [context_builder.resolve_participant_branch(course, p)
+                    for p in participants]
+    assert branches == [resolve_course_participant_branch(course, p)
+                        for p in participants]
@@ -0,0 +1,39 @@
+from django.core.management import BaseCommand, CommandError
+
+from core.models import Branch
+from staff.services import calculate_future_graduate_stats
+
+
+class Command(BaseCommand):
+    help = """
+    Shows stats about regular students of the branch with
+    `will_graduate` status.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('branch_id', type=int, help='Branch ID')
+
+    def handle(self, *args, **options):
+        branch_id = options['branch_id']
+        if not Branch.objects.filter(pk=branch_id).exists():
+            raise CommandError(f"Branch with id={branch_id} not found")
+        stats = calculate_future_graduate_stats(branch_id)
+        self.stdout.write(f"Students: {len(stats.student_profiles)}")
+        self.stdout.write(f"Teachers: {stats.unique_teachers_count}")
+        self.stdout.write(f"Total hours: {stats.total_hours}")
+        self.stdout.write(f"Passed courses: {stats.total_passed_courses} "
+                          f"(excellent: {stats.excellent_total}, "
+                          f"good: {stats.good_total})")
+        self.stdout.write(f"Unique courses: {len(stats.unique_courses)}")
+        self.stdout.write(f"Unique projects: {len(stats.unique_projects)}")
+        leaderboards = [
+            ("Most passed courses", stats.most_courses_students, "passed_courses"),
+            ("Most passed courses in a term", stats.most_courses_in_term_students, "max_courses_in_term"),
+            ("Most passed club courses", stats.most_open_courses_students, "pass_open_courses"),
+            ("Most failed courses", stats.most_failed_courses, "failed_courses"),
+            ("Less failed courses", stats.less_failed_courses, "failed_courses"),
+        ]
+        for title, students, attr in leaderboards:
+            self.stdout.write(f"{title}:")
+            for student in sorted(students, key=lambda s: s.get_full_name()):
+                self.stdout.write(f"  {student.get_full_name()} ({getattr(student, attr)})")
@@ -0,0 +1,312 @@
+import dataclasses
+import datetime
+import io
+import tempfile
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Count, QuerySet
+
+from core.timezone import get_now_utc
+from courses.constants import SemesterTypes
+from courses.models import CourseClass, Semester
+from courses.utils import get_term_index
+from learning.models import GraduateProfile
+from learning.reports import (
+    OfficialDiplomasReport,
+    ProgressReport,
+    ProgressReportForSemester,
+    ProgressReportFull,
+    write_report_csv,
+    write_report_xlsx,
+)
+from learning.settings import AcademicDegreeLevels, GradeTypes, StudentStatuses
+from projects.constants import ProjectGradeTypes
+from tasks.models import Task
+from users.models import StudentProfile, StudentTypes, User
+from users.services import get_student_progress
+
+GENERATE_PROGRESS_REPORT_TASK_NAME = "staff.tasks.generate_progress_report"
+# Finished report with the same parameters is reused during this period
+PROGRESS_REPORT_MAX_AGE = datetime.timedelta(minutes=30)
+# Full report makes two passes over all students, it takes longer than
+# the default `Task.MAX_RUN_TIME`
+PROGRESS_REPORT_JOB_TIMEOUT = 1800  # in seconds
+
+
+class ProgressReportTypes:
+    FULL = "full"
+    FOR_SEMESTER = "semester"
+    OFFICIAL_DIPLOMAS = "official_diplomas"
+
+    values = (FULL, FOR_SEMESTER, OFFICIAL_DIPLOMAS)
+
+
+def build_progress_report(
+    report_type: str, params: Dict[str, Any]
+) -> Tuple[ProgressReport, QuerySet, str]:
+    """
+    Returns report generator, queryset of student profiles and
+    the file name (without extension) of the report.
+    """
+    if report_type == ProgressReportTypes.FULL:
+        report = ProgressReportFull(grade_getter="grade_honest")
+        today = datetime.datetime.now().strftime("%d.%m.%Y")
+        return report, report.get_queryset(), f"sheet_{today}"
+    elif report_type == ProgressReportTypes.FOR_SEMESTER:
+        semester = Semester.objects.get(pk=params["semester_id"])
+        report = ProgressReportForSemester(semester)
+        file_name = f"sheet_{semester.year}_{semester.type}"
+        return report, report.get_queryset(), file_name
+    elif report_type == ProgressReportTypes.OFFICIAL_DIPLOMAS:
+        diploma_issued_on = datetime.date.fromisoformat(params["diploma_issued_on"])
+        report = OfficialDiplomasReport(diploma_issued_on)
+        queryset = report.get_queryset().filter(branch__site_id=params["site_id"])
+        date_issued = diploma_issued_on.isoformat().replace("-", "_")
+        return report, queryset, f"official_diplomas_{date_issued}"
+    raise ValueError(f"Unknown report type {report_type}")
+
+
+def create_progress_report_task(
+    *,
+    report_type: str,
+    output_format: str,
+    author: User,
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[Task, bool]:
+    """
+    Returns a task for generating report in a background and a flag that
+    tells whether the task must be enqueued.
+
+    Reuses the task with the same parameters if it's still in progress or
+    its report has been generated recently.
+    """
+    if report_type not in ProgressReportTypes.values:
+        raise ValueError(f"Unknown report type {report_type}")
+    if output_format not in ("csv", "xlsx"):
+        raise ValueError("Supported output formats: csv, xlsx")
+    task = Task.build(
+        task_name=GENERATE_PROGRESS_REPORT_TASK_NAME,
+        kwargs={
+            "report_type": report_type,
+            "output_format": output_format,
+            "site_id": settings.SITE_ID,
+            **(params or {}),
+        },
+        creator=author,
+    )
+    now = get_now_utc()
+    same_tasks = Task.objects.filter(
+        task_name=task.task_name, task_hash=task.task_hash
+    ).order_by("-id")
+    recent_artifact = (
+        same_tasks.filter(
+            processed_at__gte=now - PROGRESS_REPORT_MAX_AGE, error=""
+        )
+        .exclude(output_file="")
+        .first()
+    )
+    if recent_artifact is not None:
+        return recent_artifact, False
+    same_task_in_a_queue = same_tasks.filter(processed_at__isnull=True).first()
+    if same_task_in_a_queue is None:
+        task.save()
+        return task, True
+    # The job could be lost (e.g. redis was flushed or the worker was killed)
+    expires_at = now - datetime.timedelta(seconds=PROGRESS_REPORT_JOB_TIMEOUT)
+    last_activity_at = same_task_in_a_queue.locked_at or same_task_in_a_queue.created
+    return same_task_in_a_queue, last_activity_at < expires_at
+
+
+def generate_progress_report_file(task: Task) -> None:
+    """
+    Generates report with parameters stored in the task and saves
+    the result in a private storage.
+    """
+    task_params = task.task_params
+    output_format = task_params["output_format"]
+    report, queryset, file_name = build_progress_report(
+        task_params["report_type"], task_params
+    )
+    rows = report.iter_rows(queryset)
+    with tempfile.TemporaryFile() as output:
+        if output_format == "csv":
+            text_output = io.TextIOWrapper(output, encoding="utf-8", newline="")
+            write_report_csv(rows, text_output)
+            text_output.flush()
+            text_output.detach()
+        elif output_format == "xlsx":
+            write_report_xlsx(rows, output)
+        else:
+            raise ValueError("Supported output formats: csv, xlsx")
+        output.seek(0)
+        task.output_file.save(
+            f"{file_name}.{output_format}", File(output), save=False
+        )
+
+
+class Leaderboard:
+    """Collects all items with the highest (or the lowest) value."""
+
+    def __init__(self, *, lowest: bool = False):
+        self.lowest = lowest
+        self.value = None
+        self.items = set()
+
+    def add(self, item, value) -> None:
+        if self.value is None or (value < self.value if self.lowest else value > self.value):
+            self.value = value
+            self.items = {item}
+        elif value == self.value:
+            self.items.add(item)
+
+
+@dataclasses.dataclass
+class FutureGraduateStats:
+    student_profiles: QuerySet
+    less_failed_courses: Set[User] = dataclasses.field(default_factory=set)
+    most_failed_courses: Set[User] = dataclasses.field(default_factory=set)
+    all_three_practicies_are_internal: Set[User] = dataclasses.field(default_factory=set)
+    passed_practicies_in_first_two_years: Set[User] = dataclasses.field(default_factory=set)
+    passed_internal_practicies_in_first_two_years: Set[User] = dataclasses.field(default_factory=set)
+    finished_two_or_more_programs: Set[User] = dataclasses.field(default_factory=set)
+    by_enrollment_year: Dict[int, Set[StudentProfile]] = dataclasses.field(default_factory=dict)
+    enrolled_on_first_course: Set[User] = dataclasses.field(default_factory=set)
+    most_courses_students: Set[User] = dataclasses.field(default_factory=set)
+    most_courses_in_term_students: Set[User] = dataclasses.field(default_factory=set)
+    most_open_courses_students: Set[User] = dataclasses.field(default_factory=set)
+    unique_teachers_count: int = 0
+    total_hours: int = 0
+    unique_courses: Set[Any] = dataclasses.field(default_factory=set)
+    good_total: int = 0
+    excellent_total: int = 0
+    total_passed_courses: int = 0
+    unique_projects: Set[Any] = dataclasses.field(default_factory=set)
+
+    def to_context(self) -> Dict[str, Any]:
+        return {f.name: getattr(self, f.name) for f in dataclasses.fields(self)}
+
+
+def calculate_future_graduate_stats(branch_id: int) -> FutureGraduateStats:
+    """
+    Collects stats about students who will graduate soon. All the data is
+    fetched with a constant number of queries regardless of the number of
+    students.
+
+    Passed/failed courses and max courses in a term are stored as
+    attributes of the student instance.
+    """
+    bad_grades = GradeTypes.unsatisfactory_grades
+    bad_project_grades = [ProjectGradeTypes.UNSATISFACTORY,
+                          ProjectGradeTypes.NOT_GRADED]
+    student_profiles = (StudentProfile.objects
+                        .filter(type=StudentTypes.REGULAR,
+                                branch_id=branch_id,
+                                status=StudentStatuses.WILL_GRADUATE)
+                        .select_related("user")
+                        .order_by("user__last_name", "user__first_name", "user_id"))
+    progress = get_student_progress(student_profiles)
+    course_ids = {e.course_id for p in progress.values()
+                  for e in p.get("enrollments", [])}
+    classes_total = dict(CourseClass.objects
+                         .filter(course_id__in=course_ids)
+                         .values("course_id")
+                         .annotate(total=Count("pk"))
+                         .values_list("course_id", "total")
+                         .order_by())
+    graduate_profiles = {g.student_profile_id: g for g in
+                         (GraduateProfile.active
+                          .filter(student_profile__in=student_profiles)
+                          .prefetch_related("academic_disciplines"))}
+
+    stats = FutureGraduateStats(student_profiles=student_profiles)
+    by_year_of_admission = defaultdict(set)
+    unique_teachers = set()
+    total_hours = 0
+    most_courses = Leaderboard()
+    most_courses_in_term = Leaderboard()
+    most_open_courses = Leaderboard()
+    most_failed_courses = Leaderboard()
+    less_failed_courses = Leaderboard(lowest=True)
+    for student_profile in student_profiles:
+        s = student_profile.user
+        enrollments = progress[s.id].get("enrollments", [])
+        projects = progress[s.id].get("projects", [])
+        shad = progress[s.id].get("shad", [])
+        graduate_profile = graduate_profiles.get(student_profile.pk)
+        if graduate_profile and len(graduate_profile.academic_disciplines.all()) >= 2:
+            stats.finished_two_or_more_programs.add(s)
+        by_year_of_admission[student_profile.year_of_admission].add(student_profile)
+        degree_year = AcademicDegreeLevels.BACHELOR_SPECIALITY_1
+        if student_profile.level_of_education_on_admission == degree_year:
+            stats.enrolled_on_first_course.add(s)
+
+        s.passed_courses = sum(1 for e in enrollments if e.grade not in bad_grades)
+        s.passed_courses += sum(1 for c in shad if c.grade not in bad_grades)
+        most_courses.add(s, s.passed_courses)
+        s.pass_open_courses = sum(e.course.is_club_course for e in enrollments
+                                  if e.grade not in bad_grades)
+        most_open_courses.add(s, s.pass_open_courses)
+
+        internal_projects_cnt = 0
+        projects_in_first_two_years_of_learning = 0
+        internal_projects_in_first_two_years_of_learning = 0
+        enrollment_term_index = get_term_index(student_profile.year_of_admission,
+                                               SemesterTypes.AUTUMN)
+        for ps in projects:
+            if ps.final_grade in bad_project_grades or ps.project.is_canceled:
+                continue
+            stats.unique_projects.add(ps.project)
+            internal_projects_cnt += int(not ps.project.is_external)
+            if 0 <= ps.project.semester.index - enrollment_term_index <= 4:
+                projects_in_first_two_years_of_learning += 1
+                if not ps.project.is_external:
+                    internal_projects_in_first_two_years_of_learning += 1
+        if internal_projects_cnt == 3:
+            stats.all_three_practicies_are_internal.add(s)
+        if projects_in_first_two_years_of_learning >= 3:
+            stats.passed_practicies_in_first_two_years.add(s)
+        if internal_projects_in_first_two_years_of_learning >= 3:
+            stats.passed_internal_practicies_in_first_two_years.add(s)
+
+        courses_by_term = defaultdict(int)
+        failed_courses = 0
+        for c in shad:
+            if c.grade in bad_grades:
+                failed_courses += 1
+                continue
+            courses_by_term[c.semester_id] += 1
+        for enrollment in enrollments:
+            # Skip summer courses
+            if enrollment.course.semester.type == SemesterTypes.SUMMER:
+                continue
+            if enrollment.grade in bad_grades:
+                failed_courses += 1
+                continue
+            courses_by_term[enrollment.course.semester_id] += 1
+            stats.total_passed_courses += 1
+            if enrollment.grade in GradeTypes.excellent_grades:
+                stats.excellent_total += 1
+            elif enrollment.grade in GradeTypes.good_grades:
+                stats.good_total += 1
+            stats.unique_courses.add(enrollment.course.meta_course)
+            total_hours += classes_total.get(enrollment.course_id, 0) * 1.5
+            for course_teacher in enrollment.course.course_teachers.all():
+                unique_teachers.add(course_teacher.teacher_id)
+        s.failed_courses = failed_courses
+        most_failed_courses.add(s, s.failed_courses)
+        less_failed_courses.add(s, s.failed_courses)
+        s.max_courses_in_term = max(courses_by_term.values(), default=0)
+        most_courses_in_term.add(s, s.max_courses_in_term)
+
+    stats.by_enrollment_year = dict(by_year_of_admission)
+    stats.unique_teachers_count = len(unique_teachers)
+    stats.total_hours = int(total_hours)
+    stats.most_courses_students = most_courses.items
+    stats.most_courses_in_term_students = most_courses_in_term.items
+    stats.most_open_courses_students = most_open_courses.items
+    stats.most_failed_courses = most_failed_courses.items
+    stats.less_failed_courses = less_failed_courses.items
+    return stats
@@ -0,0 +1,36 @@
+import logging
+
+from django_rq import job
+
+from django.utils import timezone
+
+from staff.services import (
+    PROGRESS_REPORT_JOB_TIMEOUT, generate_progress_report_file
+)
+from tasks.models import Task
+
+logger = logging.getLogger(__name__)
+
+
+@job("default", timeout=PROGRESS_REPORT_JOB_TIMEOUT)
+def generate_progress_report(*, task_id) -> None:
+    try:
+        task = (Task.objects
+                .unlocked(timezone.now(), PROGRESS_REPORT_JOB_TIMEOUT)
+                .get(pk=task_id))
+    except Task.DoesNotExist:
+        logger.info(f"Task with id = {task_id} not found or locked.")
+        return None
+    if task.is_completed:
+        return None
+    if task.lock(locked_by="rqworker",
+                 max_run_time=PROGRESS_REPORT_JOB_TIMEOUT) is None:
+        return None
+    try:
+        generate_progress_report_file(task)
+    except Exception as e:
+        logger.exception(f"Failed to generate report for task {task_id}")
+        task.error = str(e) or e.__class__.__name__
+        task.complete()
+        raise
+    task.complete()
@@ -1,19 +1,26 @@
-from datetime import date
+from datetime import date, timedelta
 
 import pytest
 from bs4 import BeautifulSoup
 
+from django.utils import timezone
 from django.utils.encoding import smart_bytes
 
 from core.tests.factories import BranchFactory
 from core.tests.settings import ANOTHER_DOMAIN
 from core.urls import reverse
-from courses.tests.factories import CourseFactory, SemesterFactory
+from courses.constants import SemesterTypes
+from courses.tests.factories import CourseClassFactory, CourseFactory, SemesterFactory
 from learning.settings import GradeTypes, StudentStatuses
 from learning.tests.factories import EnrollmentFactory, GraduateProfileFactory
 from projects.constants import ProjectGradeTypes
 from projects.tests.factories import ProjectFactory
-from users.tests.factories import CuratorFactory, StudentProfileFactory
+from staff.services import (
+    ProgressReportTypes, calculate_future_graduate_stats, create_progress_report_task
+)
+from staff.tasks import generate_progress_report
+from tasks.models import Task
+from users.tests.factories import CuratorFactory, StudentProfileFactory, TeacherFactory
 
 
 @pytest.mark.django_db
@@ -146,16 +153,18 @@ def test_official_diplomas_views_should_be_site_aware(client, settings):
     )
     assert response.status_code == 404
 
-    response = client.get(
-        reverse(
-            "staff:exports_official_diplomas_csv",
-            kwargs={
-                "year": diploma_issued_on.year,
-                "month": diploma_issued_on.month,
-                "day": diploma_issued_on.day,
-            },
-        )
+    url = reverse(
+        "staff:exports_official_diplomas_csv",
+        kwargs={
+            "year": diploma_issued_on.year,
+            "month": diploma_issued_on.month,
+            "day": diploma_issued_on.day,
+        },
     )
+    response = client.get(url)
+    assert response.status_code == 404
+    # Background report generation
+    response = client.post(url)
     assert response.status_code == 404
 
 
@@ -234,3 +243,75 @@ def test_official_diplomas_tex_should_not_contain_club_courses(client, settings)
 
     assert smart_bytes(course1.name) in response.content
     assert smart_bytes(course_club.name) not in response.content
+
+
+@pytest.mark.django_db
+def test_progress_report_task_reuses_recent_artifact():
+    curator = CuratorFactory()
+    StudentProfileFactory()
+    term = SemesterFactory.create_current()
+    task_kwargs = {
+        "report_type": ProgressReportTypes.FOR_SEMESTER,
+        "output_format": "csv",
+        "author": curator,
+        "params": {"semester_id": term.pk},
+    }
+    task, enqueue = create_progress_report_task(**task_kwargs)
+    assert enqueue
+    # Task with the same parameters is waiting in a queue
+    same_task, enqueue = create_progress_report_task(**task_kwargs)
+    assert same_task.pk == task.pk
+    assert not enqueue
+    generate_progress_report(task_id=task.pk)
+    task.refresh_from_db()
+    assert task.is_completed
+    assert not task.is_failed
+    assert task.output_file.name.endswith(".csv")
+    same_task, enqueue = create_progress_report_task(**task_kwargs)
+    assert same_task.pk == task.pk
+    assert not enqueue
+    task_kwargs["output_format"] = "xlsx"
+    new_task, enqueue = create_progress_report_task(**task_kwargs)
+    assert new_task.pk != task.pk
+    assert enqueue
+    # Long running job is not considered lost after the default task timeout
+    locked_at = timezone.now() - timedelta(seconds=Task.MAX_RUN_TIME + 60)
+    Task.objects.filter(pk=new_task.pk).update(locked_by="rqworker",
+                                               locked_at=locked_at)
+    same_task, enqueue = create_progress_report_task(**task_kwargs)
+    assert same_task.pk == new_task.pk
+    assert not enqueue
+    generate_progress_report(task_id=new_task.pk)
+    new_task.refresh_from_db()
+    assert not new_task.is_completed
+
+
+@pytest.mark.django_db
+def test_calculate_future_graduate_stats():
+    branch = BranchFactory()
+    student_profile1, student_profile2 = StudentProfileFactory.create_batch(
+        2, branch=branch, status=StudentStatuses.WILL_GRADUATE
+    )
+    student1, student2 = student_profile1.user, student_profile2.user
+    term = SemesterFactory(year=2020, type=SemesterTypes.AUTUMN)
+    teacher = TeacherFactory()
+    course1, course2, course3 = CourseFactory.create_batch(
+        3, semester=term, teachers=[teacher]
+    )
+    CourseClassFactory.create_batch(2, course=course1)
+    EnrollmentFactory(course=course1, student=student1, grade=GradeTypes.EXCELLENT)
+    EnrollmentFactory(course=course2, student=student1, grade=GradeTypes.GOOD)
+    EnrollmentFactory(course=course1, student=student2, grade=GradeTypes.GOOD)
+    EnrollmentFactory(
+        course=course3, student=student2, grade=GradeTypes.UNSATISFACTORY
+    )
+    stats = calculate_future_graduate_stats(branch.pk)
+    assert stats.most_courses_students == {student1}
+    assert stats.most_courses_in_term_students == {student1}
+    assert stats.most_failed_courses == {student2}
+    assert stats.less_failed_courses == {student1}
+    assert stats.total_passed_courses == 3
+    assert stats.excellent_total == 1
+    assert stats.good_total == 2
+    assert stats.unique_teachers_count == 1
+    assert stats.total_hours == 6
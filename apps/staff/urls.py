@@ -14,7 +14,8 @@ from staff.views import (
     FutureGraduateDiplomasTeXView, FutureGraduateStatsView, GradeBookListView,
     HintListView, InterviewerFacesView, InvitationStudentsProgressReportView,
     OfficialDiplomasCSVView, OfficialDiplomasListView, OfficialDiplomasTeXView,
-    ProgressReportForSemesterView, ProgressReportFullView, StudentFacesView,
+    ProgressReportForSemesterView, ProgressReportFullView,
+    ProgressReportTaskDownloadView, ProgressReportTaskView, StudentFacesView,
     StudentSearchCSVView, StudentSearchView, SurveySubmissionsReportView,
     SurveySubmissionsStatsView, WillGraduateStatsReportView, autograde_projects,
     create_alumni_profiles
@@ -83,6 +84,8 @@ urlpatterns = [
     path('reports/students-progress/', include([
         re_path(r'^(?P<output_format>csv|xlsx)/(?P<on_duplicate>max|last)/$', ProgressReportFullView.as_view(), name='students_progress_report'),
         re_path(r'^terms/(?P<term_year>\d+)/(?P<term_type>\w+)/(?P<output_format>csv|xlsx)/$', ProgressReportForSemesterView.as_view(), name='students_progress_report_for_term'),
+        path('tasks/<int:task_id>/', ProgressReportTaskView.as_view(), name='progress_report_task'),
+        path('tasks/<int:task_id>/download/', ProgressReportTaskDownloadView.as_view(), name='progress_report_task_download'),
     ])),
     re_path(r'^reports/official-diplomas/(?P<year>\d{4})/(?P<month>\d{2})/(?P<day>\d{2})/', include([
         path('list/', OfficialDiplomasListView.as_view(), name='exports_official_diplomas_list'),
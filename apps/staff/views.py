@@ -1,5 +1,5 @@
 import datetime
-from collections import defaultdict
+from typing import Optional
 
 from django_filters import FilterSet
 from django_filters.views import BaseFilterView
@@ -27,9 +27,10 @@ from core.http import HttpRequest
 from core.models import Branch
 from core.urls import reverse
 from core.utils import bucketize
+from files.views import ProtectedFileDownloadView
 from courses.constants import SemesterTypes
 from courses.models import Course, Semester
-from courses.utils import get_current_term_pair, get_term_index
+from courses.utils import get_current_term_pair
 from learning.gradebook.views import GradeBookListBaseView
 from learning.models import Enrollment, GraduateProfile, Invitation
 from learning.reports import (
@@ -40,24 +41,28 @@ from learning.reports import (
     ProgressReportFull,
     WillGraduateStatsReport,
     dataframe_to_response,
+    report_to_streaming_response,
 )
-from learning.settings import AcademicDegreeLevels, GradeTypes, StudentStatuses
-from projects.constants import ProjectGradeTypes
+from learning.settings import StudentStatuses
 from staff.filters import EnrollmentInvitationFilter, StudentProfileFilter
 from staff.forms import GraduationForm
 from staff.models import Hint
+from staff.services import (
+    GENERATE_PROGRESS_REPORT_TASK_NAME,
+    ProgressReportTypes,
+    calculate_future_graduate_stats,
+    create_progress_report_task,
+)
+from staff.tasks import generate_progress_report
 from staff.tex import generate_tex_student_profile_for_diplomas
 from study_programs.models import AcademicDiscipline
 from surveys.models import CourseSurvey
 from surveys.reports import SurveySubmissionsReport, SurveySubmissionsStats
+from tasks.models import Task
 from users.filters import StudentFilter
 from users.mixins import CuratorOnlyMixin
 from users.models import PartnerTag, StudentProfile, StudentTypes, User
-from users.services import (
-    create_graduate_profiles,
-    get_graduate_profile,
-    get_student_progress,
-)
+from users.services import create_graduate_profiles
 
 
 class StudentSearchCSVView(CuratorOnlyMixin, BaseFilterView):
@@ -84,10 +89,11 @@ class StudentSearchCSVView(CuratorOnlyMixin, BaseFilterView):
             queryset = self.filterset.queryset.none()
         report = ProgressReportFull(grade_getter="grade_honest")
         custom_qs = report.get_queryset(base_queryset=queryset)
-        df = report.generate(queryset=custom_qs)
         today = datetime.datetime.now().strftime("%d.%m.%Y")
         file_name = f"sheet_{today}"
-        return dataframe_to_response(df, "csv", file_name)
+        return report_to_streaming_response(
+            report, "csv", file_name, queryset=custom_qs
+        )
 
 
 class StudentSearchView(CuratorOnlyMixin, TemplateView):
@@ -157,190 +163,12 @@ class ExportsView(CuratorOnlyMixin, generic.TemplateView):
 
 class FutureGraduateStatsView(CuratorOnlyMixin, generic.TemplateView):
     template_name = "staff/diplomas_stats.html"
-    BAD_GRADES = GradeTypes.unsatisfactory_grades
-    BAD_PROJECT_GRADES = [
-        ProjectGradeTypes.UNSATISFACTORY,
-        ProjectGradeTypes.NOT_GRADED,
-    ]
 
     def get_context_data(self, branch_id, **kwargs):
-        student_profiles = (
-            StudentProfile.objects.filter(
-                type=StudentTypes.REGULAR,
-                branch_id=branch_id,
-                status=StudentStatuses.WILL_GRADUATE,
-            )
-            .select_related("user")
-            .order_by("user__last_name", "user__first_name", "user_id")
-        )
-        progress = get_student_progress(student_profiles)
-        unique_teachers = set()
-        total_hours = 0
-        total_passed_courses = 0
-        unique_projects = set()
-        unique_courses = set()
-        excellent_total = 0
-        good_total = 0
-        most_courses_students = set()
-        most_courses_in_term_students = set()
-        most_open_courses_students = set()
-        enrolled_on_first_course = set()
-        by_year_of_admission = defaultdict(set)
-        finished_two_or_more_programs = set()
-        all_three_practicies_are_internal = set()
-        passed_practicies_in_first_two_years = set()
-        passed_internal_practicies_in_first_two_years = set()
-        most_failed_courses = set()
-        less_failed_courses = set()
-
-        for student_profile in student_profiles:
-            s = student_profile.user
-            enrollments = progress[s.id].get("enrollments", [])
-            projects = progress[s.id].get("projects", [])
-            shad = progress[s.id].get("shad", [])
-            graduate_profile = get_graduate_profile(student_profile)
-            if (
-                graduate_profile
-                and len(graduate_profile.academic_disciplines.all()) >= 2
-            ):
-                finished_two_or_more_programs.add(s)
-            by_year_of_admission[student_profile.year_of_admission].add(student_profile)
-            degree_year = AcademicDegreeLevels.BACHELOR_SPECIALITY_1
-            if student_profile.level_of_education_on_admission == degree_year:
-                enrolled_on_first_course.add(s)
-            # Count most_courses_students
-            s.passed_courses = sum(
-                1 for e in enrollments if e.grade not in self.BAD_GRADES
-            )
-            s.passed_courses += sum(1 for c in shad if c.grade not in self.BAD_GRADES)
-            if not most_courses_students:
-                most_courses_students = {s}
-            else:
-                most_courses_student = next(iter(most_courses_students))
-                if s.passed_courses == most_courses_student.passed_courses:
-                    most_courses_students.add(s)
-                elif s.passed_courses > most_courses_student.passed_courses:
-                    most_courses_students = {s}
-            s.pass_open_courses = sum(
-                e.course.is_club_course
-                for e in enrollments
-                if e.grade not in self.BAD_GRADES
-            )
-            if not most_open_courses_students:
-                most_open_courses_students.add(s)
-            else:
-                most_open_courses_student = next(iter(most_open_courses_students))
-                if s.pass_open_courses == most_open_courses_student.pass_open_courses:
-                    most_open_courses_students.add(s)
-                elif s.pass_open_courses > most_open_courses_student.pass_open_courses:
-                    most_open_courses_students = {s}
-
-            internal_projects_cnt = 0
-            projects_in_first_two_years_of_learning = 0
-            internal_projects_in_first_two_years_of_learning = 0
-            enrollment_term_index = get_term_index(
-                student_profile.year_of_admission, SemesterTypes.AUTUMN
-            )
-            for ps in projects:
-                if ps.final_grade in self.BAD_PROJECT_GRADES or ps.project.is_canceled:
-                    continue
-                unique_projects.add(ps.project)
-                internal_projects_cnt += int(not ps.project.is_external)
-                if 0 <= ps.project.semester.index - enrollment_term_index <= 4:
-                    projects_in_first_two_years_of_learning += 1
-                    if not ps.project.is_external:
-                        internal_projects_in_first_two_years_of_learning += 1
-            if internal_projects_cnt == 3:
-                all_three_practicies_are_internal.add(s)
-            if projects_in_first_two_years_of_learning >= 3:
-                passed_practicies_in_first_two_years.add(s)
-            if internal_projects_in_first_two_years_of_learning >= 3:
-                passed_internal_practicies_in_first_two_years.add(s)
-
-            courses_by_term = defaultdict(int)
-            failed_courses = 0
-            # Add shad courses
-            for c in shad:
-                if c.grade in self.BAD_GRADES:
-                    failed_courses += 1
-                    continue
-                courses_by_term[c.semester_id] += 1
-            for enrollment in enrollments:
-                # Skip summer courses
-                if enrollment.course.semester.type == SemesterTypes.SUMMER:
-                    continue
-                if enrollment.grade in self.BAD_GRADES:
-                    failed_courses += 1
-                    continue
-                courses_by_term[enrollment.course.semester_id] += 1
-                total_passed_courses += 1
-                if enrollment.grade in GradeTypes.excellent_grades:
-                    excellent_total += 1
-                elif enrollment.grade in GradeTypes.good_grades:
-                    good_total += 1
-                unique_courses.add(enrollment.course.meta_course)
-                total_hours += enrollment.course.courseclass_set.count() * 1.5
-                for course_teacher in enrollment.course.course_teachers.all():
-                    unique_teachers.add(course_teacher.teacher_id)
-
-            s.failed_courses = failed_courses
-            if not most_failed_courses:
-                most_failed_courses = {s}
-            else:
-                most_failed_course_student = next(iter(most_failed_courses))
-                if s.failed_courses == most_failed_course_student.failed_courses:
-                    most_failed_courses.add(s)
-                elif s.failed_courses > most_failed_course_student.failed_courses:
-                    most_failed_courses = {s}
-            # Less failed courses
-            if not less_failed_courses:
-                less_failed_courses = {s}
-            else:
-                less_failed_course_student = next(iter(most_failed_courses))
-                if s.failed_courses == less_failed_course_student.failed_courses:
-                    less_failed_courses.add(s)
-                elif s.failed_courses < less_failed_course_student.failed_courses:
-                    less_failed_courses = {s}
-
-            try:
-                s.max_courses_in_term = max(courses_by_term.values())
-            except ValueError:
-                s.max_courses_in_term = 0
-            if not most_courses_in_term_students:
-                most_courses_in_term_students = {s}
-            else:
-                most_courses_in_term_student = next(iter(most_courses_in_term_students))
-                if (
-                    s.max_courses_in_term
-                    == most_courses_in_term_student.max_courses_in_term
-                ):
-                    most_courses_in_term_students.add(s)
-                elif (
-                    s.max_courses_in_term
-                    > most_courses_in_term_student.max_courses_in_term
-                ):
-                    most_courses_in_term_students = {s}
+        stats = calculate_future_graduate_stats(branch_id)
         context = {
             "branch": Branch.objects.get(pk=branch_id),
-            "less_failed_courses": less_failed_courses,
-            "most_failed_courses": most_failed_courses,
-            "all_three_practicies_are_internal": all_three_practicies_are_internal,
-            "passed_practicies_in_first_two_years": passed_practicies_in_first_two_years,
-            "passed_internal_practicies_in_first_two_years": passed_internal_practicies_in_first_two_years,
-            "finished_two_or_more_programs": finished_two_or_more_programs,
-            "by_enrollment_year": dict(by_year_of_admission),
-            "enrolled_on_first_course": enrolled_on_first_course,
-            "most_courses_students": most_courses_students,
-            "most_courses_in_term_students": most_courses_in_term_students,
-            "most_open_courses_students": most_open_courses_students,
-            "student_profiles": student_profiles,
-            "unique_teachers_count": len(unique_teachers),
-            "total_hours": int(total_hours),
-            "unique_courses": unique_courses,
-            "good_total": good_total,
-            "excellent_total": excellent_total,
-            "total_passed_courses": total_passed_courses,
-            "unique_projects": unique_projects,
+            **stats.to_context(),
         }
         return context
 
@@ -371,10 +199,23 @@ class FutureGraduateDiplomasCSVView(CuratorOnlyMixin, generic.base.View):
     def get(self, request, branch_id, *args, **kwargs):
         branch = get_object_or_404(Branch.objects.filter(pk=branch_id))
         report = FutureGraduateDiplomasReport(branch)
-        df = report.generate()
         today = datetime.datetime.now()
         file_name = "diplomas_{}".format(today.year)
-        return dataframe_to_response(df, "csv", file_name)
+        return report_to_streaming_response(report, "csv", file_name)
+
+
+def enqueue_progress_report_task(request, report_type, output_format, params=None):
+    task, enqueue = create_progress_report_task(
+        report_type=report_type,
+        output_format=output_format,
+        author=request.user,
+        params=params,
+    )
+    if enqueue:
+        generate_progress_report.delay(task_id=task.pk)
+    return HttpResponseRedirect(
+        reverse("staff:progress_report_task", kwargs={"task_id": task.pk})
+    )
 
 
 class ProgressReportFullView(CuratorOnlyMixin, generic.base.View):
@@ -382,26 +223,82 @@ class ProgressReportFullView(CuratorOnlyMixin, generic.base.View):
         report = ProgressReportFull(grade_getter="grade_honest")
         today = datetime.datetime.now().strftime("%d.%m.%Y")
         file_name = f"sheet_{today}"
-        return dataframe_to_response(report.generate(), output_format, file_name)
+        return report_to_streaming_response(report, output_format, file_name)
+
+    def post(self, request, output_format, *args, **kwargs):
+        """Generates report in a background"""
+        return enqueue_progress_report_task(
+            request, ProgressReportTypes.FULL, output_format
+        )
 
 
 class ProgressReportForSemesterView(CuratorOnlyMixin, generic.base.View):
-    def get(self, request, output_format, *args, **kwargs):
+    def get_semester(self) -> Semester:
         # Validate year and term GET params
+        term_year = int(self.kwargs["term_year"])
+        if term_year < settings.ESTABLISHED:
+            raise ValueError("ProgressReportForSemester: Wrong year format")
+        term_type = self.kwargs["term_type"]
+        if term_type not in SemesterTypes.values:
+            raise ValueError("ProgressReportForSemester: Wrong term format")
+        filters = {"year": term_year, "type": term_type}
+        return get_object_or_404(Semester, **filters)
+
+    def get(self, request, output_format, *args, **kwargs):
         try:
-            term_year = int(self.kwargs["term_year"])
-            if term_year < settings.ESTABLISHED:
-                raise ValueError("ProgressReportForSemester: Wrong year format")
-            term_type = self.kwargs["term_type"]
-            if term_type not in SemesterTypes.values:
-                raise ValueError("ProgressReportForSemester: Wrong term format")
-            filters = {"year": term_year, "type": term_type}
-            semester = get_object_or_404(Semester, **filters)
+            semester = self.get_semester()
         except (KeyError, ValueError):
             return HttpResponseBadRequest()
         report = ProgressReportForSemester(semester)
         file_name = "sheet_{}_{}".format(semester.year, semester.type)
-        return dataframe_to_response(report.generate(), output_format, file_name)
+        return report_to_streaming_response(report, output_format, file_name)
+
+    def post(self, request, output_format, *args, **kwargs):
+        """Generates report in a background"""
+        try:
+            semester = self.get_semester()
+        except (KeyError, ValueError):
+            return HttpResponseBadRequest()
+        return enqueue_progress_report_task(
+            request,
+            ProgressReportTypes.FOR_SEMESTER,
+            output_format,
+            params={"semester_id": semester.pk},
+        )
+
+
+class ProgressReportTaskView(CuratorOnlyMixin, generic.TemplateView):
+    """Shows status of the report generated in a background."""
+
+    template_name = "staff/progress_report_task.html"
+
+    def get_context_data(self, task_id, **kwargs):
+        queryset = Task.objects.filter(
+            pk=task_id, task_name=GENERATE_PROGRESS_REPORT_TASK_NAME
+        )
+        task = get_object_or_404(queryset)
+        return {
+            "task": task,
+            "download_url": reverse(
+                "staff:progress_report_task_download", kwargs={"task_id": task.pk}
+            ),
+        }
+
+
+class ProgressReportTaskDownloadView(ProtectedFileDownloadView):
+    file_field_name = "output_file"
+
+    def has_permission(self):
+        return self.request.user.is_curator
+
+    def get_protected_object(self) -> Optional[Task]:
+        return Task.objects.filter(
+            pk=self.kwargs["task_id"], task_name=GENERATE_PROGRESS_REPORT_TASK_NAME
+        ).first()
+
+    def get_file_field(self):
+        file_field = super().get_file_field()
+        return file_field if file_field else None
 
 
 class EnrollmentInvitationListView(CuratorOnlyMixin, TemplateView):
@@ -445,7 +342,7 @@ class InvitationStudentsProgressReportView(CuratorOnlyMixin, View):
         report = ProgressReportForInvitation(invitation)
         term = invitation.semester
         file_name = f"sheet_invitation_{invitation.pk}_{term.year}_{term.type}"
-        return dataframe_to_response(report.generate(), output_format, file_name)
+        return report_to_streaming_response(report, output_format, file_name)
 
 
 class AdmissionApplicantsReportView(CuratorOnlyMixin, generic.base.View):
@@ -740,18 +637,34 @@ class OfficialDiplomasListView(CuratorOnlyMixin, TemplateView):
 
 
 class OfficialDiplomasCSVView(CuratorOnlyMixin, generic.base.View):
-    def get(self, request, year, month, day, *args, **kwargs):
-        diploma_issued_on = datetime.date(int(year), int(month), int(day))
-        report = OfficialDiplomasReport(diploma_issued_on)
+    def get_queryset(self, report: OfficialDiplomasReport):
         site_aware_queryset = report.get_queryset().filter(
             branch__site=self.request.site
         )
-        if not site_aware_queryset.count():
+        if not site_aware_queryset.exists():
             raise Http404
-        df = report.generate(site_aware_queryset)
+        return site_aware_queryset
+
+    def get(self, request, year, month, day, *args, **kwargs):
+        diploma_issued_on = datetime.date(int(year), int(month), int(day))
+        report = OfficialDiplomasReport(diploma_issued_on)
+        site_aware_queryset = self.get_queryset(report)
         date_issued = diploma_issued_on.isoformat().replace("-", "_")
         file_name = "official_diplomas_{}".format(date_issued)
-        return dataframe_to_response(df, "csv", file_name)
+        return report_to_streaming_response(
+            report, "csv", file_name, queryset=site_aware_queryset
+        )
+
+    def post(self, request, year, month, day, *args, **kwargs):
+        """Generates report in a background"""
+        diploma_issued_on = datetime.date(int(year), int(month), int(day))
+        self.get_queryset(OfficialDiplomasReport(diploma_issued_on))
+        return enqueue_progress_report_task(
+            request,
+            ProgressReportTypes.OFFICIAL_DIPLOMAS,
+            "csv",
+            params={"diploma_issued_on": diploma_issued_on.isoformat()},
+        )
 
 
 class OfficialDiplomasTeXView(CuratorOnlyMixin, generic.TemplateView):
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.18 on 2026-10-18 12:00
+
+from django.db import migrations
+import files.models
+import tasks.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_alter_task_task_params'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='output_file',
+            field=files.models.ConfigurableStorageFileField(blank=True, max_length=200, upload_to=tasks.models.task_output_file_upload_to),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.18 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_output_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='progress',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -13,6 +13,8 @@ from django.db.models import Q
 from django.utils import formats, timezone
 
 from core.timezone import get_now_utc
+from files.models import ConfigurableStorageFileField
+from files.storage import private_storage
 
 logger = logging.getLogger(__name__)
 
@@ -23,13 +25,17 @@ def _get_task_hash(task_name: str, task_params: Dict[str, Any]):
     return sha1(s.encode('utf-8')).hexdigest()
 
 
+def task_output_file_upload_to(instance: "Task", filename) -> str:
+    return f"tasks/{instance.task_hash}/{filename}"
+
+
 class TaskManager(models.Manager):
 
     def get_queryset(self):
         return super().get_queryset()
 
-    def unlocked(self, now):
-        max_run_time = Task.MAX_RUN_TIME
+    def unlocked(self, now, max_run_time: Optional[int] = None):
+        max_run_time = max_run_time or Task.MAX_RUN_TIME
         qs = self.get_queryset()
         expires_at = now - timedelta(seconds=max_run_time)
         unlocked = Q(locked_by__isnull=True) | Q(locked_at__lt=expires_at)
@@ -75,6 +81,14 @@ class Task(models.Model):
     processed_at = models.DateTimeField(db_index=True, null=True, blank=True)
     # details of the error that occurred
     error = models.TextField(blank=True)
+    # intermediate state that allows to resume an interrupted task
+    progress = models.JSONField(blank=True, default=dict)
+    # the file produced by the task (e.g. generated report)
+    output_file = ConfigurableStorageFileField(
+        upload_to=task_output_file_upload_to,
+        storage=private_storage,
+        max_length=200,
+        blank=True)
 
     # details of who's trying to run the task at the moment
     locked_by = models.CharField(max_length=64, db_index=True,
@@ -128,9 +142,10 @@ class Task(models.Model):
         else:
             return "waiting"
 
-    def lock(self, locked_by) -> Optional["Task"]:
+    def lock(self, locked_by,
+             max_run_time: Optional[int] = None) -> Optional["Task"]:
         now = timezone.now()
-        unlocked = Task.objects.unlocked(now).filter(pk=self.pk)
+        unlocked = Task.objects.unlocked(now, max_run_time).filter(pk=self.pk)
         updated = unlocked.update(locked_by=locked_by, locked_at=now)
         if updated:
             self.locked_by = locked_by
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.13 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0042_new_assigneemode'),
+        ('users', '0039_yandexuserdata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentProgressSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('failed_total', models.PositiveIntegerField(default=0)),
+                ('center_courses', models.JSONField(default=list)),
+                ('club_courses', models.JSONField(default=list)),
+                ('club_adjusted', models.FloatField(default=0)),
+                ('online_total', models.PositiveIntegerField(default=0)),
+                ('shad_total', models.PositiveIntegerField(default=0)),
+                ('in_term_total', models.PositiveIntegerField(default=0)),
+                ('in_term_courses', models.JSONField(default=list)),
+                ('in_term_passed', models.PositiveIntegerField(default=0)),
+                ('in_term_failed', models.PositiveIntegerField(default=0)),
+                ('in_term_in_progress', models.FloatField(default=0)),
+                ('semester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='courses.semester', verbose_name='Semester')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress_summaries', to=settings.AUTH_USER_MODEL, verbose_name='Student')),
+            ],
+            options={
+                'verbose_name': 'Student progress summary',
+                'verbose_name_plural': 'Student progress summaries',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='studentprogresssummary',
+            constraint=models.UniqueConstraint(fields=('user', 'semester'), name='unique_progress_summary_per_term'),
+        ),
+    ]
@@ -638,6 +638,20 @@ class User(TimezoneAwareMixin, LearningPermissionsMixin, StudentProfileAbstract,
         """
         Stats for SUCCESSFULLY completed courses and enrollments in
         requested term.
+
+        Reads precomputed values from the `StudentProgressSummary` model
+        if *enrollments* are not provided.
+        """
+        if enrollments is not None:
+            return self.calculate_stats(semester, enrollments=enrollments)
+        from users.services import get_student_progress_summary
+        return get_student_progress_summary(self, semester).to_stats()
+
+    def calculate_stats(self, semester,
+                        enrollments: Optional[EnrollmentQuerySet] = None):
+        """
+        Calculates stats for SUCCESSFULLY completed courses and enrollments
+        in requested term.
         Additional DB queries may occur:
             * enrollment_set
             * enrollment_set__course (for each enrollment)
@@ -654,7 +668,8 @@ class User(TimezoneAwareMixin, LearningPermissionsMixin, StudentProfileAbstract,
         in_current_term_passed = 0  # Center and club courses
         in_current_term_failed = 0  # Center and club courses
         in_current_term_in_progress = 0  # Center and club courses
-        enrollments = enrollments or self.enrollment_set(manager='active').all()
+        if enrollments is None:
+            enrollments = self.enrollment_set(manager='active').all()
         for e in enrollments:
             in_current_term = e.course.semester_id == semester.pk
             if in_current_term:
@@ -715,6 +730,7 @@ class User(TimezoneAwareMixin, LearningPermissionsMixin, StudentProfileAbstract,
                             club_adjusted,
                 "center_courses": center_courses,
                 "club_courses": club_courses,
+                "club_adjusted": club_adjusted,
                 "online_total": online_total,
                 "shad_total": shad_total
             },
@@ -1032,6 +1048,86 @@ class SHADCourseRecord(TimeStampedModel):
         return smart_str("{} [{}]".format(self.name, self.student_id))
 
 
+class StudentProgressSummary(TimeStampedModel):
+    """
+    Precomputed results of the `User.calculate_stats` call for the term.
+    Values are recalculated on enrollment grade, SHAD/online course records
+    and club course classes changes.
+    """
+    user = models.ForeignKey(
+        User,
+        verbose_name=_("Student"),
+        related_name="progress_summaries",
+        on_delete=models.CASCADE)
+    semester = models.ForeignKey(
+        'courses.Semester',
+        verbose_name=_("Semester"),
+        on_delete=models.CASCADE)
+    failed_total = models.PositiveIntegerField(default=0)
+    # Meta course ids of successfully completed courses
+    center_courses = models.JSONField(default=list)
+    club_courses = models.JSONField(default=list)
+    club_adjusted = models.FloatField(default=0)
+    online_total = models.PositiveIntegerField(default=0)
+    shad_total = models.PositiveIntegerField(default=0)
+    in_term_total = models.PositiveIntegerField(default=0)
+    in_term_courses = models.JSONField(default=list)
+    in_term_passed = models.PositiveIntegerField(default=0)
+    in_term_failed = models.PositiveIntegerField(default=0)
+    in_term_in_progress = models.FloatField(default=0)
+
+    class Meta:
+        verbose_name = _("Student progress summary")
+        verbose_name_plural = _("Student progress summaries")
+        constraints = [
+            models.UniqueConstraint(fields=('user', 'semester'),
+                                    name='unique_progress_summary_per_term'),
+        ]
+
+    def __str__(self):
+        return smart_str("{} [{}]".format(self.user_id, self.semester_id))
+
+    def update_from_stats(self, stats) -> None:
+        passed, in_term = stats["passed"], stats["in_term"]
+        self.failed_total = stats["failed"]["total"]
+        self.center_courses = sorted(passed["center_courses"])
+        self.club_courses = sorted(passed["club_courses"])
+        self.club_adjusted = passed["club_adjusted"]
+        self.online_total = passed["online_total"]
+        self.shad_total = passed["shad_total"]
+        self.in_term_total = in_term["total"]
+        self.in_term_courses = sorted(in_term["courses"])
+        self.in_term_passed = in_term["passed"]
+        self.in_term_failed = in_term["failed"]
+        self.in_term_in_progress = in_term["in_progress"]
+
+    def to_stats(self):
+        """Returns values in the same format as `User.calculate_stats`"""
+        center_courses = set(self.center_courses)
+        club_courses = set(self.club_courses)
+        passed_total = (len(center_courses) + self.online_total +
+                        self.shad_total)
+        return {
+            "failed": {"total": self.failed_total},
+            "passed": {
+                "total": passed_total + len(club_courses),
+                "adjusted": passed_total + self.club_adjusted,
+                "center_courses": center_courses,
+                "club_courses": club_courses,
+                "club_adjusted": self.club_adjusted,
+                "online_total": self.online_total,
+                "shad_total": self.shad_total
+            },
+            "in_term": {
+                "total": self.in_term_total,
+                "courses": set(self.in_term_courses),
+                "passed": self.in_term_passed,
+                "failed": self.in_term_failed,
+                "in_progress": self.in_term_in_progress,
+            }
+        }
+
+
 class CertificateOfParticipation(TimeStampedModel):
     signature = models.CharField(_("Reference|signature"), max_length=255)
     note = models.TextField(_("Reference|note"), blank=True)
@@ -2,7 +2,7 @@ import datetime
 from collections import defaultdict
 from enum import Enum, auto
 from itertools import islice
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from registration.models import RegistrationProfile
 
@@ -10,7 +10,7 @@ from django.contrib.sites.models import Site
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import Prefetch, Q, prefetch_related_objects
+from django.db.models import Count, Prefetch, Q, QuerySet, prefetch_related_objects
 from django.utils.timezone import now
 
 from auth.registry import role_registry
@@ -19,12 +19,13 @@ from core.timezone import get_now_utc
 from core.timezone.typing import Timezone
 from core.utils import bucketize
 from courses.models import Semester
-from learning.models import GraduateProfile
+from learning.models import Enrollment, GraduateProfile
 from learning.settings import StudentStatuses
 from study_programs.models import StudyProgram
 from users.constants import GenderTypes, Roles
 from users.models import (
-    OnlineCourseRecord, StudentProfile, StudentStatusLog, StudentTypes, User, UserGroup
+    OnlineCourseRecord, StudentProfile, StudentProgressSummary, StudentStatusLog,
+    StudentTypes, User, UserGroup
 )
 
 AccountId = int
@@ -106,6 +107,75 @@ def get_student_progress(queryset,
     return progress
 
 
+def _get_progress_summary_users(user_ids: Iterable[int]) -> QuerySet:
+    enrollments = (Enrollment.active
+                   .select_related('course', 'course__main_branch')
+                   .annotate(classes_total=Count('course__courseclass'))
+                   .order_by())
+    return (User.objects
+            .filter(pk__in=user_ids)
+            .prefetch_related(
+                Prefetch('enrollment_set', queryset=enrollments,
+                         to_attr='active_enrollments'),
+                'onlinecourserecord_set', 'shadcourserecord_set'))
+
+
+def get_student_progress_summaries(user_ids: Iterable[int],
+                                   semester: Semester) -> Dict[AccountId, StudentProgressSummary]:
+    """
+    Returns precomputed student progress for the term. Missing summaries
+    are calculated and saved with a constant number of queries.
+    """
+    user_ids = set(user_ids)
+    summaries = {s.user_id: s for s in (StudentProgressSummary.objects
+                                        .filter(user__in=user_ids,
+                                                semester=semester))}
+    missing = user_ids - summaries.keys()
+    if missing:
+        to_create = []
+        for user in _get_progress_summary_users(missing):
+            stats = user.calculate_stats(semester, enrollments=user.active_enrollments)
+            summary = StudentProgressSummary(user=user, semester=semester)
+            summary.update_from_stats(stats)
+            to_create.append(summary)
+        StudentProgressSummary.objects.bulk_create(to_create,
+                                                   ignore_conflicts=True)
+        for summary in to_create:
+            summaries[summary.user_id] = summary
+    return summaries
+
+
+def get_student_progress_summary(user: User, semester: Semester) -> StudentProgressSummary:
+    return get_student_progress_summaries([user.pk], semester)[user.pk]
+
+
+def update_student_progress_summaries(user_ids: Iterable[int]) -> None:
+    """
+    Recalculates all existing progress summaries of the students. Call it
+    every time enrollment grades, SHAD/online records or the number of
+    classes in a club course have changed.
+    """
+    summaries = bucketize(StudentProgressSummary.objects
+                          .filter(user__in=user_ids)
+                          .select_related('semester'),
+                          key=lambda s: s.user_id)
+    if not summaries:
+        return
+    to_update = []
+    for user in _get_progress_summary_users(summaries):
+        for summary in summaries[user.pk]:
+            stats = user.calculate_stats(summary.semester,
+                                         enrollments=user.active_enrollments)
+            summary.update_from_stats(stats)
+            summary.modified = now()
+            to_update.append(summary)
+    StudentProgressSummary.objects.bulk_update(to_update, fields=[
+        'failed_total', 'center_courses', 'club_courses', 'club_adjusted',
+        'online_total', 'shad_total', 'in_term_total', 'in_term_courses',
+        'in_term_passed', 'in_term_failed', 'in_term_in_progress', 'modified'
+    ])
+
+
 def get_or_create_graduate_profile(*, student_profile: StudentProfile,
                                    graduated_on: datetime.date,
                                    is_visible: bool = True) -> Tuple[GraduateProfile, bool]:
@@ -4,8 +4,12 @@ from django.dispatch import receiver
 from lms.utils import PublicRoute
 from users.constants import student_permission_roles
 
-from .models import StudentProfile, StudentTypes, User, UserGroup
-from .services import get_student_profile, maybe_unassign_student_role
+from .models import (
+    OnlineCourseRecord, SHADCourseRecord, StudentProfile, StudentTypes, User, UserGroup
+)
+from .services import (
+    get_student_profile, maybe_unassign_student_role, update_student_progress_summaries
+)
 
 
 @receiver(post_save, sender=UserGroup)
@@ -37,3 +41,11 @@ def post_delete_student_profile(sender, instance: StudentProfile, **kwargs):
     role = StudentTypes.to_permission_role(deleted_profile.type)
     maybe_unassign_student_role(role=role, account=deleted_profile.user,
                                 site=deleted_profile.site)
+
+
+@receiver(post_save, sender=SHADCourseRecord)
+@receiver(post_delete, sender=SHADCourseRecord)
+@receiver(post_save, sender=OnlineCourseRecord)
+@receiver(post_delete, sender=OnlineCourseRecord)
+def update_student_progress_on_course_record_change(sender, instance, **kwargs):
+    update_student_progress_summaries([instance.student_id])
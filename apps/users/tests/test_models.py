@@ -9,8 +9,10 @@ from courses.tests.factories import CourseFactory, SemesterFactory
 from learning.settings import GradeTypes
 from learning.tests.factories import EnrollmentFactory
 from users.constants import Roles
+from users.models import StudentProgressSummary
 from users.tests.factories import (
-    CuratorFactory, StudentFactory, StudentProfileFactory, UserFactory, UserGroupFactory
+    CuratorFactory, SHADCourseRecordFactory, StudentFactory, StudentProfileFactory,
+    UserFactory, UserGroupFactory
 )
 
 
@@ -116,6 +118,28 @@ def test_passed_courses():
     assert stats['passed']['total'] == 2
 
 
+@pytest.mark.django_db
+def test_stats_progress_summary():
+    student = StudentFactory()
+    course = CourseFactory()
+    term = course.semester
+    EnrollmentFactory(course=course, student=student, grade=GradeTypes.GOOD)
+    stats = student.stats(term)
+    assert stats == student.calculate_stats(term)
+    assert stats['passed']['total'] == 1
+    assert stats['in_term']['passed'] == 1
+    assert StudentProgressSummary.objects.filter(user=student).count() == 1
+    shad_record = SHADCourseRecordFactory(student=student, semester=term,
+                                          grade=GradeTypes.EXCELLENT)
+    stats = student.stats(term)
+    assert stats['passed']['total'] == 2
+    assert stats['passed']['shad_total'] == 1
+    assert stats['in_term']['total'] == 2
+    shad_record.delete()
+    assert student.stats(term) == student.calculate_stats(term)
+    assert student.stats(term)['passed']['total'] == 1
+
+
 @pytest.mark.django_db
 def test_github_login_validation():
     user = UserFactory.build()
@@ -13,7 +13,7 @@ from django.conf import settings
 from django.contrib import auth
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import transaction
-from django.db.models import Count, Prefetch, Q
+from django.db.models import Prefetch, Q
 from django.http import HttpResponseBadRequest, HttpResponseForbidden, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.utils.decorators import method_decorator
@@ -158,11 +158,7 @@ class UserDetailView(LoginRequiredMixin, generic.TemplateView):
         context["appData"] = js_app_data
         # Collect stats about successfully passed courses
         if u.is_curator:
-            # TODO: add derivable classes_total field to Course model
-            queryset = (profile_user.enrollment_set(manager='active')
-                        .annotate(classes_total=Count('course__courseclass')))
-            context['stats'] = profile_user.stats(current_semester,
-                                                  enrollments=queryset)
+            context['stats'] = profile_user.stats(current_semester)
         if can_view_student_profiles:
             student_profiles = get_student_profiles(user=profile_user,
                                                     site=self.request.site,
@@ -1,13 +1,10 @@
 from rest_framework import serializers
 
 from django.conf import settings
-from django.core.cache import InvalidCacheBackendError, caches
-from django.utils.encoding import force_bytes
 
-from api.utils import make_api_fragment_key
 from compscicenter_ru.utils import course_public_url
 from core.api.serializers import BranchSerializer
-from core.utils import render_markdown
+from core.utils import render_markdown_and_cache
 from courses.api.serializers import CourseSerializer
 from courses.models import Course, CourseTeacher
 from learning.models import GraduateProfile
@@ -116,20 +113,8 @@ class GraduateProfileSerializer(serializers.ModelSerializer):
         fields = ("id", "student", "photo", "year", "areas", "testimonial")
 
     def get_testimonial(self, graduate_profile):
-        try:
-            fragment_cache = caches['markdown_fragments']
-        except InvalidCacheBackendError:
-            fragment_cache = caches['default']
-        expire_time = 3600
-        vary_on = [bytes(graduate_profile.pk),
-                   force_bytes(graduate_profile.modified)]
-        cache_key = make_api_fragment_key(GraduateProfile.TESTIMONIAL_CACHE_KEY,
-                                          vary_on)
-        value = fragment_cache.get(cache_key)
-        if value is None:
-            value = render_markdown(graduate_profile.testimonial)
-            fragment_cache.set(cache_key, value, expire_time)
-        return value
+        return render_markdown_and_cache(graduate_profile.testimonial,
+                                         "testimonial", 3600)
 
 
 class AlumniSerializer(GraduateProfileSerializer):
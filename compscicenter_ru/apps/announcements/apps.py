@@ -5,3 +5,7 @@ from django.utils.translation import gettext_lazy as _
 class AnnouncementsConfig(AppConfig):
     name = 'announcements'
     verbose_name = _("Announcements of events")
+
+    def ready(self):
+        # Register signals
+        from . import signals  # pylint: disable=unused-import
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from announcements.models import Announcement
+from core.page_cache import invalidate_page_cache
+
+
+@receiver(post_save, sender=Announcement)
+@receiver(post_delete, sender=Announcement)
+def invalidate_public_pages_cache(sender, *args, **kwargs):
+    invalidate_page_cache(sender._meta.label)
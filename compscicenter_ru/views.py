@@ -23,6 +23,7 @@ from compscicenter_ru.utils import (
 )
 from core.exceptions import Redirect
 from core.models import Branch
+from core.page_cache import PageCacheMixin
 from core.urls import reverse
 from core.utils import bucketize
 from courses.constants import SemesterTypes, TeacherRoles
@@ -85,8 +86,9 @@ class PublicURLMixin:
         raise TypeError(f"{obj.__class__} is not supported")
 
 
-class IndexView(TemplateView):
+class IndexView(PageCacheMixin, TemplateView):
     template_name = 'compscicenter_ru/index.html'
+    page_cache_tags = ("announcements.Announcement",)
     VK_CACHE_KEY = 'v2_index_vk_social_news'
     INSTAGRAM_CACHE_KEY = 'v2_index_instagram_posts'
 
@@ -195,8 +197,9 @@ class TestimonialsListView(TemplateView):
         }
 
 
-class TeachersView(TemplateView):
+class TeachersView(PageCacheMixin, TemplateView):
     template_name = "compscicenter_ru/teachers.html"
+    page_cache_tags = ("courses.CourseTeacher", "core.Branch")
 
     def get_context_data(self, **kwargs):
         # Calculates the min term index in the last 3 academic years.
@@ -284,8 +287,9 @@ class AlumniHonorBoardView(TemplateView):
         return context
 
 
-class AlumniView(TemplateView):
+class AlumniView(PageCacheMixin, TemplateView):
     template_name = "compscicenter_ru/alumni/index.html"
+    page_cache_tags = ("learning.GraduateProfile",)
 
     def get_context_data(self):
         cache_key_pattern = GraduateProfile.HISTORY_CACHE_KEY_PATTERN
@@ -501,8 +505,10 @@ class GraduateProfileView(generic.DetailView):
         return context
 
 
-class MetaCourseDetailView(PublicURLMixin, generic.DetailView):
+class MetaCourseDetailView(PageCacheMixin, PublicURLMixin, generic.DetailView):
     model = MetaCourse
+    page_cache_tags = ("courses.Course", "courses.CourseTeacher")
+    page_cache_query_params = ("branch",)
     slug_url_kwarg = 'course_slug'
     template_name = "compscicenter_ru/courses/meta_course_detail.html"
     context_object_name = 'meta_course'
@@ -574,8 +580,10 @@ class TeacherDetailView(PublicURLMixin, DetailView):
         return context
 
 
-class CourseOfferingsView(TemplateView):
+class CourseOfferingsView(PageCacheMixin, TemplateView):
     template_name = "compscicenter_ru/courses/course_list.html"
+    page_cache_tags = ("courses.Course",)
+    page_cache_query_params = ("terms", "branch", "academic_year")
 
     def get_context_data(self, **kwargs):
         term_pair = get_current_term_pair()
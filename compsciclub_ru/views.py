@@ -22,6 +22,7 @@ from compscicenter_ru.utils import course_class_public_url, course_public_url
 from compsciclub_ru.forms import RegistrationUniqueEmailAndUsernameForm
 from core.exceptions import Redirect
 from core.models import Branch
+from core.page_cache import PageCacheMixin
 from core.urls import reverse
 from courses.calendar import CalendarEventFactory
 from courses.constants import SemesterTypes, TeacherRoles
@@ -98,18 +99,20 @@ class CalendarClubScheduleView(MonthEventsCalendarView):
 
     def get_events(self, month_period: MonthPeriod, **kwargs):
         start, end = extended_month_date_range(month_period, expand=1)
-        fs = [Q(date__range=[start, end]),
-              ~Q(course__semester__type=SemesterTypes.SUMMER)]
+        fs = [~Q(course__semester__type=SemesterTypes.SUMMER)]
         public_url_builder = partial(course_class_public_url,
                                      default_branch_code=self.request.branch.code)
-        for c in get_classes(branch_list=[self.request.branch], filters=fs):
+        classes = get_classes(branch_list=[self.request.branch], filters=fs,
+                              start_date=start, end_date=end)
+        for c in classes:
             yield CalendarEventFactory.create(c,
                                               url_builder=public_url_builder,
                                               time_zone=self.request.branch.get_timezone())
 
 
-class IndexView(PublicURLContextMixin, generic.TemplateView):
+class IndexView(PageCacheMixin, PublicURLContextMixin, generic.TemplateView):
     template_name = "compsciclub_ru/index.html"
+    page_cache_tags = ("courses.Course", "courses.CourseClass")
 
     def get_context_data(self, **kwargs):
         context = super(IndexView, self).get_context_data(**kwargs)
@@ -160,8 +163,9 @@ class IndexView(PublicURLContextMixin, generic.TemplateView):
         return course.is_completed, nearest
 
 
-class TeachersView(generic.ListView):
+class TeachersView(PageCacheMixin, generic.ListView):
     template_name = "compsciclub_ru/teacher_list.html"
+    page_cache_tags = ("courses.Course", "courses.CourseTeacher")
 
     @property
     def get_queryset(self):
@@ -272,8 +276,9 @@ class ClubClassesFeed(ICalFeed):
         return item.venue.address
 
 
-class CoursesListView(PublicURLContextMixin, generic.ListView):
+class CoursesListView(PageCacheMixin, PublicURLContextMixin, generic.ListView):
     model = Semester
+    page_cache_tags = ("courses.Course",)
     template_name = "compsciclub_ru/course_offerings.html"
 
     def get_queryset(self):
@@ -315,8 +320,10 @@ class CoursesListView(PublicURLContextMixin, generic.ListView):
         return context
 
 
-class MetaCourseDetailView(PublicURLContextMixin, generic.DetailView):
+class MetaCourseDetailView(PageCacheMixin, PublicURLContextMixin,
+                           generic.DetailView):
     model = MetaCourse
+    page_cache_tags = ("courses.Course",)
     slug_url_kwarg = 'course_slug'
     template_name = "compsciclub_ru/meta_course_detail.html"
 
@@ -10,6 +10,7 @@ from django.core.files import File
 from django.test import TestCase
 from django.urls import resolve
 
+from core.locks import get_shared_connection
 from core.models import SiteConfiguration
 from core.tests.factories import (
     BranchFactory, CityFactory, SiteConfigurationFactory, SiteFactory
@@ -23,6 +24,24 @@ from notifications.models import Type
 from users.tests.factories import CuratorFactory
 
 
+# Patterns of keys with the state shared among workers through redis.
+# Object ids are reused by tests, so stale values must be deleted.
+SHARED_REDIS_KEY_PATTERNS = (
+    "notifications.unread_*",
+    "core.dirty_derivable_fields_job_scheduled_*",
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_shared_redis_state(request):
+    if request.node.get_closest_marker("django_db") is not None:
+        redis_client = get_shared_connection()
+        for pattern in SHARED_REDIS_KEY_PATTERNS:
+            keys = list(redis_client.scan_iter(match=pattern))
+            if keys:
+                redis_client.delete(*keys)
+
+
 @pytest.fixture()
 def client():
     """Customize login method for Django test client."""
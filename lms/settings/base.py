@@ -198,6 +198,12 @@ THUMBNAIL_REDIS_SSL = REDIS_SSL
 SENTRY_DSN = env("SENTRY_DSN")
 SENTRY_LOG_LEVEL = env.int("SENTRY_LOG_LEVEL", default=logging.INFO)
 
+# Max number of keep-alive connections to the Yandex.Contest API per process
+YANDEX_CONTEST_API_POOL_SIZE = env.int("YANDEX_CONTEST_API_POOL_SIZE", default=10)
+
+# Course classes older than this number of days are excluded from iCalendar feeds
+ICALENDAR_PAST_EVENTS_HORIZON = env.int("ICALENDAR_PAST_EVENTS_HORIZON", default=90)
+
 ESTABLISHED = 2011
 
 # Template customization